@@ -1,5 +1,15 @@
 import os
 
+import pyglet
+
+# BPS_HEADLESS=1 renders into an offscreen EGL context -- no window, no
+# display server -- for golden-image tests and compose benchmarks on build
+# machines (see Display.capture). pyglet picks its window backend the first
+# time pyglet.window is imported, which the imports below do, so the switch
+# is thrown here first. (PYGLET_HEADLESS=1 is the same switch, pyglet-side.)
+if os.environ.get("BPS_HEADLESS", "").casefold() in {"1", "true", "yes", "on"}:
+    pyglet.options["headless"] = True
+
 from .blitspersecond import BlitsPerSecond
 from .input import key
 from .lifecycle import EngineState
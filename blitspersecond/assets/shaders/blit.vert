@@ -0,0 +1,37 @@
+#version 330
+    // The engines' blit vertex stage, shared by every tile and sprite draw.
+    // Their quads are axis-aligned and never scaled or rotated, so where
+    // default.vert builds scale, rotation and translate matrices for every
+    // vertex, this does one add and the projection multiply. `translate` is
+    // the scroll register (a generic attribute, so moving writes no
+    // buffers), `colors` the red/green/blue/alpha multipliers (tint/fade),
+    // `palette_row` which table of the palette bank the quad's indices look
+    // up -- per vertex, so differently-paletted quads share one draw.
+    in vec4 colors;
+    in vec3 tex_coords;
+    in vec3 position;
+    in vec3 translate;
+    in float palette_row;
+
+    out vec4 vertex_colors;
+    out vec3 texture_coords;
+    flat out float vertex_palette_row;
+
+    // The engine never moves the view (the camera is `translate`), so only
+    // the projection is applied.
+    uniform WindowBlock
+    {
+        mat4 projection;
+        mat4 view;
+    } window;
+
+    void main()
+    {
+        // Whole pixels: the engines floor on the CPU already, and snapping
+        // here keeps a fractional register from smearing a texel.
+        vec2 xy = floor(position.xy + translate.xy);
+        gl_Position = window.projection * vec4(xy, position.z + translate.z, 1.0);
+        vertex_colors = colors;
+        texture_coords = tex_coords;
+        vertex_palette_row = palette_row;
+    }
@@ -5,9 +5,11 @@
     in vec3 translate;
     in vec2 scale;
     in float rotation;
+    in float palette_row;
 
     out vec4 vertex_colors;
     out vec3 texture_coords;
+    flat out float vertex_palette_row;
 
     uniform WindowBlock
     {
@@ -35,4 +37,5 @@
 
         vertex_colors = colors;
         texture_coords = tex_coords;
+        vertex_palette_row = palette_row;
     }
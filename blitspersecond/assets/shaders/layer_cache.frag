@@ -0,0 +1,12 @@
+#version 330 core
+in vec2 TexCoord;
+out vec4 FragColor;
+
+// Premultiplied already (see TileBatch.draw): blended with ONE,
+// ONE_MINUS_SRC_ALPHA and passed through untouched.
+uniform sampler2D texture1;
+
+void main()
+{
+    FragColor = texture(texture1, TexCoord);
+}
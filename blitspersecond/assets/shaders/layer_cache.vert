@@ -0,0 +1,14 @@
+#version 330 core
+// A flattened layer run laid back into the compose framebuffer: one
+// full-target quad in clip space, texel for pixel. No y flip -- the cache
+// and the framebuffer share one orientation (the flip belongs to the
+// post-process pass that presents).
+in vec2 in_position;
+in vec2 in_tex_coords;
+out vec2 TexCoord;
+
+void main()
+{
+    gl_Position = vec4(in_position, 0.0, 1.0);
+    TexCoord = in_tex_coords;
+}
@@ -0,0 +1,42 @@
+#version 330
+    // A SpritePool's vertex stage: one quad, drawn once per instance. The
+    // CPU uploads only each drawn instance's origin and its table key
+    // (assembly * 8 + flip * 4 + quarter turns); the corner rects and UVs
+    // of every (assembly, orientation) live in a small static table on
+    // unit 2, three texels per key: the local rect (x, y, w, h), then the
+    // UV corners (u0, v0, u1, v1) and (u2, v2, u3, v3). The quad's index
+    // buffer is [0, 1, 2, 0, 2, 3], so gl_VertexID IS the corner --
+    // (x1,y1)(x2,y1)(x2,y2)(x1,y2), the order the quad path stages.
+    in vec2 instance_position;
+    in float instance_key;
+    in vec4 colors;
+    in vec3 translate;
+    in float palette_row;
+
+    out vec4 vertex_colors;
+    out vec3 texture_coords;
+    flat out float vertex_palette_row;
+
+    uniform sampler2D pool_table;
+
+    uniform WindowBlock
+    {
+        mat4 projection;
+        mat4 view;
+    } window;
+
+    void main()
+    {
+        vertex_colors = colors;
+        vertex_palette_row = palette_row;
+        int key = int(instance_key);
+        int corner = gl_VertexID;
+        vec4 rect = texelFetch(pool_table, ivec2(0, key), 0);
+        vec4 uv = texelFetch(pool_table, ivec2(1 + corner / 2, key), 0);
+        // Floored once per instance, as the quad path and collision
+        // stamping floor, so draw and planes stay in lockstep.
+        vec2 xy = floor(instance_position) + rect.xy;
+        xy += vec2(corner == 1 || corner == 2, corner >= 2) * rect.zw;
+        gl_Position = window.projection * vec4(xy + translate.xy, translate.z, 1.0);
+        texture_coords = vec3((corner & 1) == 0 ? uv.xy : uv.zw, 0.0);
+    }
@@ -9,6 +9,7 @@ from blitspersecond.input import Pad, Pads, Ports
 from blitspersecond.input.kbm import Keyboard, KeyboardMouse, Mouse
 from blitspersecond.lifecycle import EngineState
 from blitspersecond.loop import Loop
+from blitspersecond.resources import ResourceManager
 from blitspersecond.system import Config, Logger, Metrics, EventBus
 
 
@@ -55,6 +56,11 @@ class BlitsPerSecond(metaclass=SingletonMeta):
 
     def __init__(self):
         self._config = Config()
+        # resources sits below system and never reads Config; its settings
+        # are handed down here, once, as the engine starts.
+        resources = ResourceManager()
+        resources.cache_dir = self._config.resources.cache_dir
+        resources.budget = self._config.resources.budget
         self._logger = Logger()
         self._metrics = Metrics()
         self._events = EventBus()
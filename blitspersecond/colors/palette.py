@@ -1,4 +1,4 @@
-from numpy import uint8, zeros
+from numpy import ndarray, uint8, zeros
 from typing import List, Sequence, Tuple, Optional, Union
 
 
@@ -18,7 +18,7 @@ class Palette:
     def __init__(self, pal: Optional[Sequence[int]] = None) -> None:
         self._palette = zeros((256, 4), dtype=uint8)  # 256 colors, 4 channels (RGBA)
         # Mutation counter: the GPU projection (graphics.internal's
-        # PaletteTexture, palette RAM as a 256x1 texture) re-uploads a
+        # PaletteBank, palette RAM as rows of one texture) re-uploads a
         # palette's row iff this moved -- so a write here is just the array
         # store plus one increment, and the upload happens at most once per
         # changed palette per frame, at the next draw that needs it.
@@ -84,9 +84,16 @@ class Palette:
         table changed without diffing 256 entries."""
         return self._version
 
+    @property
+    def table(self) -> ndarray:
+        """The table itself, a read-only (256, 4) uint8 RGBA view -- what
+        PaletteBank uploads, no copy taken. Writes go through []."""
+        view = self._palette.view()
+        view.flags.writeable = False
+        return view
+
     def tobytes(self) -> bytes:
-        """The table as its raw 1KB RGBA row -- what PaletteTexture uploads.
-        A copy, taken only when an upload actually happens (version-gated)."""
+        """The table as its raw 1KB RGBA row, copied."""
         return self._palette.tobytes()
 
 
@@ -5,7 +5,7 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from typing import cast, Iterator, Optional, Tuple, TYPE_CHECKING
+from typing import cast, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
 
 from blitspersecond.colors import Palette, Pen
 from blitspersecond.graphics.glyph import GlyphLayer
@@ -26,16 +26,26 @@ class Console:
         console = Console(GlyphEngine(CharSet.ASCII8X12))
         console.glyphs.after(background)
 
-    The console adds no rendering state of its own."""
+    The console adds no rendering state of its own. Output can also be
+    queued -- `queue(text)` now, `drain(cells)` once per tick -- so a flood of
+    log lines costs a bounded amount of each frame; `queue_limit` bytes are
+    held at most, and the oldest go first."""
 
     def __init__(
         self,
         glyphs: GlyphLayer,
+        *,
+        queue_limit: int = 64 * 1024,
     ) -> None:
         if not isinstance(glyphs, GlyphLayer):
             raise TypeError(f"expected GlyphLayer, got {type(glyphs)}")
+        if queue_limit <= 0:
+            raise ValueError(f"queue_limit must be positive, got {queue_limit}")
         self._glyphs = glyphs
         self._cursor = Cursor(self._glyphs)
+        self._queue = bytearray()
+        self._queue_limit = queue_limit
+        self._dropped = 0
 
     # -- the composed pieces ------------------------------------------------
 
@@ -137,16 +147,49 @@ class Console:
         Each cell write adopts the current pen."""
         if at is not None:
             self.cursor = at
-        for ch in text:
-            if ch == "\n":
-                self._newline()
-                continue
-            self._glyphs.cell[self._cursor.x, self._cursor.y] = ord(ch)
-            x = self._cursor.x + 1
-            if x >= self.cols:
-                self._newline()
-            else:
-                self._cursor._move(x, self._cursor.y)
+        self.write_bytes(self._encode(text))
+
+    def write_bytes(
+        self,
+        data: bytes,
+        *,
+        at: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        r"""`write()` for raw glyph bytes -- the fast path for bulk output.
+
+        The whole block is laid out first: wrapping and `\n` (byte 10) split
+        it into row runs, the screen scrolls once by however many rows the
+        block overflows, and each surviving run renders as one GlyphLayer
+        write. Rows that would scroll straight off are never drawn at all."""
+        if at is not None:
+            self.cursor = at
+        data = bytes(data)
+        if not data:
+            return
+        cols, rows = self.cols, self.rows
+        x, line = self._cursor.x, 0
+        runs: List[Tuple[int, int, bytes]] = []
+        for i, text in enumerate(data.split(b"\n")):
+            if i:
+                x, line = 0, line + 1
+            start = 0
+            while start < len(text):
+                take = min(cols - x, len(text) - start)
+                runs.append((line, x, text[start : start + take]))
+                start += take
+                x += take
+                if x >= cols:
+                    x, line = 0, line + 1
+
+        top = self._cursor.y
+        scroll = max(0, top + line - (rows - 1))
+        if scroll:
+            self._glyphs.scroll((0, -scroll))
+        for offset, x0, run in runs:
+            y = top + offset - scroll
+            if y >= 0:
+                self._glyphs.write(x0, y, run)
+        self._cursor._move(x, top + line - scroll)
 
     def print(
         self,
@@ -157,6 +200,63 @@ class Console:
         """Write an object's string form, then start a new line."""
         self.write(f"{value}\n", at=at)
 
+    def print_many(
+        self,
+        values: Iterable[object],
+        *,
+        at: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """print() each value, laid out and rendered as one block."""
+        if at is not None:
+            self.cursor = at
+        self.write_bytes(b"".join(self._encode(f"{value}\n") for value in values))
+
+    # -- queued output ----------------------------------------------------------
+
+    def queue(self, text: str | bytes) -> None:
+        """Hold output for drain() instead of drawing it now. Past
+        `queue_limit` bytes the oldest queued output is dropped (and counted
+        in `dropped`): a log flood loses history, never frame time."""
+        data = self._encode(text) if isinstance(text, str) else bytes(text)
+        self._queue += data
+        overflow = len(self._queue) - self._queue_limit
+        if overflow > 0:
+            del self._queue[:overflow]
+            self._dropped += overflow
+
+    def queue_print(self, value: object = "") -> None:
+        """queue() an object's string form and a new line."""
+        self.queue(f"{value}\n")
+
+    def drain(self, cells: int) -> int:
+        """Write at most `cells` queued bytes (a newline counts as one), as one
+        write_bytes() block. Call once per tick; returns how many went."""
+        if cells <= 0 or not self._queue:
+            return 0
+        chunk = bytes(self._queue[:cells])
+        del self._queue[:cells]
+        self.write_bytes(chunk)
+        return len(chunk)
+
+    @property
+    def queued(self) -> int:
+        """Bytes waiting for drain()."""
+        return len(self._queue)
+
+    @property
+    def dropped(self) -> int:
+        """Bytes the bounded queue has discarded so far."""
+        return self._dropped
+
+    @staticmethod
+    def _encode(text: str) -> bytes:
+        try:
+            return text.encode("latin-1")
+        except UnicodeEncodeError as error:
+            raise ValueError(
+                "console text must be Latin-1, one byte per character"
+            ) from error
+
     def echo(self, entry: "Input") -> "Input":
         """Echo a keyboard-owned Input from the current cursor."""
         from blitspersecond.input.kbm.input import Input
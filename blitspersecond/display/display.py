@@ -1,16 +1,20 @@
 from time import perf_counter
 from typing import Optional
 
+import numpy as np
+from PIL import Image as PILImage
 from pyglet.gl import glViewport
 from pyglet.math import Mat4
 
+from blitspersecond.graphics.common import PixelBuffer
+from blitspersecond.graphics.internal import DrawList
 from blitspersecond.system import Config, Logger, EventBus, Metrics
 from blitspersecond.system.monitor.frame_pacing import (
     FramePacingRecorder,
     start_deadline_from_environment,
 )
 
-from .internal import Surface, Framebuffer, PresentationSession
+from .internal import Surface, Framebuffer, LayerCache, PresentationSession
 from .layers import Layers
 
 
@@ -28,6 +32,10 @@ class Display:
             display.height,
         )
         self._layers = Layers()
+        self._layer_cache = LayerCache(display.width, display.height)
+        # The frame's command list: every live layer records into it and it
+        # executes once, binding only what changed between neighbours.
+        self._draws = DrawList()
         self._logger = Logger()
         self._swap_duration = 0.0
 
@@ -79,6 +87,12 @@ class Display:
         left active. Layers are authored at this internal resolution, so the
         projection is a 1:1 ortho over it and the viewport matches it exactly --
         independent of the on-screen window size or scale.
+
+        Layers record their draws into one frame-wide DrawList that executes
+        in painter order with redundant state changes dropped; the counts
+        land in Metrics().draw_calls / state_changes. Cached layers that did
+        not change since the last compose are laid down from their render
+        targets rather than drawn (see Layer.cached).
         """
         fbo = self._framebuffer
         w, h = fbo.width, fbo.height
@@ -88,12 +102,42 @@ class Display:
         fbo.bind()
         self._surface.projection = Mat4.orthogonal_projection(0, w, 0, h, -1, 1)
         glViewport(0, 0, w, h)
-        for layer in self._layers:
-            if layer.enabled:
-                layer._composite()  # drawable syncs GPU state + executes its own batch
+        # Each live layer syncs GPU state + records its batch; still cached
+        # runs are one quad each.
+        self._draws.reset()
+        self._layer_cache.compose(self._layers, fbo, self._draws)
         fbo.unbind()
         # Compose cost only -- excludes the post-process draw + vsync/present.
-        Metrics().render.push(perf_counter() - start)
+        metrics = Metrics()
+        metrics.render.push(perf_counter() - start)
+        metrics.upload.push(PixelBuffer.take_upload_time())
+        metrics.draw_calls.push(self._draws.draw_calls)
+        metrics.state_changes.push(self._draws.state_changes)
+
+    @property
+    def headless(self) -> bool:
+        """Rendering offscreen (BPS_HEADLESS=1): no window, nothing shown --
+        frames are only ever read back through capture()."""
+        return self._surface.headless
+
+    def capture(self) -> np.ndarray:
+        """The last composed frame as a (height, width, 4) uint8 RGBA array,
+        row 0 at the top: the layers as composed, before the presentation
+        pass's CRT look and scaling -- so identical on every machine that
+        composes identically. prepare() first; headless, that is a whole
+        frame. A GPU readback, so tooling only (golden images, benchmarks
+        beside Metrics().render), never the frame path."""
+        return self._framebuffer.read()
+
+    def dump(self, path: str) -> None:
+        """Write capture() to `path` as an RGBA PNG."""
+        PILImage.fromarray(self.capture()).save(path)
+
+    @property
+    def cached_layers(self) -> int:
+        """Layers the last compose laid down from a render cache instead of
+        drawing -- read beside Metrics().render to see what caching saves."""
+        return self._layer_cache.flattened
 
     @property
     def swap_duration(self) -> float:
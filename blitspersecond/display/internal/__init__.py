@@ -3,7 +3,8 @@
 Users never name these -- they meet `Display`, `Layer` and `Layers` from the
 package front door. `Surface` is the pyglet window (and the sole producer of raw
 OS events, teed onto the EventBus); `Framebuffer` is the offscreen FBO the
-layers compose into plus the CRT post-pass that presents it -- both leaf GL
+layers compose into plus the CRT post-pass that presents it, and `LayerCache`
+the render targets still cached layers are flattened into -- all leaf GL
 internals. `PresentationCadence` is the engine's private pacing helper that
 distributes fixed simulation ticks over delivered presentations, while
 `PresentationMonitor` classifies the swap stream's health.
@@ -17,6 +18,7 @@ belongs to `blitspersecond.loop`.
 
 from .surface import Surface
 from .framebuffer import Framebuffer
+from .layer_cache import LayerCache
 from .presentation.cadence import PresentationCadence
 from .presentation.health import FlipHealth, PresentationMonitor
 from .presentation.path import PresentationPath, detect_presentation_path
@@ -25,6 +27,7 @@ from .presentation.session import PresentationSession
 __all__ = [
     "Surface",
     "Framebuffer",
+    "LayerCache",
     "PresentationCadence",
     "FlipHealth",
     "PresentationMonitor",
@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING
 
+import numpy as np
 import pyglet
 import pyglet.image.buffer
 
@@ -51,6 +52,26 @@ class Framebuffer(pyglet.image.buffer.Framebuffer):
         pyglet.gl.glClear(pyglet.gl.GL_COLOR_BUFFER_BIT)
         self.unbind()
 
+    def read(self) -> np.ndarray:
+        """The composed pixels as (height, width, 4) uint8 RGBA, row 0 the
+        top of the frame (content is GL upside-down everywhere, so GL row 0
+        IS the top). A GPU readback: waits for every queued draw."""
+        pixels = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        self.bind()
+        pyglet.gl.glPixelStorei(pyglet.gl.GL_PACK_ALIGNMENT, 1)
+        pyglet.gl.glReadPixels(
+            0,
+            0,
+            self.width,
+            self.height,
+            pyglet.gl.GL_RGBA,
+            pyglet.gl.GL_UNSIGNED_BYTE,
+            pixels.ctypes.data,
+        )
+        pyglet.gl.glPixelStorei(pyglet.gl.GL_PACK_ALIGNMENT, 4)
+        self.unbind()
+        return pixels
+
     def draw(self, surface: "Surface") -> None:
         self.unbind()
         w, h = surface.get_size()
@@ -0,0 +1,168 @@
+# Render caching for the compositor. A Layer that opts in (`layer.cached`)
+# and whose version has not moved since the last compose is not drawn: it
+# joins a run of such layers, the run is composed ONCE into an offscreen
+# target, and every later frame lays that target back with one quad. A
+# still parallax stack therefore costs a texture read per pixel instead of
+# its background fills, palette binds and tile batches. Layers that did
+# change are drawn live that frame -- re-rendering a cache every frame would
+# only add a pass -- and rejoin a run the frame after they settle.
+#
+# Exactness rests on the blend: the engines blend colour SRC_ALPHA /
+# ONE_MINUS_SRC_ALPHA but alpha ONE / ONE_MINUS_SRC_ALPHA, so a run composed
+# over transparent black holds premultiplied colour and true coverage, and
+# laying it down with ONE / ONE_MINUS_SRC_ALPHA gives what drawing its
+# layers one by one would have -- faded layers included.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import pyglet
+import pyglet.image.buffer
+
+from blitspersecond.graphics.internal import DrawList, Shader
+
+if TYPE_CHECKING:
+    from ..layer import Layer
+
+# One run's identity: which layers, at which versions. A target is reused
+# as long as its run comes back with the same key.
+_RunKey = Tuple[Tuple[str, Hashable], ...]
+
+
+def plan_runs(layers: Iterable["Layer"]) -> List[Tuple[bool, List["Layer"]]]:
+    """Split the enabled layers, in draw order, into `(cached, run)` pairs:
+    consecutive cached layers still at the version they were last composed
+    at form one flattened run; every other layer is a live run of one."""
+    plan: List[Tuple[bool, List["Layer"]]] = []
+    for layer in layers:
+        if not layer.enabled:
+            continue
+        still = layer.cached and layer._composed == layer.version
+        if still and plan and plan[-1][0]:
+            plan[-1][1].append(layer)
+        else:
+            plan.append((still, [layer]))
+    return plan
+
+
+def _key(run: List["Layer"]) -> _RunKey:
+    return tuple((layer.id, layer.version) for layer in run)
+
+
+class RenderTarget(pyglet.image.buffer.Framebuffer):
+    """One flattened run: an offscreen RGBA colour buffer the size of the
+    compose framebuffer, and the quad that lays it back down."""
+
+    def __init__(self, width: int, height: int) -> None:
+        super().__init__()
+        self._color_buffer = pyglet.image.Texture.create(
+            width,
+            height,
+            internalformat=pyglet.gl.GL_RGBA,
+            min_filter=pyglet.gl.GL_NEAREST,
+            mag_filter=pyglet.gl.GL_NEAREST,
+        )
+        self.attach_texture(
+            self._color_buffer,
+            attachment=pyglet.gl.GL_COLOR_ATTACHMENT0,
+        )
+        self.key: Optional[_RunKey] = None
+        self._shader = Shader.get("layer_cache", "layer_cache")
+        self._batch = pyglet.graphics.Batch()
+        # Built once: the quad never changes, only the texture behind it.
+        self._quad = self._shader.program.vertex_list_indexed(
+            count=4,
+            mode=pyglet.gl.GL_TRIANGLES,
+            indices=self._shader.indices,
+            batch=self._batch,
+            in_position=("f", self._shader.vertices),
+            in_tex_coords=("f", self._shader.tex_coords),
+        )
+
+    def render(self, run: List["Layer"], draws: DrawList) -> None:
+        """Compose `run` into this target (over transparent black). Leaves
+        the default framebuffer bound -- the caller re-binds its own."""
+        self.bind()
+        pyglet.gl.glClearColor(0.0, 0.0, 0.0, 0.0)
+        pyglet.gl.glClear(pyglet.gl.GL_COLOR_BUFFER_BIT)
+        for layer in run:
+            layer._record(draws)
+        draws.flush()
+        self.unbind()
+        self.key = _key(run)
+
+    def draw(self, draws: DrawList) -> None:
+        """Lay the cached run into whatever framebuffer is bound. Counted in
+        `draws` like any other draw: program, texture and blend, one call."""
+        program = self._shader.program
+        program.use()
+        program["texture1"] = 0
+        pyglet.gl.glActiveTexture(pyglet.gl.GL_TEXTURE0)
+        pyglet.gl.glBindTexture(pyglet.gl.GL_TEXTURE_2D, self._color_buffer.id)
+        pyglet.gl.glEnable(pyglet.gl.GL_BLEND)
+        pyglet.gl.glBlendFunc(pyglet.gl.GL_ONE, pyglet.gl.GL_ONE_MINUS_SRC_ALPHA)
+        self._quad.draw(pyglet.gl.GL_TRIANGLES)
+        pyglet.gl.glDisable(pyglet.gl.GL_BLEND)
+        program.stop()
+        draws.draw_calls += 1
+        draws.state_changes += 3
+
+    def delete(self) -> None:
+        self._quad.delete()
+        super().delete()
+
+
+class LayerCache:
+    """The compositor's set of render targets, one per flattened run,
+    matched to runs by key from frame to frame. Targets whose run did not
+    come back are recycled for new runs, and freed once nothing wants
+    them."""
+
+    def __init__(self, width: int, height: int) -> None:
+        self._width = width
+        self._height = height
+        self._targets: List[RenderTarget] = []
+        self._flattened = 0
+
+    @property
+    def flattened(self) -> int:
+        """Layers the last compose drew from a cache instead of live."""
+        return self._flattened
+
+    def compose(
+        self, layers: Iterable["Layer"], framebuffer, draws: DrawList
+    ) -> None:
+        """Draw `layers` into `framebuffer` (already bound, cleared and
+        projected), flattening every still cached run. Live layers between
+        cached runs are recorded into `draws` and executed together."""
+        plan = plan_runs(layers)
+        reusable: Dict[_RunKey, RenderTarget] = {
+            t.key: t for t in self._targets if t.key is not None
+        }
+        matched = [
+            reusable.pop(_key(run), None) if still else None for still, run in plan
+        ]
+        spare = list(reusable.values())
+        self._targets = []
+        self._flattened = 0
+        for (still, run), target in zip(plan, matched):
+            if not still:
+                run[0]._record(draws)
+            else:
+                # Painter order: the live layers below go down first.
+                draws.flush()
+                if target is None:
+                    target = spare.pop() if spare else RenderTarget(
+                        self._width, self._height
+                    )
+                    target.render(run, draws)
+                    framebuffer.bind()
+                target.draw(draws)
+                self._targets.append(target)
+                self._flattened += len(run)
+            for layer in run:
+                layer._composed = layer.version
+        draws.flush()
+        for target in spare:
+            target.delete()
@@ -34,9 +34,18 @@ class Surface(pyglet.window.Window):
         presentation_path = detect_presentation_path()
         self._tracks_window_output = presentation_path.name == "win32"
         self._refresh_check_needed = False
+        # Offscreen (pyglet's EGL backend, see blitspersecond.__init__):
+        # nothing is ever shown, so the surface is just the logical frame,
+        # unscaled, unpaced and never fullscreen.
+        self._headless = bool(pyglet.options["headless"])
 
         screen = pyglet.display.get_display().get_default_screen()
-        if display.fullscreen:
+        if self._headless:
+            width = self._width
+            height = self._height
+            style = self.WINDOW_STYLE_DEFAULT
+            visible = False
+        elif display.fullscreen:
             # "Fullscreen" is deliberately borderless at the active desktop
             # mode. Passing fullscreen=True together with BPS's logical size
             # makes pyglet call ChangeDisplaySettingsEx on Windows, selecting
@@ -62,11 +71,11 @@ class Surface(pyglet.window.Window):
             # does not: a narrowly missed Mutter vblank otherwise costs a full
             # extra refresh, so PresentationSession owns a monotonic deadline
             # grid there just as it does for the validated Gamescope path.
-            vsync=presentation_path.requests_vsync,
+            vsync=presentation_path.requests_vsync and not self._headless,
             config=pyglet.gl.Config(double_buffer=True),
         )
         self.set_caption("BlitsPerSecond")
-        if display.fullscreen:
+        if display.fullscreen and not self._headless:
             self.set_location(screen.x, screen.y)
             self.set_visible(True)
         self.switch_to()  # activate the context early
@@ -85,6 +94,10 @@ class Surface(pyglet.window.Window):
     def closed(self):
         return self._closed
 
+    @property
+    def headless(self) -> bool:
+        return self._headless
+
     @property
     def refresh_rate(self) -> float | None:
         return self._refresh_rate
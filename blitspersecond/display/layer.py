@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Hashable, Optional
 from uuid import uuid4
 
 
@@ -7,7 +7,8 @@ class Layer:
     content that place shows. Engines produce Layers (TileLayer, SpriteLayer,
     GlyphLayer): one object is both the thing you draw with and where it
     sits. The base class owns only the compositing concerns -- enabled, tag,
-    stack position; blend/opacity/offset later.
+    stack position, the content version and render caching; blend/opacity/
+    offset later.
 
     You don't construct these directly -- the engine factories hand them out,
     already in the order. Reorder fluently: `layer.after(hud)`,
@@ -19,6 +20,13 @@ class Layer:
         self._enabled: bool = True
         self._tag: Optional[str] = tag
         self._layers = None  # back-reference, set by Layers.add
+        # Content version: bumped by _changed(); engines fold their buffers'
+        # and palettes' own counters in on top (see .version).
+        self._version: int = 0
+        self._cached: bool = False
+        # The version this layer showed when it was last composed -- set by
+        # the compositor, so "unchanged" means "since the last frame".
+        self._composed: Optional[Hashable] = None
 
     @property
     def id(self) -> str:
@@ -35,6 +43,35 @@ class Layer:
             raise ValueError("enabled must be a boolean")
         self._enabled = value
 
+    @property
+    def version(self) -> Hashable:
+        """A token that changes whenever this layer's picture may have:
+        stamps, scroll, palette, tint, pixel edits. Compare it for equality,
+        never order -- engines return a tuple that folds in the counters of
+        the buffers and palettes they draw from, which change behind the
+        layer's back."""
+        return self._version
+
+    def _changed(self) -> None:
+        """Record that this layer's own state moved its picture."""
+        self._version += 1
+
+    @property
+    def cached(self) -> bool:
+        """Opt in to render caching. While a cached layer's version holds
+        still, the compositor stops drawing it and draws a texture of it
+        instead; consecutive unchanged cached layers share one texture, so a
+        parallax stack that sits still costs one quad. A changed layer is
+        drawn live that frame and re-cached once it settles. Off by default:
+        a layer that changes every frame would only pay for the texture."""
+        return self._cached
+
+    @cached.setter
+    def cached(self, value: bool) -> None:
+        if not isinstance(value, bool):
+            raise ValueError("cached must be a boolean")
+        self._cached = value
+
     @property
     def tag(self) -> Optional[str]:
         return self._tag
@@ -84,11 +121,20 @@ class Layer:
             self._layers._to_front(self)
         return self
 
+    def _record(self, draws) -> None:
+        """Append this layer's draws to the frame's DrawList, in painter
+        order. Called once per frame by the compositor, which executes the
+        whole frame's list while the FBO + projection are bound. Subclasses
+        ARE the content and override this; the bare base records nothing."""
+
     def _composite(self) -> None:
-        """Draw this layer's content into the current framebuffer. Called once
-        per frame by the compositor while the FBO + projection are bound.
-        Subclasses ARE the content and override this; the bare base draws
-        nothing."""
+        """Draw this layer alone into the current framebuffer: record, then
+        execute at once."""
+        from blitspersecond.graphics.internal import DrawList
+
+        draws = DrawList()
+        self._record(draws)
+        draws.flush()
 
     def __str__(self) -> str:
         return f"id: {self._id} [{self._tag}]"
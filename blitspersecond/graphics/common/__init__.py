@@ -6,6 +6,8 @@ from .collision_query import (
     Collidable,
     CollisionQuery,
     PlaneCollidable,
+    stamp_pattern,
+    warm_stamp_kernel,
 )
 from .pixelbuffer import PixelBuffer
 
@@ -18,4 +20,6 @@ __all__ = [
     "CollisionQuery",
     "PlaneCollidable",
     "PixelBuffer",
+    "stamp_pattern",
+    "warm_stamp_kernel",
 ]
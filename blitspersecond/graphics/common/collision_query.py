@@ -8,9 +8,11 @@ questions are independent of the number of tiles or sprite instances that
 were stamped into them.
 """
 
+from functools import lru_cache
 from typing import Optional, Protocol, Tuple, runtime_checkable
 
 import numpy as np
+from numba import njit
 
 # Collision mask word size. Masks pack 1 bit per pixel along x: pixel x lives
 # at bit (x & 31) of word (x >> 5), little bit-order -- the same layout
@@ -60,6 +62,84 @@ def _edge_words(x0: int, x1: int) -> Tuple[int, int, CWORD, CWORD]:
     last = CWORD((1 << (((x1 - 1) & (CWORD_BITS - 1)) + 1)) - 1)
     return j0, j1, first, last
 
+
+@njit(cache=True)
+def stamp_pattern(flat, base, offsets, pattern, stride):
+    """OR one uint64 row pattern into a packed mask at many placements:
+    `flat` is the mask's (C-contiguous) storage raveled, `stride` its
+    words per row, and placement i starts at flat word `base[i]`, shifted
+    up `offsets[i]` bits (its x & 31). Each shifted word splits low/high
+    across two mask words. The caller guarantees every placement, plus
+    that carry word, lies inside the mask -- there is no clipping here.
+    Overlapping placements simply OR, in order."""
+    height, span = pattern.shape
+    for i in range(base.shape[0]):
+        shift = offsets[i]
+        for dy in range(height):
+            at = base[i] + dy * stride
+            for k in range(span):
+                source = pattern[dy, k]
+                if source == 0:
+                    continue  # a transparent stretch of the row
+                shifted = source << shift
+                flat[at + k] |= np.uint32(shifted & CLOW)
+                flat[at + k + 1] |= np.uint32(shifted >> np.uint64(CWORD_BITS))
+
+
+@lru_cache(maxsize=1)
+def warm_stamp_kernel():
+    """Compile (or load from numba's cache) stamp_pattern before the first
+    collision rebuild -- the sprite and tile masks call this as they are
+    constructed."""
+    flat = np.zeros(4, dtype=CWORD)
+    at = np.zeros(1, dtype=np.intp)
+    offsets = np.zeros(1, dtype=np.uint64)
+    stamp_pattern(flat, at, offsets, np.zeros((1, 1), dtype=np.uint64), 2)
+
+
+@njit(cache=True)
+def _boxes_any(ma, mb, boxes, rows, words, hits):
+    """_masks_at's windowed AND for each (x, y, w, h) row of `boxes`, into
+    `hits`: the same clip, the same _edge_words trims, and a box stops at
+    its first overlapping word."""
+    width = words * CWORD_BITS
+    for i in range(boxes.shape[0]):
+        x0 = max(boxes[i, 0], 0)
+        y0 = max(boxes[i, 1], 0)
+        x1 = min(boxes[i, 0] + boxes[i, 2], width)
+        y1 = min(boxes[i, 1] + boxes[i, 3], rows)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        j0 = x0 >> CWORD_SHIFT
+        j1 = ((x1 - 1) >> CWORD_SHIFT) + 1
+        first = (0xFFFFFFFF << (x0 & (CWORD_BITS - 1))) & 0xFFFFFFFF
+        last = (1 << (((x1 - 1) & (CWORD_BITS - 1)) + 1)) - 1
+        for row in range(y0, y1):
+            for j in range(j0, j1):
+                c = np.int64(ma[row, j] & mb[row, j])
+                if j == j0:
+                    c &= first
+                if j == j1 - 1:
+                    c &= last
+                if c:
+                    hits[i] = True
+                    break
+            if hits[i]:
+                break
+
+
+@lru_cache(maxsize=1)
+def _warm_boxes_kernel():
+    """Compile (or load from numba's cache) the batch kernel for both mask
+    layouts it meets -- whole arrays (tile, glyph) and the apron-cropped
+    views sprite planes hand out -- once, on the first batch asked."""
+    mask = np.zeros((2, 2), dtype=CWORD)
+    box = np.zeros((1, 4), dtype=np.int64)
+    hit = np.zeros(1, dtype=np.bool_)
+    _boxes_any(mask, mask, box, 2, 2, hit)
+    _boxes_any(mask[:, :1], mask[:, :1], box, 2, 1, hit)
+
+
 class CollisionQuery:
     """One prepared pairwise collision question between two collidable
     drawables (from their collides_with()) -- ask it with .at().
@@ -102,6 +182,24 @@ class CollisionQuery:
         mb = self._mask(self._b, self._theirs)
         return self._masks_at(ma, mb, x, y, w, h)
 
+    def at_many(self, boxes: np.ndarray) -> np.ndarray:
+        """.at() for many boxes at once: `boxes` is an (n, 4) integer array
+        of screen-space (x, y, w, h) rows, the answer an (n,) bool array --
+        each entry exactly what .at() would say for that box. The masks are
+        resolved once and every box is answered in one compiled pass, so a
+        few thousand hitbox questions a tick cost their words, not their
+        calls."""
+        ma = self._mask(self._a, self._mine)
+        mb = self._mask(self._b, self._theirs)
+        return self._masks_at_many(ma, mb, boxes)
+
+    def sides(self) -> Tuple[Optional[Tuple[str, ...]], np.ndarray]:
+        """The question split for a caller that attributes the answer
+        itself (SpritePool.hits): our selected plane names (None = the
+        default silhouette) and the other participant's selected mask,
+        resolved now."""
+        return self._mine, self._mask(self._b, self._theirs)
+
     @staticmethod
     def _mask(participant, planes) -> np.ndarray:
         selected = getattr(participant, "collision_mask_for", None)
@@ -134,3 +232,14 @@ class CollisionQuery:
         c[:, 0] &= first
         c[:, -1] &= last
         return bool(c.any())
+
+    @staticmethod
+    def _masks_at_many(ma, mb, boxes) -> np.ndarray:
+        """_masks_at over a batch, compiled (see _boxes_any)."""
+        _warm_boxes_kernel()
+        boxes = np.ascontiguousarray(boxes, dtype=np.int64).reshape(-1, 4)
+        hits = np.zeros(len(boxes), dtype=np.bool_)
+        rows = min(ma.shape[0], mb.shape[0])
+        words = min(ma.shape[1], mb.shape[1])
+        _boxes_any(ma, mb, boxes, rows, words, hits)
+        return hits
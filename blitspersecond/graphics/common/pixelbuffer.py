@@ -1,14 +1,22 @@
 import itertools
 from contextlib import contextmanager
-from typing import Iterator, Optional
+from time import perf_counter
+from typing import Iterator, List, Optional, Tuple
 
 import numpy as np
 from pyglet.gl import GL_NEAREST
-from pyglet.image import ImageData, Texture
+from pyglet.image import Texture
 
 from blitspersecond.common import Size
+from blitspersecond.graphics.internal import PixelUnpackRing, upload_region
 from blitspersecond.resources import ImageSpec, Palette
 
+# Past this fraction of the buffer (summed over the dirty rects, overlaps
+# counted twice) one whole upload beats several partial ones; so does a
+# pile-up of more rects than this.
+_FULL_UPLOAD_COVERAGE = 0.5
+_MAX_DIRTY_RECTS = 32
+
 
 class PixelBuffer:
     """The pixel data primitive -- owns one image's full data lifecycle in both
@@ -25,14 +33,19 @@ class PixelBuffer:
 
     The numpy buffer is the source of truth; the texture is a lazy, dirty-gated
     projection of it (created on first .texture access, re-uploaded only when
-    .dirty). Never read back from the GPU.
+    .dirty). Never read back from the GPU. Dirt can be partial: mark_dirty()
+    and edit(rect) name the rectangles that changed, and only those travel.
     """
 
     # Monotonic, process-wide atlas ids -- a Tile carries one to name the texture
     # it samples, and the TileCache groups tiles by it (see .tile / reclaim).
     _ids = itertools.count()
 
-    def __init__(self, spec: ImageSpec) -> None:
+    # Seconds every buffer has spent uploading since the compositor last
+    # took them (see take_upload_time): it owns the metrics and the frame.
+    _upload_time: float = 0.0
+
+    def __init__(self, spec: ImageSpec, streaming: Optional[bool] = None) -> None:
         if not isinstance(spec, ImageSpec):
             raise TypeError(f"expected ImageSpec, got {type(spec)}")
         self._mode = spec.mode
@@ -44,6 +57,15 @@ class PixelBuffer:
         self._pixels: np.ndarray = np.array(spec.data)
         self._texture: Optional[Texture] = None
         self._dirty: bool = False
+        # What the next upload must carry while dirty: (x, y, w, h) rects in
+        # pixel space, or None for the whole buffer.
+        self._dirty_rects: Optional[List[Tuple[int, int, int, int]]] = None
+        # Counts every change the texture will be told about (see .version).
+        self._version: int = 0
+        # Streaming mode: uploads go whole, through a ring of pixel-unpack
+        # buffers built on first upload (see .streaming).
+        self._streaming: bool = spec.streaming if streaming is None else bool(streaming)
+        self._ring: Optional[PixelUnpackRing] = None
         # Collision mask (source space, indexed surfaces only): (h, w) bool,
         # lazily built like .texture and rebuilt only when pixels changed
         # since the last read. Separate flag from _dirty because the two
@@ -64,7 +86,8 @@ class PixelBuffer:
     @property
     def pixels(self) -> np.ndarray:
         """The mutable CPU pixel buffer (row 0 = top). numpy writes can't be
-        observed, so set .dirty = True after drawing (or use .edit())."""
+        observed, so set .dirty = True after drawing (or use .edit()), or
+        mark_dirty() just the rectangle you touched."""
         return self._pixels
 
     @property
@@ -73,17 +96,77 @@ class PixelBuffer:
 
     @dirty.setter
     def dirty(self, value: bool) -> None:
+        """True marks the whole buffer; False forgets every pending rect."""
         self._dirty = bool(value)
+        self._dirty_rects = None
         if self._dirty:
             self._mask_dirty = True
+            self._version += 1
+
+    def mark_dirty(self, x: int, y: int, w: int, h: int) -> None:
+        """Mark one pixel rectangle changed. The next upload carries the union
+        of marked rects rather than the whole buffer -- unless together they
+        cover enough of it that one full upload is cheaper. Clipped to the
+        buffer; an empty rect is a no-op."""
+        width, height = self._size
+        x0, y0 = max(int(x), 0), max(int(y), 0)
+        x1, y1 = min(int(x) + int(w), width), min(int(y) + int(h), height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self._mask_dirty = True
+        self._version += 1
+        if not self._dirty:
+            self._dirty_rects = []
+        rects = self._dirty_rects
+        if rects is None:
+            return  # already wholly dirty
+        rects.append((x0, y0, x1 - x0, y1 - y0))
+        self._dirty = True
+
+    @property
+    def version(self) -> int:
+        """Bumped by every dirty mark and palette swap -- how a layer drawing
+        from this buffer learns its picture changed without being told. (The
+        palette's own in-place edits are counted by Palette.version.)"""
+        return self._version
 
     @contextmanager
-    def edit(self) -> Iterator[np.ndarray]:
-        """Draw inside `with buffer.edit() as px:` -- marks dirty on exit."""
+    def edit(
+        self, rect: Optional[Tuple[int, int, int, int]] = None
+    ) -> Iterator[np.ndarray]:
+        """Draw inside `with buffer.edit() as px:` -- marks dirty on exit.
+
+        `with buffer.edit((x, y, w, h)) as px:` yields just that region's view
+        (a Rect or any 4-tuple, clipped to the buffer) and marks only it."""
+        if rect is None:
+            try:
+                yield self._pixels
+            finally:
+                self.dirty = True
+            return
+        x, y, w, h = (int(v) for v in rect)
+        x0, y0 = max(x, 0), max(y, 0)
         try:
-            yield self._pixels
+            yield self._pixels[y0 : max(y + h, y0), x0 : max(x + w, x0)]
         finally:
-            self.dirty = True
+            self.mark_dirty(x, y, w, h)
+
+    @property
+    def streaming(self) -> bool:
+        """Upload through a ring of pixel-unpack buffers instead of straight
+        from system RAM. For buffers redrawn every tick -- full-screen
+        procedural effects -- where the synchronous copy stalls the frame:
+        the texture update becomes an asynchronous DMA and this tick's write
+        overlaps the GPU still reading the last one. Streaming uploads always
+        carry the whole buffer, so leave it off for mostly-static buffers
+        that change a rect at a time. Defaults to the spec's hint."""
+        return self._streaming
+
+    @streaming.setter
+    def streaming(self, value: bool) -> None:
+        self._streaming = bool(value)
+        if not self._streaming:
+            self._ring = None
 
     @property
     def texture(self) -> Texture:
@@ -103,19 +186,47 @@ class PixelBuffer:
         return self._texture
 
     def _upload(self) -> None:
-        """One-directional: CPU buffer -> GPU. .tobytes() only happens here,
-        gated by dirty -- once per change, not per frame."""
-        width, height = self._size
-        data = ImageData(
-            width=width,
-            height=height,
-            fmt=self._fmt,
-            data=np.ascontiguousarray(self._pixels).tobytes(),
-            pitch=None,
-        )
-        assert self._texture is not None
-        self._texture.blit_into(data, 0, 0, 0)
+        """One-directional: CPU buffer -> GPU, gated by dirty -- once per
+        change, not per frame. Either the whole buffer or each dirty rect, by
+        glTexSubImage2D straight from the array into the existing texture
+        (see upload_region); a streaming buffer goes whole through its unpack
+        ring. Timed into take_upload_time()."""
+        start = perf_counter()
+        if self._streaming:
+            assert self._texture is not None
+            if self._ring is None:
+                self._ring = PixelUnpackRing(self._pixels.nbytes)
+            self._ring.upload(self._texture, self._pixels, self._fmt)
+        else:
+            width, height = self._size
+            rects = self._dirty_rects if self._dirty else None
+            if rects is None or (
+                len(rects) > _MAX_DIRTY_RECTS
+                or sum(w * h for _, _, w, h in rects)
+                >= _FULL_UPLOAD_COVERAGE * width * height
+            ):
+                rects = [(0, 0, width, height)]
+            for x, y, w, h in rects:
+                self._upload_rect(x, y, w, h)
         self._dirty = False
+        self._dirty_rects = None
+        PixelBuffer._upload_time += perf_counter() - start
+
+    @staticmethod
+    def take_upload_time() -> float:
+        """Seconds spent uploading, across every PixelBuffer, since the last
+        call -- which zeroes the tally."""
+        seconds, PixelBuffer._upload_time = PixelBuffer._upload_time, 0.0
+        return seconds
+
+    def _upload_rect(self, x: int, y: int, w: int, h: int) -> None:
+        # Rows stay in buffer order (content is GL upside-down everywhere), so
+        # pixel row y lands on texture row y. Every rect -- a full-width band
+        # or a glyph cell -- goes straight from the buffer's memory: the view
+        # keeps the buffer's row pitch and the upload honours it.
+        assert self._texture is not None
+        region = self._pixels[y : y + h, x : x + w]
+        upload_region(self._texture, region, x, y, self._fmt)
 
     # -- identity / metadata ---------------------------------------------
 
@@ -157,7 +268,7 @@ class PixelBuffer:
     def palette(self) -> Optional[Palette]:
         # The stored instance (None if this buffer isn't indexed), never a fresh
         # copy. _composite() reads this every frame per layer -- but only when
-        # `indexed` -- so a rebuilt throwaway would defeat PaletteTexture's
+        # `indexed` -- so a rebuilt throwaway would defeat PaletteBank's
         # identity memo (and once cost ~2.4ms/call rebuilding the table).
         # Same instance -> same GPU palette row.
         return self._palette
@@ -170,6 +281,7 @@ class PixelBuffer:
         if not isinstance(value, Palette):
             raise TypeError(f"expected Palette, got {type(value)}")
         self._palette = value
+        self._version += 1
 
     @property
     def mask(self) -> np.ndarray:
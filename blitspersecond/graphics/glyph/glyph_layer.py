@@ -5,7 +5,7 @@ from __future__ import annotations
 from enum import Enum
 from operator import index
 from pathlib import Path
-from typing import Optional
+from typing import Hashable, Optional
 
 import numpy as np
 from pyglet.image import Texture
@@ -14,6 +14,7 @@ from blitspersecond.colors import MagicPen, Palette, Pen, system_palette
 from blitspersecond.common import Size
 from blitspersecond.display.layer import Layer
 from blitspersecond.graphics.common import CWORD, Collidable, CollisionQuery, PixelBuffer
+from blitspersecond.graphics.internal import DrawList
 from blitspersecond.graphics.tile import TileLayer
 from blitspersecond.resources import ImageSpec, load_image_spec
 from blitspersecond.system.config import Config
@@ -256,6 +257,9 @@ class GlyphLayer(Layer):
 
     @pen.setter
     def pen(self, value: Pen | MagicPen) -> None:
+        self._pen = self._checked_pen(value)
+
+    def _checked_pen(self, value: Pen | MagicPen) -> Pen | MagicPen:
         if isinstance(value, MagicPen):
             if value.size != (self._char_width, self._char_height):
                 raise ValueError(
@@ -264,7 +268,7 @@ class GlyphLayer(Layer):
                 )
         elif not isinstance(value, Pen):
             raise TypeError(f"pen must be a Pen or MagicPen, got {type(value)}")
-        self._pen = value
+        return value
 
     @property
     def cell(self) -> _CellAccess:
@@ -300,52 +304,120 @@ class GlyphLayer(Layer):
         if x == 0 and y == 0:
             return
 
-        src_x0 = max(-x, 0)
-        src_x1 = self._cols - max(x, 0)
-        src_y0 = max(-y, 0)
-        src_y1 = self._rows - max(y, 0)
-
         gw = self._char_width
         gh = self._char_height
-
-        if src_x0 < src_x1 and src_y0 < src_y1:
-            chars = self._chars[src_x0:src_x1, src_y0:src_y1].copy()
-            # Colour moves in pixels, because that is how it is stored -- the
-            # slab of a moved cell travels intact, whatever is inside it.
-            colours = self._colours[
-                src_y0 * gh : src_y1 * gh, src_x0 * gw : src_x1 * gw
-            ].copy()
+        cols, rows = self._cols, self._rows
+        # What survives the move keeps its rendered pixels: characters, colour
+        # slabs and the picture itself all slide by the same amount, in place,
+        # and only the exposed strips are painted and rendered afresh.
+        if abs(x) < cols and abs(y) < rows:
+            src_x = slice(max(-x, 0), cols - max(x, 0))
+            src_y = slice(max(-y, 0), rows - max(y, 0))
+            dst_x = slice(max(x, 0), cols - max(-x, 0))
+            dst_y = slice(max(y, 0), rows - max(-y, 0))
+            self._chars[dst_x, dst_y] = self._chars[src_x, src_y]
+            src = (
+                slice(src_y.start * gh, src_y.stop * gh),
+                slice(src_x.start * gw, src_x.stop * gw),
+            )
+            dst = (
+                slice(dst_y.start * gh, dst_y.stop * gh),
+                slice(dst_x.start * gw, dst_x.stop * gw),
+            )
+            for plane in (self._colours, self._image.pixels):
+                plane[dst] = plane[src]  # numpy buffers the overlap itself
+            # Every surviving pixel moved, so the texture changes everywhere.
+            self._image.dirty = True
+            exposed = []
+            if y > 0:
+                exposed.append((0, 0, cols, y))
+            elif y < 0:
+                exposed.append((0, rows + y, cols, rows))
+            if x > 0:
+                exposed.append((0, dst_y.start, x, dst_y.stop))
+            elif x < 0:
+                exposed.append((cols + x, dst_y.start, cols, dst_y.stop))
         else:
-            chars = None
-            colours = None
-
-        self._chars.fill(0)
-        self._flood()
-
-        if chars is not None and colours is not None:
-            dst_x0 = max(x, 0)
-            dst_y0 = max(y, 0)
-            dst_x1 = dst_x0 + chars.shape[0]
-            dst_y1 = dst_y0 + chars.shape[1]
-            self._chars[dst_x0:dst_x1, dst_y0:dst_y1] = chars
-            self._colours[
-                dst_y0 * gh : dst_y1 * gh, dst_x0 * gw : dst_x1 * gw
-            ] = colours
-
-        self._refresh()
-
-    def _flood(self) -> None:
-        """Repaint every cell's colour with the current pen. A plain pen's four
-        constants broadcast over the whole buffer; a magic pen tiles, one copy
-        per cell -- which is what makes `clear()` under a magic pen come back as
-        a screen of that pen rather than a screen of one stretched copy."""
-        paint = self._pen.paint
+            exposed = [(0, 0, cols, rows)]
+
+        for x0, y0, x1, y1 in exposed:
+            self._chars[x0:x1, y0:y1] = 0
+            self._flood(x0, y0, x1, y1)
+            self._render(x0, y0, x1, y1)
+
+    def write(
+        self,
+        x: int,
+        y: int,
+        data: bytes | str | np.ndarray,
+        pen: Pen | MagicPen | None = None,
+    ) -> None:
+        """Write a run of glyph bytes along row ``y`` from column ``x``.
+
+        The bulk form of ``cell[x, y] = byte``: every cell in the run takes
+        ``pen`` (the current pen if omitted, which is left as it was) and the
+        whole run renders in one gather. ``data`` is bytes, any sequence of
+        byte values, or a str of Latin-1 characters. The run does not wrap;
+        it must fit on the row -- wrapping is the Console's business.
+        """
+        if isinstance(data, str):
+            try:
+                data = data.encode("latin-1")
+            except UnicodeEncodeError as error:
+                raise ValueError(
+                    "glyph text must be Latin-1, one byte per character"
+                ) from error
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            codes = np.frombuffer(data, dtype=np.uint8)
+        else:
+            values = np.asarray(data)
+            if values.ndim != 1 or not (
+                values.size == 0 or np.issubdtype(values.dtype, np.integer)
+            ):
+                raise TypeError("glyph data must be a flat run of byte values")
+            if values.size and (values.min() < 0 or values.max() > 0xFF):
+                raise ValueError("glyph indices must be bytes")
+            codes = values.astype(np.uint8)
+        x, y = index(x), index(y)
+        n = len(codes)
+        if not (0 <= y < self._rows and 0 <= x and x + n <= self._cols):
+            raise ValueError(
+                f"a run of {n} cells at ({x}, {y}) does not fit the "
+                f"{self._cols}x{self._rows} grid"
+            )
+        if n == 0:
+            return
+        paint = (self._pen if pen is None else self._checked_pen(pen)).paint
+
+        self._chars[x : x + n, y] = codes
+        self._flood(x, y, x + n, y + 1, paint)
+        self._render(x, y, x + n, y + 1)
+
+    def _flood(
+        self,
+        x0: int = 0,
+        y0: int = 0,
+        x1: Optional[int] = None,
+        y1: Optional[int] = None,
+        paint=None,
+    ) -> None:
+        """Repaint a block of cells' colour -- all of them by default -- with
+        `paint` (the current pen's if omitted). A plain pen's four constants
+        broadcast over the block; a magic pen tiles, one copy per cell --
+        which is what makes `clear()` under a magic pen come back as a screen
+        of that pen rather than a screen of one stretched copy."""
+        x1 = self._cols if x1 is None else x1
+        y1 = self._rows if y1 is None else y1
+        if paint is None:
+            paint = self._pen.paint
+        gw, gh = self._char_width, self._char_height
+        block = self._colours[y0 * gh : y1 * gh, x0 * gw : x1 * gw]
         if isinstance(paint, np.ndarray):
             # Cell-sized by construction -- the pen setter checked -- so this
             # tiles exactly, no remainder.
-            self._colours[:] = np.tile(paint, (self._rows, self._cols, 1))
+            block[:] = np.tile(paint, (y1 - y0, x1 - x0, 1))
         else:
-            self._colours[:] = paint
+            block[:] = paint
 
     def _paint(self, x: int, y: int, colour) -> None:
         """Fill one cell's colour slab. A four-index pen broadcasts flat across
@@ -357,29 +429,29 @@ class GlyphLayer(Layer):
         ] = colour
 
     def _refresh(self) -> None:
+        self._render(0, 0, self._cols, self._rows)
+
+    def _stamp(self, x: int, y: int) -> None:
+        self._render(x, y, x + 1, y + 1)
+
+    def _render(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        """Re-render a block of cells into the image and mark just its pixels
+        dirty, so the next upload carries the block and not the screen."""
+        gw, gh = self._char_width, self._char_height
         # Cells are (x, y, gh, gw); the image is row-major, so the transpose
         # to (y, gh, x, gw) is where the two orders meet -- once, here. Colour
         # is already screen-shaped, so it takes no part in the reshuffle.
         planes = (
-            self._glyphs[self._chars]
+            self._glyphs[self._chars[x0:x1, y0:y1]]
             .transpose(1, 2, 0, 3)
-            .reshape(self._colours.shape[:2])
+            .reshape((y1 - y0) * gh, (x1 - x0) * gw)
         )
-        self._image.pixels[:] = np.take_along_axis(
-            self._colours, planes[..., None], axis=2
+        top, left = y0 * gh, x0 * gw
+        colours = self._colours[top : y1 * gh, left : x1 * gw]
+        self._image.pixels[top : y1 * gh, left : x1 * gw] = np.take_along_axis(
+            colours, planes[..., None], axis=2
         )[..., 0]
-        self._image.dirty = True
-
-    def _stamp(self, x: int, y: int) -> None:
-        glyph = self._glyphs[self._chars[x, y]]
-        glyph_height, glyph_width = glyph.shape
-        top = y * glyph_height
-        left = x * glyph_width
-        colours = self._colours[top : top + glyph_height, left : left + glyph_width]
-        self._image.pixels[
-            top : top + glyph_height, left : left + glyph_width
-        ] = np.take_along_axis(colours, glyph[..., None], axis=2)[..., 0]
-        self._image.dirty = True
+        self._image.mark_dirty(left, top, (x1 - x0) * gw, (y1 - y0) * gh)
 
     @property
     def collidable(self) -> bool:
@@ -417,12 +489,17 @@ class GlyphLayer(Layer):
     def transparency_index(self) -> Optional[int]:
         return self._image.transparency_index
 
+    @property
+    def version(self) -> Hashable:
+        """The renderer's: every cell write lands in its buffer."""
+        return self._renderer.version
+
     def prepare(self) -> None:
         self._renderer.prepare()
 
-    def _composite(self) -> None:
+    def _record(self, draws: DrawList) -> None:
         if not self._stamped:
             self._renderer.blit(0, 0, 0)
             self._stamped = True
-        self._renderer._composite()
+        self._renderer._record(draws)
 
@@ -11,23 +11,49 @@ Shader is the compiled-program cache the engines and the framebuffer
 post-pass name their programs through (Shader.get(vert, frag)) -- GL
 plumbing, never a user concern.
 
-PaletteTexture is palette RAM's GPU projection: Palette identity -> a 256x1
-texture the INDEXED shader samples on unit 1, upload gated by the palette's
-mutation counter. Engines fetch it per draw; users only ever touch Palette.
+PaletteBank is palette RAM's GPU projection: every live Palette is one row
+of a single 256xN texture the INDEXED shader samples on unit 1, the row
+picked per quad, each row's upload gated by its palette's mutation counter.
+Engines fetch rows and the bank per draw; users only ever touch Palette.
+
+DrawList is the compositor's frame-wide command list: layers record their
+draws (DrawCommand) and the list executes them in painter order, binding only
+the state that changed between neighbours.
+
+PixelUnpackRing is a streaming PixelBuffer's upload path: a ring of pixel-
+unpack buffers the texture update is sourced from, so the copy to the GPU is
+asynchronous. Users only ever set PixelBuffer.streaming.
+
+VertexStream is the same idea for the engines' dynamic vertex data: writes
+land in mapped buffer memory no draw in flight is reading (a fenced ring of
+persistently mapped regions, or an orphaned buffer on older contexts).
+
+upload_region is the plain texture update: glTexSubImage2D straight from an
+ndarray's memory, a sub-rect addressed in place through the unpack row
+length -- no ImageData, no packed copy, no .tobytes().
 
 (TileCache is NOT here: the whole tile system -- Tile, TileAtlas, TileCache,
 TileEngine -- lives together in graphics.tile, which is what keeps this
 package a leaf: nothing in internal imports upward.)
 """
 
-from .palette_texture import PaletteTexture
+from .draw_list import DrawCommand, DrawList
+from .palette_bank import PaletteBank
+from .pixel_unpack_ring import PixelUnpackRing
 from .point import Point
 from .shader import Shader
+from .texture_upload import upload_region
 from .vector import Vector
+from .vertex_stream import VertexStream
 
 __all__ = [
-    "PaletteTexture",
+    "DrawCommand",
+    "DrawList",
+    "PaletteBank",
+    "PixelUnpackRing",
     "Point",
     "Shader",
     "Vector",
+    "VertexStream",
+    "upload_region",
 ]
@@ -0,0 +1,177 @@
+# The compositor's frame-wide command list. Every engine used to issue its
+# own program.use(), blend enable/disable, texture and palette binds,
+# generic-attribute writes and glDrawElements per draw -- twenty layers meant
+# twenty copies of the same state dance, most of it setting what was already
+# set. Now a layer RECORDS its draws (program, VAO, texture, palette, the
+# constant attributes, a quad range) and the compositor executes the whole
+# list in painter order, touching GL state only where a command differs from
+# the one before it. Blending is enabled once per flush, not per draw.
+#
+# Uploads (PixelBuffer.texture, PaletteBank.texture, a batch's tex_coords)
+# happen while recording, so nothing disturbs the bindings mid-flush.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+from pyglet.gl import (
+    GL_BLEND,
+    GL_ONE,
+    GL_ONE_MINUS_SRC_ALPHA,
+    GL_SRC_ALPHA,
+    GL_TEXTURE0,
+    GL_TEXTURE1,
+    GL_TEXTURE2,
+    GL_TRIANGLES,
+    GL_UNSIGNED_INT,
+    glActiveTexture,
+    glBindTexture,
+    glBlendFuncSeparate,
+    glDisable,
+    glDrawElements,
+    glDrawElementsInstanced,
+    glEnable,
+    glVertexAttrib1f,
+    glVertexAttrib2f,
+    glVertexAttrib3f,
+    glVertexAttrib4f,
+)
+
+if TYPE_CHECKING:
+    from pyglet.graphics.shader import ShaderProgram
+    from pyglet.graphics.vertexarray import VertexArray
+    from pyglet.image import Texture
+
+# Generic vertex attributes by component count. Their values are context
+# state keyed by location, not program state -- which is why a colour
+# register survives a program switch and is only rewritten when it differs.
+_ATTRIB = {
+    1: glVertexAttrib1f,
+    2: glVertexAttrib2f,
+    3: glVertexAttrib3f,
+    4: glVertexAttrib4f,
+}
+
+# Every quad is six indices of four bytes in the engines' index buffers.
+_QUAD_INDEX_BYTES = 6 * 4
+
+
+class DrawCommand(NamedTuple):
+    """One glDrawElements over quads [first, first + quads) of `vao` -- or,
+    with `instances`, that range drawn once per instance."""
+
+    program: ShaderProgram
+    vao: VertexArray  # index buffer bound
+    texture: Texture  # unit 0
+    palette: Optional[Texture]  # PaletteBank texture on unit 1, indexed only
+    attrs: Tuple[Tuple[int, Tuple[float, ...]], ...]  # generic (location, values)
+    first: int
+    quads: int
+    table: Optional[Texture] = None  # a pool's lookup table on unit 2
+    instances: int = 0
+
+
+class DrawList:
+    """Draws recorded in painter order, executed with redundant state
+    removed. Counts what it issued -- `draw_calls` and `state_changes`
+    (program, VAO, texture, palette and table binds, attribute writes, the
+    blend set-up) -- across flushes until reset()."""
+
+    def __init__(self) -> None:
+        self._commands: List[DrawCommand] = []
+        self.draw_calls = 0
+        self.state_changes = 0
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def add(self, command: DrawCommand) -> None:
+        if command.quads > 0:
+            self._commands.append(command)
+
+    def reset(self) -> None:
+        """Zero the counters (the compositor does, once a frame)."""
+        self.draw_calls = 0
+        self.state_changes = 0
+
+    def flush(self) -> None:
+        """Execute and forget every recorded command, into whatever
+        framebuffer is bound."""
+        if not self._commands:
+            return
+        program = vao = None
+        texture = palette = table = -1
+        attrs: Dict[int, Tuple[float, ...]] = {}
+        # Sampler units are program state: name each unit once per program.
+        sampling = set()
+        glEnable(GL_BLEND)
+        # Colour blends as ever, alpha accumulates as coverage -- see
+        # display.internal.layer_cache for why.
+        glBlendFuncSeparate(
+            GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA
+        )
+        glActiveTexture(GL_TEXTURE0)
+        changes = 1
+        try:
+            for command in self._commands:
+                if command.program is not program:
+                    program = command.program
+                    program.use()
+                    changes += 1
+                if command.vao is not vao:
+                    vao = command.vao
+                    vao.bind()
+                    changes += 1
+                # Named whether or not the bind below is needed: the bank
+                # is one texture, so the next program still reads unit 1.
+                if command.palette is not None and (id(program), 1) not in sampling:
+                    command.program["palette_texture"] = 1
+                    sampling.add((id(program), 1))
+                if command.table is not None and (id(program), 2) not in sampling:
+                    command.program["pool_table"] = 2
+                    sampling.add((id(program), 2))
+                if command.palette is not None and command.palette.id != palette:
+                    glActiveTexture(GL_TEXTURE1)
+                    glBindTexture(command.palette.target, command.palette.id)
+                    glActiveTexture(GL_TEXTURE0)
+                    palette = command.palette.id
+                    changes += 1
+                if command.table is not None and command.table.id != table:
+                    glActiveTexture(GL_TEXTURE2)
+                    glBindTexture(command.table.target, command.table.id)
+                    glActiveTexture(GL_TEXTURE0)
+                    table = command.table.id
+                    changes += 1
+                if command.texture.id != texture:
+                    glBindTexture(command.texture.target, command.texture.id)
+                    texture = command.texture.id
+                    changes += 1
+                for location, values in command.attrs:
+                    if attrs.get(location) != values:
+                        _ATTRIB[len(values)](location, *values)
+                        attrs[location] = values
+                        changes += 1
+                if command.instances:
+                    glDrawElementsInstanced(
+                        GL_TRIANGLES,
+                        command.quads * 6,
+                        GL_UNSIGNED_INT,
+                        command.first * _QUAD_INDEX_BYTES,
+                        command.instances,
+                    )
+                else:
+                    glDrawElements(
+                        GL_TRIANGLES,
+                        command.quads * 6,
+                        GL_UNSIGNED_INT,
+                        command.first * _QUAD_INDEX_BYTES,
+                    )
+                self.draw_calls += 1
+        finally:
+            self._commands.clear()
+            self.state_changes += changes
+            if vao is not None:
+                vao.unbind()
+            if program is not None:
+                program.stop()
+            glDisable(GL_BLEND)
@@ -0,0 +1,92 @@
+# Palette RAM made literal: every live Palette's GPU projection is one row of
+# a single 256xN RGBA texture the INDEXED shader samples (unit 1), not a
+# 256-vec4 uniform. The uniform cost the engines ~0.15ms PER INDEXED DRAW,
+# every compose, because the shared program has one uniform state and
+# alternating layers stomp each other's table; one texture per palette then
+# cost a bind per palette change, which split sprite runs at every recolour.
+# With every table in one bank, WHICH table is per-quad data -- the
+# `palette_row` vertex attribute (a stream for sprites, a constant register
+# for a tile layer) -- and the bank is bound once for the whole frame.
+
+from __future__ import annotations
+
+import weakref
+from typing import List, Optional
+
+from pyglet.gl import GL_NEAREST
+from pyglet.image import Texture
+
+from blitspersecond.resources import Palette
+
+from .texture_upload import upload_region
+
+# Rows the bank texture starts with; it doubles when full.
+_INITIAL_ROWS = 16
+
+
+class PaletteBank:
+    """Palette identity -> its row in the one bank texture, each row's
+    upload gated by that palette's mutation counter. Rows are handed out on
+    first use (no GL needed) and released when the palette dies, for the
+    next palette to reuse. Identity (not equality) is the key on purpose --
+    sharing a Palette object IS sharing its GPU table, same law as
+    PixelBuffer sharing."""
+
+    _rows: "weakref.WeakKeyDictionary[Palette, int]" = weakref.WeakKeyDictionary()
+    # Per row: the palette living there (weakly), and the version of it the
+    # texture holds (-1 = upload pending).
+    _owners: List[Optional["weakref.ref[Palette]"]] = []
+    _uploaded: List[int] = []
+    _free: List[int] = []
+    _texture: Optional[Texture] = None
+
+    @classmethod
+    def row(cls, palette: Palette) -> int:
+        """The palette's bank row, assigned on first ask. GL-free: the row
+        reaches the texture at the next texture() call."""
+        row = cls._rows.get(palette)
+        if row is not None:
+            return row
+        if cls._free:
+            row = cls._free.pop()
+        else:
+            row = len(cls._owners)
+            cls._owners.append(None)
+            cls._uploaded.append(-1)
+        cls._owners[row] = weakref.ref(palette, lambda _, row=row: cls._release(row))
+        cls._uploaded[row] = -1
+        cls._rows[palette] = row
+        return row
+
+    @classmethod
+    def _release(cls, row: int) -> None:
+        cls._owners[row] = None
+        cls._free.append(row)
+
+    @classmethod
+    def texture(cls) -> Texture:
+        """The bank, current as of every palette's last mutation: grown if
+        rows outran it, stale rows re-uploaded one 1KB row each, straight
+        from the palette's own table. Needs a GL context (draw-time
+        machinery, like PixelBuffer.texture)."""
+        needed = max(len(cls._owners), 1)
+        texture = cls._texture
+        if texture is None or texture.height < needed:
+            height = texture.height if texture is not None else _INITIAL_ROWS
+            while height < needed:
+                height *= 2
+            # A fresh texture starts empty: every row uploads again.
+            texture = cls._texture = Texture.create(
+                256,
+                height,
+                min_filter=GL_NEAREST,
+                mag_filter=GL_NEAREST,
+            )
+            cls._uploaded = [-1] * len(cls._owners)
+        for row, owner in enumerate(cls._owners):
+            palette = owner() if owner is not None else None
+            if palette is None or cls._uploaded[row] == palette.version:
+                continue
+            upload_region(texture, palette.table[None], 0, row, "RGBA")
+            cls._uploaded[row] = palette.version
+        return texture
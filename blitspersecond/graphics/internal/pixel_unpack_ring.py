@@ -0,0 +1,107 @@
+# A streaming PixelBuffer's upload path. The plain path hands glTexSubImage2D
+# a pointer into system RAM, and the driver must finish copying out of it
+# before the call returns -- for a 640x360 RGBA buffer redrawn every tick,
+# that copy is a stall inside the frame. Here the pixels go into a pixel-
+# unpack buffer object instead (orphaned, mapped, written, unmapped) and the
+# texture update is sourced from that PBO, which the driver schedules as a
+# DMA and returns from at once. A small ring of PBOs means this frame's
+# write never lands in the buffer the GPU may still be pulling last frame's
+# pixels out of -- the orphan would already save us, the ring spares the
+# driver the reallocation.
+
+from __future__ import annotations
+
+import ctypes
+from typing import List
+
+import numpy as np
+from pyglet.gl import (
+    GL_MAP_INVALIDATE_BUFFER_BIT,
+    GL_MAP_WRITE_BIT,
+    GL_PIXEL_UNPACK_BUFFER,
+    GL_STREAM_DRAW,
+    GL_UNPACK_ALIGNMENT,
+    GL_UNSIGNED_BYTE,
+    GLintptr,
+    GLsizeiptr,
+    glBindBuffer,
+    glBindTexture,
+    glBufferData,
+    glMapBufferRange,
+    glPixelStorei,
+    glTexSubImage2D,
+    glUnmapBuffer,
+)
+from pyglet.graphics.vertexbuffer import BufferObject
+from pyglet.image import Texture
+
+from .texture_upload import _FORMATS
+
+
+class PixelUnpackRing:
+    """A ring of `depth` pixel-unpack buffers, each one image in size.
+    Creating one needs a current GL context, like the texture it feeds."""
+
+    def __init__(self, nbytes: int, depth: int = 3) -> None:
+        if depth <= 0:
+            raise ValueError(f"ring depth must be positive, got {depth}")
+        self._nbytes = nbytes
+        # BufferObject owns each name's lifetime (freed with the ring).
+        self._buffers: List[BufferObject] = [
+            BufferObject(nbytes, GL_STREAM_DRAW) for _ in range(depth)
+        ]
+        self._head = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffers)
+
+    def upload(self, texture: Texture, pixels: np.ndarray, fmt: str) -> None:
+        """Stream the whole of `pixels` (row 0 = texture row 0) into `texture`
+        through the next buffer in the ring."""
+        pixels = np.ascontiguousarray(pixels)
+        if pixels.nbytes != self._nbytes:
+            raise ValueError(
+                f"ring holds {self._nbytes}-byte images, got {pixels.nbytes}"
+            )
+        height, width = pixels.shape[:2]
+        buffer = self._buffers[self._head]
+        self._head = (self._head + 1) % len(self._buffers)
+
+        pitch = pixels.strides[0]
+        alignment = next(a for a in (8, 4, 2, 1) if pitch % a == 0)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, buffer.id)
+        try:
+            # Orphan, then map write-only with invalidate: the driver never
+            # waits for the old contents.
+            size = GLsizeiptr(self._nbytes)
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, size, None, GL_STREAM_DRAW)
+            target = glMapBufferRange(
+                GL_PIXEL_UNPACK_BUFFER,
+                GLintptr(0),
+                size,
+                GL_MAP_WRITE_BIT | GL_MAP_INVALIDATE_BUFFER_BIT,
+            )
+            if not target:
+                raise RuntimeError("glMapBufferRange could not map the unpack buffer")
+            ctypes.memmove(target, pixels.ctypes.data, self._nbytes)
+            glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+            # With a PBO bound, the "pointer" is an offset into it: zero.
+            glBindTexture(texture.target, texture.id)
+            glPixelStorei(GL_UNPACK_ALIGNMENT, alignment)
+            try:
+                glTexSubImage2D(
+                    texture.target,
+                    0,
+                    0,
+                    0,
+                    width,
+                    height,
+                    _FORMATS[fmt],
+                    GL_UNSIGNED_BYTE,
+                    0,
+                )
+            finally:
+                glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        finally:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
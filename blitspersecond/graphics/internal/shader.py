@@ -22,10 +22,10 @@ class Shader:
     """A compiled program named by its (vert, frag) source pair.
 
     Which programs exist is the ENGINES' business, not a colour-mode table: the
-    tile engine asks for ("default", "indexed") -- palettised only -- the picture
-    engine for ("static", "direct"/"indexed"), the framebuffer post-pass for
-    ("framebuffer", "framebuffer"). This class only fetches, compiles and
-    caches.
+    tile and sprite engines ask for ("blit", "indexed"/"direct") -- the lean
+    axis-aligned quad stage -- the framebuffer post-pass for ("framebuffer",
+    "framebuffer"). ("default", ...) keeps the general scale/rotation stage.
+    This class only fetches, compiles and caches.
     """
 
     # Shared program cache keyed on the source pair: drawables share one
@@ -0,0 +1,70 @@
+# The plain (non-streaming) texture update path. Going through pyglet's
+# ImageData + blit_into costs more than the copy the driver has to make
+# anyway: the pixels are wrapped (a packed copy of a sub-rect first, or a
+# .tobytes() of a whole palette), pyglet may convert them again, and every
+# blit ends in a glFlush. Here the ndarray's own memory is the source --
+# GL_UNPACK_ROW_LENGTH tells the driver how wide the parent buffer's rows
+# are, so a rect is uploaded straight out of the middle of it, no packing.
+
+from __future__ import annotations
+
+import numpy as np
+from pyglet.gl import (
+    GL_RED,
+    GL_RGB,
+    GL_RGBA,
+    GL_UNPACK_ALIGNMENT,
+    GL_UNPACK_ROW_LENGTH,
+    GL_UNSIGNED_BYTE,
+    glBindTexture,
+    glPixelStorei,
+    glTexSubImage2D,
+)
+from pyglet.image import Texture
+
+# PixelBuffer/ImageSpec fmt -> GL pixel format. Indexed buffers are "R".
+_FORMATS = {"R": GL_RED, "RGB": GL_RGB, "RGBA": GL_RGBA}
+
+
+def upload_region(
+    texture: Texture, pixels: np.ndarray, x: int, y: int, fmt: str
+) -> None:
+    """Write `pixels` -- an (h, w) or (h, w, channels) uint8 array, freely a
+    row-strided view into a wider buffer -- into `texture` at (x, y), read
+    straight from the array's memory. Only a view whose pixels are not
+    packed within its rows is copied first. glTexSubImage2D is done with
+    client memory when it returns, so the caller may write at once."""
+    channels = len(fmt)
+    strides = pixels.strides
+    if (
+        strides[1] != channels
+        or (pixels.ndim == 3 and strides[2] != 1)
+        or strides[0] % channels
+        or strides[0] < 0
+    ):
+        pixels = np.ascontiguousarray(pixels)
+        strides = pixels.strides
+    height, width = pixels.shape[:2]
+    pitch = strides[0]
+    # The largest alignment the pitch honours: rows then start exactly
+    # `pitch` bytes apart, which ROW_LENGTH alone would not promise.
+    alignment = next(a for a in (8, 4, 2, 1) if pitch % a == 0)
+    glBindTexture(texture.target, texture.id)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, alignment)
+    glPixelStorei(GL_UNPACK_ROW_LENGTH, pitch // channels)
+    try:
+        glTexSubImage2D(
+            texture.target,
+            0,
+            x,
+            y,
+            width,
+            height,
+            _FORMATS[fmt],
+            GL_UNSIGNED_BYTE,
+            pixels.ctypes.data,
+        )
+    finally:
+        # GL's defaults, which everything else (pyglet included) assumes.
+        glPixelStorei(GL_UNPACK_ROW_LENGTH, 0)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
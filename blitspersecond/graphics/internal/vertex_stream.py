@@ -0,0 +1,233 @@
+# The dynamic vertex streams' upload path. glBufferSubData into a buffer the
+# GPU may still be drawing last frame's quads from makes some drivers wait
+# for that draw before they return, and copies the data through the driver
+# on the way. A VertexStream instead writes the NumPy staging straight into
+# mapped buffer memory that nothing in flight is reading.
+#
+# Where the context has buffer storage (GL 4.4), the buffer is mapped once,
+# persistently, and split into `depth` regions written in turn: a fence
+# placed after each region's draws were issued guards its reuse, and the
+# attribute pointers of every VAO the stream feeds are moved to the region
+# just written. Elsewhere each write orphans the buffer (the driver hands
+# back fresh storage, the old one lives on until its draws finish) and maps
+# it write-only -- same no-wait guarantee, one region, pointers never move.
+
+from __future__ import annotations
+
+import ctypes
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pyglet
+from pyglet.gl import (
+    GL_ARRAY_BUFFER,
+    GL_FLOAT,
+    GL_MAP_COHERENT_BIT,
+    GL_MAP_INVALIDATE_BUFFER_BIT,
+    GL_MAP_PERSISTENT_BIT,
+    GL_MAP_WRITE_BIT,
+    GL_STREAM_DRAW,
+    GL_SYNC_FLUSH_COMMANDS_BIT,
+    GL_SYNC_GPU_COMMANDS_COMPLETE,
+    GL_TIMEOUT_EXPIRED,
+    GLintptr,
+    GLsizeiptr,
+    GLuint,
+    glBindBuffer,
+    glBindVertexArray,
+    glBufferData,
+    glBufferStorage,
+    glClientWaitSync,
+    glDeleteBuffers,
+    glDeleteSync,
+    glFenceSync,
+    glGenBuffers,
+    glMapBufferRange,
+    glUnmapBuffer,
+    glVertexAttribPointer,
+)
+
+# Regions start on this boundary (the strictest mapping alignment in common
+# use), so every region's float data is aligned however the stream is sized.
+_ALIGN = 256
+
+# Past this many outstanding spans a region just takes the one span that
+# covers them all: a cheaper copy than a long walk.
+_MAX_SPANS = 32
+
+# One second per wait, repeated: a region still in flight three frames on
+# means the GPU is that far behind, and waiting is the only correct answer.
+_WAIT_NS = 1_000_000_000
+
+
+class VertexStream:
+    """A vertex buffer rewritten from the start on dirty frames: write()
+    replaces the stream's contents, and the draws recorded after it read
+    what was written. Creating one needs a current GL context; attach() it
+    to a VAO instead of binding it there directly, so the stream can move
+    the attribute to the region in use."""
+
+    def __init__(self, nbytes: int, depth: int = 3) -> None:
+        if depth <= 0:
+            raise ValueError(f"stream depth must be positive, got {depth}")
+        self._nbytes = nbytes
+        context = pyglet.gl.current_context
+        assert context is not None, "a VertexStream needs a current GL context"
+        self._context = context
+        buffer_id = GLuint()
+        glGenBuffers(1, buffer_id)
+        self.id = buffer_id.value
+        # (vao id, location, components) of every attribute fed from here.
+        self._attachments: List[Tuple[int, int, int]] = []
+        self._persistent = self._context.get_info().have_version(4, 4)
+        glBindBuffer(GL_ARRAY_BUFFER, self.id)
+        if self._persistent:
+            self._stride = -(-nbytes // _ALIGN) * _ALIGN
+            size = self._stride * depth
+            flags = GL_MAP_WRITE_BIT | GL_MAP_PERSISTENT_BIT | GL_MAP_COHERENT_BIT
+            glBufferStorage(GL_ARRAY_BUFFER, GLsizeiptr(size), None, flags)
+            mapped = glMapBufferRange(
+                GL_ARRAY_BUFFER, GLintptr(0), GLsizeiptr(size), flags
+            )
+            # Kept as a plain address: regions are offsets added to it.
+            address = ctypes.cast(mapped, ctypes.c_void_p).value
+            if not address:
+                raise RuntimeError("glMapBufferRange could not map the vertex stream")
+            self._mapped: int = address
+            self._fences: List[Optional[object]] = [None] * depth
+        else:
+            self._stride = 0
+            glBufferData(GL_ARRAY_BUFFER, GLsizeiptr(nbytes), None, GL_STREAM_DRAW)
+            self._fences = [None]
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self._region = 0
+        # Per region: the byte spans it is missing since it was last
+        # written (None = all of it), for write_ranges().
+        self._stale: List[Optional[List[Tuple[int, int]]]] = [None] * len(
+            self._fences
+        )
+
+    @property
+    def depth(self) -> int:
+        """Regions the stream rotates through (1 when orphaning)."""
+        return len(self._fences)
+
+    @property
+    def offset(self) -> int:
+        """Byte offset of the region the latest write() went to."""
+        return self._region * self._stride
+
+    def attach(self, vao, location: int, components: int) -> None:
+        """Feed float attribute `location` of `vao` (bound by the caller)
+        from this stream, tightly packed, from the current region on."""
+        glBindBuffer(GL_ARRAY_BUFFER, self.id)
+        glVertexAttribPointer(location, components, GL_FLOAT, False, 0, self.offset)
+        self._attachments.append((vao.id, location, components))
+
+    def write(self, array: np.ndarray) -> None:
+        """Replace the stream's contents with `array` (C-contiguous, at most
+        the stream's size). Never waits on the GPU unless it is a whole
+        ring behind."""
+        self._write(array, None)
+
+    def write_ranges(self, array: np.ndarray, spans: List[Tuple[int, int]]) -> None:
+        """Replace the stream's contents with `array` when only the byte
+        `spans` [start, stop) of it changed since the last write: only
+        those bytes -- plus whatever the next region missed while the
+        others were written -- are copied. An orphaned stream has nothing
+        to keep, so there it is a whole write."""
+        if not self._persistent:
+            self._write(array, None)
+            return
+        for stale in self._stale:
+            if stale is not None:
+                stale.extend(spans)
+                if len(stale) > _MAX_SPANS:
+                    stale[:] = [(min(a for a, _ in stale), max(b for _, b in stale))]
+        self._write(array, spans)
+
+    def _write(self, array: np.ndarray, spans) -> None:
+        nbytes = array.nbytes
+        if nbytes > self._nbytes:
+            raise ValueError(f"stream holds {self._nbytes} bytes, got {nbytes}")
+        if not self._persistent:
+            glBindBuffer(GL_ARRAY_BUFFER, self.id)
+            # Orphan, then map write-only with invalidate: the driver never
+            # waits for the old contents.
+            size = GLsizeiptr(self._nbytes)
+            glBufferData(GL_ARRAY_BUFFER, size, None, GL_STREAM_DRAW)
+            if nbytes:
+                target = glMapBufferRange(
+                    GL_ARRAY_BUFFER,
+                    GLintptr(0),
+                    GLsizeiptr(nbytes),
+                    GL_MAP_WRITE_BIT | GL_MAP_INVALIDATE_BUFFER_BIT,
+                )
+                if not target:
+                    glBindBuffer(GL_ARRAY_BUFFER, 0)
+                    raise RuntimeError(
+                        "glMapBufferRange could not map the vertex stream"
+                    )
+                ctypes.memmove(target, array.ctypes.data, nbytes)
+                glUnmapBuffer(GL_ARRAY_BUFFER)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            return
+        # Everything drawn so far read the current region: fence it, then
+        # move on to the next, waiting only if its own fence is unsignalled.
+        previous = self._region
+        self._fences[previous] = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        self._region = (previous + 1) % len(self._fences)
+        fence = self._fences[self._region]
+        if fence is not None:
+            while (
+                glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT, _WAIT_NS)
+                == GL_TIMEOUT_EXPIRED
+            ):
+                pass
+            glDeleteSync(fence)
+            self._fences[self._region] = None
+        stale = self._stale[self._region] if spans is not None else None
+        base = self._mapped + self.offset
+        if stale is None:
+            if nbytes:
+                ctypes.memmove(base, array.ctypes.data, nbytes)
+            if spans is None:
+                # Every other region now lags this one by everything; after
+                # write_ranges() they already hold the spans they miss.
+                self._stale = [None] * len(self._stale)
+        else:
+            for start, stop in stale:
+                stop = min(stop, nbytes)
+                if stop > start:
+                    source = array.ctypes.data + start
+                    ctypes.memmove(base + start, source, stop - start)
+        self._stale[self._region] = []
+        if self._attachments:
+            glBindBuffer(GL_ARRAY_BUFFER, self.id)
+            for vao_id, location, components in self._attachments:
+                glBindVertexArray(vao_id)
+                glVertexAttribPointer(
+                    location, components, GL_FLOAT, False, 0, self.offset
+                )
+            glBindVertexArray(0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def delete(self) -> None:
+        for fence in self._fences:
+            if fence is not None:
+                glDeleteSync(fence)
+        self._fences = [None] * len(self._fences)
+        if self.id:
+            # Deleting a mapped buffer unmaps it.
+            glDeleteBuffers(1, GLuint(self.id))
+            self.id = 0
+
+    def __del__(self) -> None:
+        # Dropped on capacity growth like a BufferObject: the context frees
+        # the name at its next safe point.
+        if getattr(self, "id", 0):
+            try:
+                self._context.delete_buffer(self.id)
+                self.id = 0
+            except (AttributeError, ImportError):
+                pass  # interpreter shutting down
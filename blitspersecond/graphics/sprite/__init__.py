@@ -26,6 +26,12 @@ presentations stamp once into retained packed screen-space masks whenever
 their state changes; every query thereafter is a cheap word AND. Cross-engine
 comes free -- a sprite layer against a tile/text mask layer is the same
 protocol.
+A pool's instances share those planes, so `pool.hits(other)` attributes a
+positive answer back to instance indices when the game needs to know which
+bullet it was. Pool against pool goes through a broadphase first: each pool
+files its instances in a uniform grid (PoolGrid, refiled after an edit), so
+`enemy.pairs(shots)` emits candidate index pairs, and `layer.query_rect`
+asks one rect of every pool and sprite.
 
 PlaneOverlay is the debug view: the retained packed collision planes (named
 planes, silhouette tint, anchors) painted onto an RGBA canvas you bind above
@@ -47,6 +53,7 @@ blitspersecond.graphics -- the user's toolbox import.
 
 from .animation import Animation
 from .plane_overlay import PlaneOverlay
+from .pool_grid import PoolGrid
 from .sprite import PaletteRegisters, Sprite
 from .sprite_engine import SpriteEngine
 from .sprite_layer import SpriteLayer
@@ -57,6 +64,7 @@ __all__ = [
     "Animation",
     "PaletteRegisters",
     "PlaneOverlay",
+    "PoolGrid",
     "Sprite",
     "SpriteEngine",
     "SpriteLayer",
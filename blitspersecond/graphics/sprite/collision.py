@@ -1,16 +1,34 @@
 """Retained packed screen-space collision masks for SpriteEngine."""
 
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
+from numba import njit
 
 from blitspersecond.graphics.common import (
     CLOW,
     CWORD,
     CWORD_BITS,
     CWORD_SHIFT,
+    stamp_pattern,
+    warm_stamp_kernel,
 )
 
+from .pool_grid import oriented_boxes
+
+if TYPE_CHECKING:
+    from .sprite import Sprite
+    from .sprite_pool import SpritePool
+
+# Broadphase cell height in rows; a cell is one mask word (32 px) wide.
+_CELL_ROWS = 32
+
+# Past this many dirty rects (a moved footprint is two: where it was, where
+# it is) a restamp touches enough of the planes that the full rebuild is
+# the cheaper road.
+_MAX_DIRTY = 64
+
 
 def _packed_pattern(bits: np.ndarray) -> np.ndarray:
     """A bool image as uint64 row patterns, padded to collision words."""
@@ -22,14 +40,85 @@ def _packed_pattern(bits: np.ndarray) -> np.ndarray:
     return packed.view(CWORD).astype(np.uint64)
 
 
+@njit(cache=True)
+def _pattern_hits(mask, pattern, xs, ys, rows, words, hits):
+    """For each placement (xs[i], ys[i]) of one uint64 row pattern, whether
+    it shares a set bit with `mask` -- _stamp's shift-and-split, read
+    instead of ORed, and clipped to the mask's [rows, words)."""
+    height, span = pattern.shape
+    for i in range(xs.shape[0]):
+        shift = np.uint64(xs[i] & (CWORD_BITS - 1))
+        word = xs[i] >> CWORD_SHIFT
+        for dy in range(height):
+            row = ys[i] + dy
+            if row < 0 or row >= rows:
+                continue
+            for k in range(span):
+                shifted = pattern[dy, k] << shift
+                j = word + k
+                if 0 <= j < words and np.uint64(mask[row, j]) & shifted & CLOW:
+                    hits[i] = True
+                    break
+                j += 1
+                if 0 <= j < words and np.uint64(mask[row, j]) & (
+                    shifted >> np.uint64(CWORD_BITS)
+                ):
+                    hits[i] = True
+                    break
+            if hits[i]:
+                break
+
+
+@lru_cache(maxsize=1)
+def _warm_pattern_kernel():
+    """Compile (or load from numba's cache) the narrowphase kernel for whole
+    masks (tile, glyph) and cropped plane views (sprite), on first use."""
+    mask = np.zeros((2, 2), dtype=CWORD)
+    pattern = np.zeros((1, 1), dtype=np.uint64)
+    at = np.zeros(1, dtype=np.int64)
+    hit = np.zeros(1, dtype=np.bool_)
+    _pattern_hits(mask, pattern, at, at, 2, 2, hit)
+    _pattern_hits(mask[:, :1], pattern, at, at, 2, 1, hit)
+
+
+def _touching(boxes: np.ndarray, rects: np.ndarray) -> np.ndarray:
+    """Per row of `boxes`, whether it overlaps any row of `rects` (both
+    (x0, y0, x1, y1), half-open). One column pass per rect: there are
+    few rects and many boxes."""
+    x0, y0, x1, y1 = boxes.T
+    meets = np.zeros(len(boxes), dtype=bool)
+    for rx0, ry0, rx1, ry1 in rects.tolist():
+        meets |= (x0 < rx1) & (x1 > rx0) & (y0 < ry1) & (y1 > ry0)
+    return meets
+
+
+class _PoolStamp:
+    """What the last stamp of one pool read -- copies of its arrays, so an
+    edit's changed instances are one comparison away -- and, made on first
+    need, each instance's screen box then."""
+
+    __slots__ = ("positions", "flip_x", "rotation", "active", "boxes")
+
+    def __init__(self, pool) -> None:
+        self.positions = pool._positions.copy()
+        self.flip_x = pool._flip_x.copy()
+        self.rotation = pool._rotation.copy()
+        self.active = pool._visible & pool._collide
+        self.boxes: Optional[np.ndarray] = None
+
+
 class SpriteCollision:
     """All retained packed planes belonging to one SpriteEngine.
 
     The exported query surface is exactly 640x360. Internally each plane has
     an apron large enough for every assembly-local source: stamps straddling
     the screen therefore need no row-by-row clipping. Cached uint64 row
-    patterns scatter through permanent work arrays, the same proven regime
-    used by TileEngine's moving-particle restamp.
+    patterns scatter through the compiled stamp_pattern kernel, the same
+    one TileEngine's moving-particle restamp uses.
+
+    Moves are maintained incrementally (see rebuild): a sprite stepping
+    across a crowded layer restamps the few words it left and entered, not
+    the layer.
     """
 
     def __init__(self, engine) -> None:
@@ -41,7 +130,26 @@ class SpriteCollision:
         self._pattern_sources: Dict[str, np.ndarray] = {}
         self._solid: Dict[Tuple[int, int], np.ndarray] = {}
         self._selected: Dict[Tuple[str, ...], np.ndarray] = {}
-        self._work: Optional[Tuple[np.ndarray, ...]] = None
+        # Incremental upkeep (see rebuild): the entries moved since the last
+        # stamp, and whether anything else changed. What that stamp covered
+        # is kept as screen boxes: one row of _boxes per stamped sprite, and
+        # a _PoolStamp per pool.
+        self._moved: Dict[Union[Sprite, SpritePool], None] = {}
+        self._full = True
+        self._rows: Dict[Sprite, int] = {}
+        self._stamped: List[Sprite] = []
+        self._boxes = np.empty((0, 4), dtype=np.int64)
+        self._pools: Dict[SpritePool, _PoolStamp] = {}
+        warm_stamp_kernel()
+
+    def move(self, entry) -> None:
+        """`entry` (a Sprite or SpritePool) moved, flipped or turned -- or a
+        pool's participation changed: only its footprint needs restamping."""
+        self._moved[entry] = None
+
+    def invalidate(self) -> None:
+        """Something a footprint cannot describe changed: rebuild fully."""
+        self._full = True
 
     def _apron(self) -> Tuple[int, int]:
         """Maximum oriented source extent across pixels and named boxes.
@@ -124,19 +232,6 @@ class SpriteCollision:
             self._solid[key] = pattern
         return pattern
 
-    def _ensure_work(self, count: int) -> Tuple[np.ndarray, ...]:
-        if self._work is None or len(self._work[0]) < count:
-            capacity = max(8, count)
-            if self._work is not None:
-                capacity = max(capacity, 2 * len(self._work[0]))
-            self._work = (
-                np.empty(capacity, dtype=np.uint64),  # shifted pattern
-                np.empty(capacity, dtype=np.uint64),  # lo/hi extraction
-                np.empty(capacity, dtype=CWORD),      # scatter values
-                np.empty(capacity, dtype=np.intp),    # flat indices
-            )
-        return self._work
-
     def _stamp(
         self,
         target: np.ndarray,
@@ -144,7 +239,8 @@ class SpriteCollision:
         ys: np.ndarray,
         pattern: np.ndarray,
     ) -> None:
-        """OR one cached row pattern at many positions without allocation."""
+        """OR one cached row pattern at many positions: clip the placements
+        to the apron here, then one compiled scatter (stamp_pattern)."""
         count = len(xs)
         if not count:
             return
@@ -176,27 +272,7 @@ class SpriteCollision:
         xwords = xwords[selected]
         offsets = (xs & (CWORD_BITS - 1)).astype(np.uint64)
         base = (ys + ah).astype(np.intp) * stride + xwords
-        shifted, extracted, values, indices = (
-            work[:count] for work in self._ensure_work(count)
-        )
-        flat = target.reshape(-1)
-
-        for dy in range(pattern_height):
-            for word_column in range(pattern_words):
-                source = pattern[dy, word_column]
-                if source == 0:
-                    continue
-                np.left_shift(source, offsets, out=shifted)
-                np.bitwise_and(shifted, CLOW, out=extracted)
-                values[:] = extracted
-                np.add(base, dy * stride + word_column, out=indices)
-                np.bitwise_or.at(flat, indices, values)
-                np.right_shift(
-                    shifted, np.uint64(CWORD_BITS), out=extracted
-                )
-                values[:] = extracted
-                np.add(indices, 1, out=indices)
-                np.bitwise_or.at(flat, indices, values)
+        stamp_pattern(target.reshape(-1), base, offsets, pattern, stride)
 
     def _stamp_one(
         self, target: np.ndarray, x: int, y: int, pattern: np.ndarray
@@ -264,10 +340,13 @@ class SpriteCollision:
                     self._solid_pattern(width, height),
                 )
 
-    def _stamp_pool(self, pool, masks) -> None:
+    def _stamp_pool(self, pool, masks, active=None) -> None:
+        """Stamp the pool's visible, colliding instances -- or only the
+        indices `active`, which must be among them."""
         from .sprite_layer import _local_rect
 
-        active = np.flatnonzero(pool._visible & pool._collide)
+        if active is None:
+            active = np.flatnonzero(pool._visible & pool._collide)
         if not len(active):
             return
         assembly_ids = pool._assembly_ids[active]
@@ -275,6 +354,7 @@ class SpriteCollision:
         rotations = (pool._rotation[active] & 3).astype(np.intp)
         variants = flips * 4 + rotations
         positions = np.floor(pool._positions[active]).astype(np.int32)
+        positions -= self._engine._camera_px()
         keys = assembly_ids * 8 + variants
 
         for key in np.unique(keys):
@@ -309,15 +389,149 @@ class SpriteCollision:
                         self._solid_pattern(width, height),
                     )
 
+    def _pool_shapes(
+        self, pool, assembly_id: int, variant: int, planes
+    ) -> Iterator[Tuple[int, int, int, int, np.ndarray]]:
+        """What one pool key contributes to the selected planes, about the
+        instance origin: (x, y, w, h, row pattern) per part or rect."""
+        from .sprite_layer import _local_rect
+
+        flip, rotation = bool(variant >> 2), variant & 3
+        if planes is None:
+            part, _source_rect = pool._parts[assembly_id]
+            x, y, width, height = pool._rects[assembly_id, variant]
+            yield x, y, width, height, self._pattern(
+                part.tileset, part.tile, flip, rotation
+            )
+            return
+        assembly_name = pool._unique_assemblies[assembly_id]
+        collision = self._engine.sheet.assemblies[assembly_name].collision
+        for name in planes:
+            for rect in collision.get(name, ()):
+                x, y, width, height = _local_rect(
+                    0, 0, flip, rotation,
+                    rect.x, rect.y, rect.width, rect.height,
+                )
+                yield x, y, width, height, self._solid_pattern(width, height)
+
+    def pool_hits(
+        self, pool, planes: Optional[Tuple[str, ...]], other: np.ndarray
+    ) -> np.ndarray:
+        """Indices of the pool's visible, colliding instances whose own
+        stamp in `planes` overlaps the packed mask `other`.
+
+        Broadphase: `other` is reduced to a coarse occupancy grid (one word
+        by _CELL_ROWS per cell) with a summed-area table, so each instance's
+        screen box asks "any set cell under me?" in four lookups, all
+        instances at once. Narrowphase: only those survivors run their
+        cached row pattern against `other`'s words, compiled."""
+        _warm_pattern_kernel()
+        self._ensure()
+        active = np.flatnonzero(pool._visible & pool._collide)
+        hit = np.zeros(len(pool), dtype=np.bool_)
+        height, _width, words = self._cdims
+        rows = min(other.shape[0], height)
+        words = min(other.shape[1], words)
+        if not len(active) or not rows or not words:
+            return np.flatnonzero(hit)
+        cells = -(-rows // _CELL_ROWS)
+        occupied = np.zeros((cells * _CELL_ROWS, words), dtype=bool)
+        np.not_equal(other[:rows, :words], 0, out=occupied[:rows])
+        table = np.zeros((cells + 1, words + 1), dtype=np.int32)
+        grid = occupied.reshape(cells, _CELL_ROWS, words).any(axis=1)
+        table[1:, 1:] = grid.cumsum(0).cumsum(1)
+
+        keys = pool._assembly_ids[active] * 8
+        keys += pool._flip_x[active] * 4
+        keys += pool._rotation[active] & 3
+        positions = np.floor(pool._positions[active]).astype(np.int64)
+        positions -= self._engine._camera_px()
+        for key in np.unique(keys):
+            selected = np.flatnonzero(keys == key)
+            for x, y, width, height, pattern in self._pool_shapes(
+                pool, int(key) // 8, int(key) & 7, planes
+            ):
+                xs = positions[selected, 0] + x
+                ys = positions[selected, 1] + y
+                c0 = np.clip(xs >> CWORD_SHIFT, 0, words)
+                c1 = np.clip(((xs + width - 1) >> CWORD_SHIFT) + 1, 0, words)
+                r0 = np.clip(ys // _CELL_ROWS, 0, cells)
+                r1 = np.clip((ys + height - 1) // _CELL_ROWS + 1, 0, cells)
+                near = (c0 < c1) & (r0 < r1)
+                near &= (
+                    table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0]
+                ) > 0
+                near &= ~hit[active[selected]]
+                candidates = selected[near]
+                if not len(candidates):
+                    continue
+                found = np.zeros(len(candidates), dtype=np.bool_)
+                _pattern_hits(
+                    other,
+                    pattern,
+                    np.ascontiguousarray(xs[near]),
+                    np.ascontiguousarray(ys[near]),
+                    rows,
+                    words,
+                    found,
+                )
+                hit[active[candidates[found]]] = True
+        return np.flatnonzero(hit)
+
+    def _box(self, s, cx: int, cy: int) -> Optional[Tuple[int, int, int, int]]:
+        """A stamped sprite's screen box: its floored reach (see
+        SpriteLayer._reach) about its anchor, less the camera."""
+        reach = self._engine._reach(s)
+        if reach is None:
+            return None
+        px, py = int(s._xy[0]) - cx, int(s._xy[1]) - cy
+        return px + reach[0], py + reach[1], px + reach[2], py + reach[3]
+
+    @staticmethod
+    def _pool_boxes(pool, stamp: _PoolStamp, index, cx: int, cy: int):
+        """Screen boxes of the pool's instances `index` as `stamp` read them
+        (the pool itself passes as its own stamp)."""
+        boxes = oriented_boxes(
+            pool._bounds,
+            pool._assembly_ids[index],
+            stamp.flip_x[index],
+            stamp.rotation[index],
+            stamp.positions[index],
+        )
+        boxes[:, 0::2] -= cx
+        boxes[:, 1::2] -= cy
+        return boxes
+
     def rebuild(self) -> None:
+        """Bring the planes up to date. When the only changes since the
+        last stamp are moves (see move()) of a few footprints, clear just
+        the words under each footprint's old and new box and restamp what
+        touches them -- the moved entries where they are now, and every
+        other stamp sharing those words, which ORs back what the clear took
+        and nothing more. Otherwise, or when most of the layer moved,
+        clear everything and stamp it all."""
+        if self._full or not self._moved or not self._restamp_moved():
+            self._restamp_all()
+        self._moved.clear()
+        self._full = False
+        self._selected.clear()
+        self._engine._collision_dirty = False
+
+    def _restamp_all(self) -> None:
         from .sprite_pool import SpritePool
 
         masks = self._ensure()
         for mask in masks.values():
             mask.fill(0)
-        self._selected.clear()
+        # Screen-space planes: world positions less the engine's camera.
+        cx, cy = self._engine._camera_px()
+        self._rows.clear()
+        self._pools.clear()
+        stamped = []
+        boxes = []
         for entry in self._engine._entries():
             if isinstance(entry, SpritePool):
+                self._pools[entry] = _PoolStamp(entry)
                 self._stamp_pool(entry, masks)
             elif (
                 entry._visible
@@ -326,19 +540,121 @@ class SpriteCollision:
             ):
                 self._stamp_pose(
                     entry._assembly,
-                    int(entry._xy[0]),
-                    int(entry._xy[1]),
+                    int(entry._xy[0]) - cx,
+                    int(entry._xy[1]) - cy,
                     entry._flip_x,
                     entry._rotation,
                     masks,
                 )
-        self._engine._collision_dirty = False
+                box = self._box(entry, cx, cy)
+                if box is not None:
+                    self._rows[entry] = len(stamped)
+                    stamped.append(entry)
+                    boxes.append(box)
+        self._stamped = stamped
+        self._boxes = np.array(boxes, dtype=np.int64).reshape(-1, 4)
+
+    def _restamp_moved(self) -> bool:
+        """The incremental path; False, having changed nothing, when it
+        would not pay."""
+        from .sprite_pool import SpritePool
+
+        masks = self._ensure()
+        cx, cy = self._engine._camera_px()
+        sprites = []
+        edits = []
+        changes = 0
+        for entry in self._moved:
+            if not isinstance(entry, SpritePool):
+                if entry in self._rows:  # unstamped stays so: moves only
+                    sprites.append(entry)
+                continue
+            stamp = self._pools[entry]
+            active = entry._visible & entry._collide
+            # Each (x, y) float32 pair compared as one int64: bitwise, so a
+            # -0.0 for a 0.0 merely counts as a change.
+            changed = entry._positions.view(np.int64).reshape(-1) != (
+                stamp.positions.view(np.int64).reshape(-1)
+            )
+            changed |= entry._flip_x != stamp.flip_x
+            changed |= entry._rotation != stamp.rotation
+            changed &= stamp.active | active
+            changed |= stamp.active != active
+            index = np.flatnonzero(changed)
+            edits.append((entry, stamp, index, active))
+            changes += len(index)
+        total = len(self._stamped) + sum(
+            int(np.count_nonzero(stamp.active)) for stamp in self._pools.values()
+        )
+        if 2 * (changes + len(sprites)) > total or (
+            2 * (changes + len(sprites)) > _MAX_DIRTY
+        ):
+            return False
+
+        # Where each changed footprint was, and where it is now.
+        dirty = []
+        for s in sprites:
+            row = self._rows[s]
+            dirty.append(self._boxes[row : row + 1].copy())
+            # Whether a sprite has a box depends on its assembly alone, and
+            # an assembly change is no move: stamped, it still has one.
+            box = self._box(s, cx, cy)
+            assert box is not None
+            self._boxes[row] = box
+            dirty.append(self._boxes[row : row + 1].copy())
+        for pool, stamp, index, active in edits:
+            if stamp.boxes is None:
+                stamp.boxes = self._pool_boxes(pool, stamp, slice(None), cx, cy)
+            boxes = self._pool_boxes(pool, pool, index, cx, cy)
+            dirty.append(stamp.boxes[index[stamp.active[index]]])
+            dirty.append(boxes[active[index]])
+            stamp.boxes[index] = boxes
+            stamp.positions[index] = pool._positions[index]
+            stamp.flip_x[index] = pool._flip_x[index]
+            stamp.rotation[index] = pool._rotation[index]
+            stamp.active = active
+        rects = np.concatenate(dirty) if dirty else self._boxes[:0]
+        if not len(rects):
+            return True
+
+        # Clear whole words: the rects widen to word boundaries, and so
+        # does what must be restamped.
+        rects[:, 0] &= ~(CWORD_BITS - 1)
+        rects[:, 2] = (rects[:, 2] + CWORD_BITS - 1) & ~(CWORD_BITS - 1)
+        ah, aw = self._capron
+        rows, stride = masks[None].shape
+        for x0, y0, x1, y1 in rects.tolist():
+            r0, r1 = max(y0 + ah, 0), min(y1 + ah, rows)
+            w0 = max((x0 >> CWORD_SHIFT) + aw, 0)
+            w1 = min((x1 >> CWORD_SHIFT) + aw, stride)
+            if r0 < r1 and w0 < w1:
+                for mask in masks.values():
+                    mask[r0:r1, w0:w1] = 0
+
+        for row in np.flatnonzero(_touching(self._boxes, rects)).tolist():
+            s = self._stamped[row]
+            self._stamp_pose(
+                s._assembly,
+                int(s._xy[0]) - cx,
+                int(s._xy[1]) - cy,
+                s._flip_x,
+                s._rotation,
+                masks,
+            )
+        for pool, stamp in self._pools.items():
+            if stamp.boxes is None:
+                stamp.boxes = self._pool_boxes(pool, stamp, slice(None), cx, cy)
+            found = np.flatnonzero(_touching(stamp.boxes, rects) & stamp.active)
+            if len(found):
+                self._stamp_pool(pool, masks, found)
+        return True
 
     def mask(self, planes: Optional[Tuple[str, ...]] = None) -> np.ndarray:
         if not self._engine._collision_dirty:
             for name, source in tuple(self._pattern_sources.items()):
                 if self._engine.sheet.tilesets[name].buffer.mask is not source:
                     self._engine._collision_dirty = True
+                    self._full = True
                     break
         if self._engine._collision_dirty:
             self.rebuild()
@@ -0,0 +1,150 @@
+# A SpritePool's broadphase: a uniform grid over its instances' boxes. The
+# packed planes answer "does anything overlap" in a word AND, but a pool
+# against a pool (enemy bullets against player shots) wants candidate
+# index PAIRS, and n * m box tests is the naive road there. Here each
+# instance is filed under the grid cell holding its box's top-left corner;
+# cells are at least as large as any instance's box, so a query box only
+# has to visit the cells it covers plus one row and column before them.
+#
+# Nothing is per-instance Python: filing is one argsort of packed cell keys
+# (a sorted array IS the grid -- no dense cell storage, no bound on world
+# size), and a batch of query boxes is expanded to (box, cell) and then
+# (box, instance) index pairs with repeat/searchsorted, then filtered by an
+# exact box test. A query box covering more cells than the pool has
+# instances skips the grid and pairs with every instance directly, so no
+# query expands past (query, instance) -- however large its area. The grid
+# is refiled lazily, on the first query after an edit(), from the positions
+# array as it stands.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .sprite_pool import SpritePool
+
+# Cells are a power of two this size or larger, so filing is a shift.
+_MIN_CELL_SHIFT = 5
+
+# Cell coordinates are biased into 32 unsigned bits each and packed into
+# one int64 key: y in the high half, x in the low.
+_BIAS = 1 << 31
+
+
+def _cell_keys(cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+    return ((cy + _BIAS) << 32) | (cx + _BIAS)
+
+
+def oriented_boxes(
+    bounds: np.ndarray,
+    assembly_ids: np.ndarray,
+    flip_x: np.ndarray,
+    rotation: np.ndarray,
+    positions: np.ndarray,
+) -> np.ndarray:
+    """Instance boxes from a pool's per-instance arrays (or any matching
+    slice or copy of them): each (x0, y0, x1, y1), int64 (n, 4), is the
+    `bounds` row for its orientation about its floored origin."""
+    keys = assembly_ids * 8
+    keys += flip_x * 4
+    keys += rotation & 3
+    origins = np.floor(positions).astype(np.int64)
+    boxes = bounds.reshape(-1, 4)[keys].astype(np.int64)
+    boxes[:, 0::2] += origins[:, :1]
+    boxes[:, 1::2] += origins[:, 1:]
+    return boxes
+
+
+class PoolGrid:
+    """The uniform grid over one pool's instance boxes, in the pool's world
+    space (floored origins, as drawn). An instance's box is its drawn part
+    joined with every named collision rect of its assembly, oriented --
+    one conservative footprint that serves both drawing and collision."""
+
+    def __init__(self, pool: "SpritePool") -> None:
+        self._pool = pool
+        bounds = pool._bounds.reshape(-1, 4)
+        extent = int(max((bounds[:, 2:] - bounds[:, :2]).max(), 1))
+        self.shift = max(_MIN_CELL_SHIFT, (extent - 1).bit_length())
+        self._stale = True
+        self._boxes = np.empty((0, 4), dtype=np.int64)
+        self._order = np.empty(0, dtype=np.intp)
+        self._keys = np.empty(0, dtype=np.int64)
+
+    def mark(self) -> None:
+        """The pool was edited: refile before the next query."""
+        self._stale = True
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """Every instance's (x0, y0, x1, y1) world box, int64 (n, 4)."""
+        self._refile()
+        return self._boxes
+
+    def _refile(self) -> None:
+        if not self._stale:
+            return
+        pool = self._pool
+        boxes = oriented_boxes(
+            pool._bounds,
+            pool._assembly_ids,
+            pool._flip_x,
+            pool._rotation,
+            pool._positions,
+        )
+        cells = _cell_keys(boxes[:, 0] >> self.shift, boxes[:, 1] >> self.shift)
+        self._order = np.argsort(cells, kind="stable")
+        self._keys = cells[self._order]
+        self._boxes = boxes
+        self._stale = False
+
+    def query(
+        self, boxes: np.ndarray, candidates: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Every (query, instance) pair whose boxes overlap: `boxes` is
+        (m, 4) world-space (x0, y0, x1, y1), half-open. Returns two equal
+        length intp arrays -- rows of `boxes`, instance indices -- sorted by
+        query row, then instance. `candidates`, a bool (n,) array, limits
+        the instances that may answer."""
+        self._refile()
+        boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        shift, size = self.shift, 1 << self.shift
+        # A filed box starts at most one cell before the query and ends
+        # before it does; empty query boxes visit nothing.
+        cx0 = (boxes[:, 0] - size + 1) >> shift
+        cy0 = (boxes[:, 1] - size + 1) >> shift
+        across = ((boxes[:, 2] - 1) >> shift) - cx0 + 1
+        down = ((boxes[:, 3] - 1) >> shift) - cy0 + 1
+        empty = (boxes[:, 2] <= boxes[:, 0]) | (boxes[:, 3] <= boxes[:, 1])
+        visits = np.where(empty, 0, across * down)
+        # Wider than the pool: cheaper to test every instance than each cell.
+        direct = np.flatnonzero(visits > len(self._boxes))
+        visits[direct] = 0
+
+        # (query, cell) pairs: one per cell each query box visits.
+        rows = np.repeat(np.arange(len(boxes)), visits)
+        step = np.arange(len(rows)) - np.repeat(np.cumsum(visits) - visits, visits)
+        cells = _cell_keys(
+            cx0[rows] + step % across[rows], cy0[rows] + step // across[rows]
+        )
+        lo = np.searchsorted(self._keys, cells, side="left")
+        filed = np.searchsorted(self._keys, cells, side="right") - lo
+
+        # (query, instance) pairs: one per instance filed in each cell.
+        rows = np.repeat(rows, filed)
+        step = np.arange(len(rows)) - np.repeat(np.cumsum(filed) - filed, filed)
+        found = self._order[np.repeat(lo, filed) + step]
+        if len(direct):
+            every = len(self._boxes)
+            rows = np.concatenate((rows, np.repeat(direct, every)))
+            found = np.concatenate((found, np.tile(np.arange(every), len(direct))))
+        mine, theirs = self._boxes[found], boxes[rows]
+        keep = (mine[:, 0] < theirs[:, 2]) & (mine[:, 2] > theirs[:, 0])
+        keep &= (mine[:, 1] < theirs[:, 3]) & (mine[:, 3] > theirs[:, 1])
+        if candidates is not None:
+            keep &= candidates[found]
+        rows, found = rows[keep], found[keep]
+        order = np.lexsort((found, rows))
+        return rows[order], found[order]
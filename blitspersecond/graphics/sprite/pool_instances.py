@@ -0,0 +1,163 @@
+# A SpritePool's GPU side: the instanced path. The quad path expands every
+# pooled instance into four corners of positions and UVs on the CPU each
+# dirty frame and re-uploads both -- for a 10k-bullet pool, the dominant
+# per-frame cost. Here one quad is drawn once per instance instead. What
+# varies per instance is uploaded as it stands: the pool's own (n, 2)
+# float32 positions array, and an (n,) key picking the row of a static
+# per-pool table (the rects and UVs the pool already precomputes per
+# assembly and orientation) that the vertex shader looks up. Only the
+# instances on screen (see SpriteLayer.camera) are uploaded: the cull is one
+# vectorised pass over the positions against the rects' combined reach,
+# compacting the survivors.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Tuple
+
+import numpy as np
+from pyglet.gl import (
+    GL_FLOAT,
+    GL_NEAREST,
+    GL_RGBA,
+    GL_RGBA32F,
+    GL_TEXTURE_2D,
+    glBindTexture,
+    glEnableVertexAttribArray,
+    glTexSubImage2D,
+    glVertexAttribDivisor,
+)
+from pyglet.graphics.vertexarray import VertexArray
+from pyglet.graphics.vertexbuffer import BufferObject
+from pyglet.image import Texture
+
+from blitspersecond.graphics.internal import PaletteBank, VertexStream
+
+if TYPE_CHECKING:
+    from .sprite_pool import SpritePool
+
+# Orientations per assembly in a pool's tables: flip (2) x quarter turns (4).
+_VARIANTS = 8
+
+
+def _table(pool: "SpritePool") -> np.ndarray:
+    """The pool's rects and UVs as a (keys, 3, 4) float32 image: per key
+    (assembly * 8 + flip * 4 + turns), the local rect (x, y, w, h) and the
+    four UV corners, two to a texel."""
+    pool._ensure_templates()
+    assert pool._uvs is not None
+    count = len(pool._rects)
+    table = np.empty((count * _VARIANTS, 3, 4), dtype=np.float32)
+    table[:, 0] = pool._rects.reshape(-1, 4)
+    # (assembly, flip, turns, corner, uvr) -> (key, corner, uv): the key
+    # order IS flip * 4 + turns, so the reshape lines up with _rects.
+    uv = pool._uvs[..., :2].reshape(count * _VARIANTS, 4, 2)
+    table[:, 1:] = uv.reshape(-1, 2, 4)
+    return table
+
+
+class PoolInstances:
+    """One pool's instance buffers, table texture and VAO. Needs a current
+    GL context to construct (SpriteLayer builds it on the pool's first
+    dirty frame) and `program` to be the pool shader's program."""
+
+    def __init__(self, pool: "SpritePool", program) -> None:
+        count = len(pool)
+        attrs = program.attributes
+        # Instances the last upload kept, and the visible ones it culled.
+        self.count = 0
+        self.culled = 0
+        # The pool's one palette: a constant generic attribute per draw.
+        self.palette_row = 0.0
+        # The reach of the pool's rects about an instance's origin, over
+        # every assembly and orientation: (min x, min y, max x, max y).
+        rects = pool._rects.reshape(-1, 4)
+        self._reach = (
+            int(rects[:, 0].min()),
+            int(rects[:, 1].min()),
+            int((rects[:, 0] + rects[:, 2]).max()),
+            int((rects[:, 1] + rects[:, 3]).max()),
+        )
+        self._positions = VertexStream(count * 2 * 4)
+        self._key_buffer = VertexStream(count * 4)
+        self._indices = BufferObject(6 * 4)
+        idx = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+        self._indices.set_data_region(
+            idx.ctypes.data,  # pyright: ignore[reportArgumentType]
+            0,
+            idx.nbytes,
+        )
+
+        table = _table(pool)
+        self.table = Texture.create(
+            3,
+            len(table),
+            internalformat=GL_RGBA32F,
+            min_filter=GL_NEAREST,
+            mag_filter=GL_NEAREST,
+            blank_data=False,
+        )
+        glBindTexture(GL_TEXTURE_2D, self.table.id)
+        glTexSubImage2D(
+            GL_TEXTURE_2D,
+            0,
+            0,
+            0,
+            3,
+            len(table),
+            GL_RGBA,
+            GL_FLOAT,
+            table.ctypes.data,
+        )
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        # Both streams advance once per instance, not per vertex.
+        self.vao = VertexArray()
+        self.vao.bind()
+        for stream, name, components in (
+            (self._positions, "instance_position", 2),
+            (self._key_buffer, "instance_key", 1),
+        ):
+            location = attrs[name]["location"]
+            glEnableVertexAttribArray(location)
+            stream.attach(self.vao, location, components)
+            glVertexAttribDivisor(location, 1)
+        self._indices.bind_to_index_buffer()
+        self.vao.unbind()
+
+    def upload(
+        self, pool: "SpritePool", window: Tuple[int, int, int, int]
+    ) -> None:
+        """The per-frame work: one table key per instance, the cull -- keep
+        the visible instances whose floored origin puts the pool's widest
+        rect inside `window` (x0, y0, x1, y1, in the positions' own space)
+        -- then two contiguous uploads of the survivors."""
+        keys = pool._assembly_ids * _VARIANTS
+        keys += pool._flip_x * 4
+        keys += pool._rotation & 3
+        # floor(p) + lo < x1 and floor(p) + hi > x0, as bounds on p itself
+        # (the window is whole pixels), without flooring every position.
+        lo_x, lo_y, hi_x, hi_y = self._reach
+        x0, y0, x1, y1 = window
+        x, y = pool._positions[:, 0], pool._positions[:, 1]
+        inside = (x < x1 - lo_x) & (y < y1 - lo_y)
+        inside &= (x >= x0 - hi_x + 1) & (y >= y0 - hi_y + 1)
+        inside &= pool._visible
+        kept = np.flatnonzero(inside)
+        self.count = len(kept)
+        self.culled = pool.count_visible - self.count
+        self.palette_row = float(PaletteBank.row(pool._palette))
+        if self.count == len(keys):
+            self._positions.write(pool._positions)
+            self._key_buffer.write(keys.astype(np.float32))
+            return
+        # Each (x, y) float32 pair gathered as one int64: a 1-D take, far
+        # cheaper than fancy-indexing rows.
+        pairs = pool._positions.view(np.int64).reshape(-1)
+        self._positions.write(pairs[kept])
+        self._key_buffer.write(keys[kept].astype(np.float32))
+
+    def delete(self) -> None:
+        self.vao.delete()
+        for buffer in (self._positions, self._key_buffer, self._indices):
+            buffer.delete()
+        self.table.delete()
@@ -105,7 +105,7 @@ class Sprite:
     def position(self, value: Union[Tuple[float, float], Location]) -> None:
         self._xy[0] = float(value[0])
         self._xy[1] = float(value[1])
-        self._engine._touch()
+        self._engine._move(self)
 
     @property
     def x(self) -> float:
@@ -114,7 +114,7 @@ class Sprite:
     @x.setter
     def x(self, value: float) -> None:
         self._xy[0] = float(value)
-        self._engine._touch()
+        self._engine._move(self)
 
     @property
     def y(self) -> float:
@@ -123,7 +123,7 @@ class Sprite:
     @y.setter
     def y(self, value: float) -> None:
         self._xy[1] = float(value)
-        self._engine._touch()
+        self._engine._move(self)
 
     @property
     def flip_x(self) -> bool:
@@ -135,7 +135,7 @@ class Sprite:
     @flip_x.setter
     def flip_x(self, value: bool) -> None:
         self._flip_x = bool(value)
-        self._engine._touch()
+        self._engine._move(self)
 
     @property
     def rotation(self) -> int:
@@ -150,7 +150,7 @@ class Sprite:
     @rotation.setter
     def rotation(self, value: int) -> None:
         self._rotation = int(value) & 3
-        self._engine._touch()
+        self._engine._move(self)
 
     def present_at(
         self,
@@ -185,6 +185,7 @@ class Sprite:
     def collide(self, value: bool) -> None:
         self._collide = bool(value)
         self._engine._collision_dirty = True
+        self._engine._collision.invalidate()
 
     # -- palette registers --------------------------------------------------
 
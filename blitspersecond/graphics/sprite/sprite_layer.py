@@ -1,26 +1,8 @@
-from typing import Dict, Iterator, List, Optional, Tuple
+from math import floor
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
 
 import numpy as np
-from pyglet.gl import (
-    GL_BLEND,
-    GL_FLOAT,
-    GL_ONE_MINUS_SRC_ALPHA,
-    GL_SRC_ALPHA,
-    GL_TEXTURE0,
-    GL_TEXTURE1,
-    GL_TRIANGLES,
-    GL_UNSIGNED_INT,
-    glActiveTexture,
-    glBindTexture,
-    glBlendFunc,
-    glDisable,
-    glDrawElements,
-    glEnable,
-    glEnableVertexAttribArray,
-    glVertexAttrib3f,
-    glVertexAttrib4f,
-    glVertexAttribPointer,
-)
+from pyglet.gl import glEnableVertexAttribArray
 from pyglet.graphics.vertexarray import VertexArray
 from pyglet.graphics.vertexbuffer import BufferObject
 from pyglet.image import Texture
@@ -35,10 +17,17 @@ from blitspersecond.graphics.common import (
     PixelBuffer,
     PlaneCollidable,
 )
-from blitspersecond.graphics.internal import PaletteTexture, Shader
+from blitspersecond.graphics.internal import (
+    DrawCommand,
+    DrawList,
+    PaletteBank,
+    Shader,
+    VertexStream,
+)
 from blitspersecond.resources import Palette
 
 from .collision import SpriteCollision
+from .pool_instances import PoolInstances
 from .sprite import Sprite
 from .sprite_pool import SpritePlane, SpritePool
 from .sprite_sheet import SpriteSheet
@@ -71,10 +60,21 @@ _ROT_UV = (
     np.array([1, 2, 3, 0]),
 )
 
+# How far past each screen edge a plan keeps sprites: the camera pans this
+# far on the translate register alone before the next plan re-culls.
+_CULL_MARGIN = 64
+
 # One draw call: `count` quads starting at quad `first`, all sharing one
-# material -- the texture to bind, the palette table to upload, the colour
-# registers to ride the generic attribute. The run list IS the frame plan.
-_Run = Tuple[PixelBuffer, Palette, Tuple[float, float, float, float], int, int]
+# material -- the texture to bind and the colour registers to ride the
+# generic attribute -- or, with a pool's instances, that pool's one quad
+# drawn once per instance. The run list IS the frame plan.
+_Run = Tuple[
+    PixelBuffer,
+    Tuple[float, float, float, float],
+    int,
+    int,
+    Optional[PoolInstances],
+]
 
 
 class SpriteLayer(Layer):
@@ -90,21 +90,36 @@ class SpriteLayer(Layer):
     is layer order). Instances are cheap; identities cost a layer.
 
     The interior job: walk integer painter planes low-to-high, walk each
-    rich assembly's ordered parts or vector-project each dense one-part
-    pool, and coalesce adjacent quads sharing a
-    (buffer, palette, registers) material into runs -- strictly
-    order-preserving, no reordering across a material boundary. Each run is
-    one texture bind + palette upload + glDrawElements. Mid-draw state
+    rich assembly's ordered parts (a dense one-part pool is one instanced
+    run of its own), and coalesce adjacent quads sharing a
+    (buffer, registers) material into runs -- strictly order-preserving, no
+    reordering across a material boundary. Each run is one texture bind +
+    glDrawElements. The palette is not part of the material: every quad
+    carries its palette-bank row in a vertex stream (see PaletteBank), so a
+    recolour never splits a run. Mid-draw state
     switches are the point here (TileEngine spends its single bind on a
     uniform-grid map; this engine spends binds on ordered composition),
     and the cost driver is material-transition count, not instance count.
     One-part poses under one palette coalesce into a single run.
 
-    Dense compatible swarms use SpritePool's NumPy SoA storage; rich
-    multipart composition retains the scalar Sprite path. The staging arrays
-    and GL buffers are retained and capacity-doubled, so a steady scene
-    allocates nothing per frame; a dirty frame rewrites [:nquads] in place
-    and re-uploads once.
+    Dense compatible swarms use SpritePool's NumPy SoA storage and draw
+    instanced: one run per pool, whose dirty frame uploads the positions
+    array as it stands plus one table key per instance (see
+    PoolInstances). Rich multipart composition retains the scalar Sprite
+    quad path. The staging arrays and GL buffers are retained and
+    capacity-doubled, so a steady scene allocates nothing per frame. Only
+    a change to the plan itself (an instance added, removed, shown, hidden,
+    re-posed or recoloured) re-walks everything; a sprite that merely moved,
+    flipped or turned keeps its quad slots, and the frame re-projects just
+    those quads and uploads just their bytes -- a moved pool re-uploads its
+    own instances and nothing else.
+
+    Positions are in the layer's own world space; `camera` says which
+    640x360 window of it the screen shows (the origin, by default). The
+    plan culls against that window plus a margin -- sprites by their
+    oriented bounding rect, pool instances in one vectorised pass -- so
+    only quads that can reach the screen are staged and uploaded, and
+    `culled` counts the ones left out.
 
     The engine never reads the sheet's animation data: a sprite presents
     whatever assembly game code (or a future Animation instance) selected.
@@ -122,21 +137,31 @@ class SpriteLayer(Layer):
         self._planes: Dict[int, List[Union[Sprite, SpritePool]]] = {}
         self._sprite_z: Dict[Sprite, int] = {}
         self._plane_faces: Dict[int, SpritePlane] = {}
-        # GL side, built lazily on first prepare()/_composite().
+        # GL side, built lazily on first prepare()/_record().
         self._shader: Optional[Shader] = None
         self._vao: Optional[VertexArray] = None
-        self._positions: Optional[BufferObject] = None
-        self._texcoords: Optional[BufferObject] = None
+        self._positions: Optional[VertexStream] = None
+        self._texcoords: Optional[VertexStream] = None
         self._indices: Optional[BufferObject] = None
         self._loc_colors: int = -1
         self._loc_translate: int = -1
+        # The pools' instanced program, and each pool's GL side (built on
+        # its first dirty frame).
+        self._pool_shader: Optional[Shader] = None
+        self._pool_locs: Tuple[int, int, int] = (-1, -1, -1)
+        self._instanced: Dict[SpritePool, PoolInstances] = {}
         # Retained staging: (cap, 4, 3) float32 corner arrays, rewritten in
         # place on dirty frames; capacity doubles, never shrinks.
         self._capacity = 0
         self._verts = np.zeros((0, 4, 3), dtype=np.float32)
         self._uvs = np.zeros((0, 4, 3), dtype=np.float32)
+        # (cap, 4) float32: each corner's palette-bank row.
+        self._rows = np.zeros((0, 4), dtype=np.float32)
+        self._palette_rows: Optional[VertexStream] = None
         self._nquads = 0
         self._runs: List[_Run] = []
+        # Every palette the current quads read, for .version.
+        self._palettes: Tuple[Palette, ...] = ()
         # (tileset, tile, flip, rot) -> (4, 3) UV corners. Source rects are
         # static per sheet, so each variant is computed once, ever.
         self._uv_cache: Dict[Tuple[str, str, bool, int], np.ndarray] = {}
@@ -144,6 +169,26 @@ class SpriteLayer(Layer):
         # rebuild. Fighters move every frame, so most frames are dirty --
         # the flag exists so a paused scene costs nothing.
         self._dirty = True
+        # Whether the pending change reaches the run plan; if not, only the
+        # entries in _moved need projecting again, into their slots.
+        self._replan = True
+        self._moved: Dict[Union[Sprite, SpritePool], None] = {}
+        # Each planned sprite's first quad, and the pools with a run.
+        self._slots: Dict[Sprite, int] = {}
+        self._planned_pools: Dict[SpritePool, None] = {}
+        # The camera, and the world rect (x0, y0, x1, y1) the plan kept
+        # sprites in -- the screen under the camera, plus the margin.
+        self._camera: Tuple[float, float] = (0.0, 0.0)
+        self._window: Optional[Tuple[int, int, int, int]] = None
+        self._culled = 0
+        # (assembly, flip, rot) -> the oriented parts' bounding rect about
+        # the anchor (x0, y0, x1, y1).
+        self._extents: Dict[Tuple[str, bool, int], Tuple[int, int, int, int]] = {}
+        # The same, joined with the assembly's named collision rects: the
+        # broadphase box query_rect() tests (None for a pose with neither).
+        self._reaches: Dict[
+            Tuple[str, bool, int], Optional[Tuple[int, int, int, int]]
+        ] = {}
         self._collision_dirty = True
         self._collision = SpriteCollision(self)
         # IS-A Layer: content and place are one object. See TileLayer.
@@ -170,7 +215,164 @@ class SpriteLayer(Layer):
         """Presentation changed: both GPU staging and collision composition
         need rebuilding before their next consumer."""
         self._dirty = True
+        self._replan = True
         self._collision_dirty = True
+        self._collision.invalidate()
+        self._changed()
+
+    def _move(self, entry: Union[Sprite, SpritePool]) -> None:
+        """Geometry changed, the plan did not: `entry` moved (or flipped or
+        turned) and keeps its quad slots, so only it is projected again."""
+        self._dirty = True
+        self._moved[entry] = None
+        self._collision_dirty = True
+        self._collision.move(entry)
+        self._changed()
+
+    # -- camera ------------------------------------------------------------
+
+    @property
+    def camera(self) -> Tuple[float, float]:
+        """The world position of the screen's top-left, floored to whole
+        pixels at draw -- the same space TileLayer.scroll is measured in,
+        so a scene pans by giving both the one camera. Drawing applies it
+        on the GPU; only a pan leaving the last plan's culling margin
+        re-plans. Collision planes stay screen-space: they follow it."""
+        return self._camera
+
+    @camera.setter
+    def camera(self, value: Tuple[float, float]) -> None:
+        camera = (float(value[0]), float(value[1]))
+        if camera == self._camera:
+            return
+        self._camera = camera
+        self._collision_dirty = True
+        self._collision.invalidate()
+        self._changed()
+        x0, y0, x1, y1 = self._screen()
+        window = self._window
+        if window is None or not (
+            window[0] <= x0 and window[1] <= y0 and x1 <= window[2] and y1 <= window[3]
+        ):
+            self._dirty = self._replan = True
+
+    @property
+    def culled(self) -> int:
+        """Visible sprites and pool instances the current plan left out as
+        off-screen."""
+        return self._culled + sum(
+            self._instanced[pool].culled for pool in self._planned_pools
+        )
+
+    def _camera_px(self) -> Tuple[int, int]:
+        return floor(self._camera[0]), floor(self._camera[1])
+
+    def _screen(self) -> Tuple[int, int, int, int]:
+        """The world rect the screen shows under the camera."""
+        from blitspersecond.system.config import Config
+
+        display = Config().display
+        x, y = self._camera_px()
+        return x, y, x + display.width, y + display.height
+
+    def _extent(self, s: Sprite) -> Tuple[int, int, int, int]:
+        assert s._assembly is not None and s._assembly_name is not None
+        key = (s._assembly_name, s._flip_x, s._rotation)
+        extent = self._extents.get(key)
+        if extent is None:
+            rects = [
+                _local_rect(
+                    0, 0, s._flip_x, s._rotation,
+                    part.offset.x, part.offset.y, r.width, r.height,
+                )
+                for part in s._assembly.parts
+                for r in (self._sheet.tilesets[part.tileset].tiles[part.tile],)
+            ]
+            extent = self._extents[key] = (
+                min(x for x, _, _, _ in rects),
+                min(y for _, y, _, _ in rects),
+                max(x + w for x, _, w, _ in rects),
+                max(y + h for _, y, _, h in rects),
+            )
+        return extent
+
+    def _in_window(self, s: Sprite) -> bool:
+        """Whether a (visible, posed, non-blank) sprite's floored bounding
+        rect meets the plan's window."""
+        assert self._window is not None
+        px, py = int(s._xy[0]), int(s._xy[1])
+        x0, y0, x1, y1 = self._extent(s)
+        wx0, wy0, wx1, wy1 = self._window
+        return px + x0 < wx1 and py + y0 < wy1 and px + x1 > wx0 and py + y1 > wy0
+
+    def _reach(self, s: Sprite) -> Optional[Tuple[int, int, int, int]]:
+        assert s._assembly is not None and s._assembly_name is not None
+        key = (s._assembly_name, s._flip_x, s._rotation)
+        if key in self._reaches:
+            return self._reaches[key]
+        rects = [
+            _local_rect(0, 0, s._flip_x, s._rotation, r.x, r.y, r.width, r.height)
+            for boxes in s._assembly.collision.values()
+            for r in boxes
+        ]
+        if s._assembly.parts:
+            x0, y0, x1, y1 = self._extent(s)
+            rects.append((x0, y0, x1 - x0, y1 - y0))
+        reach = self._reaches[key] = (
+            (
+                min(x for x, _, _, _ in rects),
+                min(y for _, y, _, _ in rects),
+                max(x + w for x, _, w, _ in rects),
+                max(y + h for _, y, _, h in rects),
+            )
+            if rects
+            else None
+        )
+        return reach
+
+    def query_rect(
+        self, x: int, y: int, w: int, h: int
+    ) -> Tuple[Tuple[Sprite, ...], Dict[SpritePool, np.ndarray]]:
+        """What is in the world-space rect (x, y, w, h) -- the layer's own
+        coordinates, so `camera` plus a screen position for a box on
+        screen: the visible sprites whose box meets it, in painter order,
+        and per pool with any, the sorted indices of the visible instances
+        that do (from the pool's grid). Boxes are the floored, oriented
+        footprint of the drawn parts joined with the named collision rects
+        -- a broadphase: pixels and planes are the collision queries'."""
+        box = np.array([[x, y, x + w, y + h]], dtype=np.int64)
+        sprites = []
+        pools: Dict[SpritePool, np.ndarray] = {}
+        for entry in self._entries():
+            if isinstance(entry, SpritePool):
+                _rows, found = entry.grid.query(box, entry._visible)
+                if len(found):
+                    pools[entry] = found
+                continue
+            if not entry._visible or entry._assembly is None:
+                continue
+            reach = self._reach(entry)
+            if reach is None:
+                continue
+            px, py = int(entry._xy[0]), int(entry._xy[1])
+            if (
+                px + reach[0] < x + w
+                and py + reach[1] < y + h
+                and px + reach[2] > x
+                and py + reach[3] > y
+            ):
+                sprites.append(entry)
+        return tuple(sprites), pools
+
+    @property
+    def version(self) -> Hashable:
+        """Every Sprite/pool change touches the layer; the tileset pixels
+        and the palettes the current runs draw with are counted apart."""
+        return (
+            self._version,
+            tuple(ts.buffer.version for ts in self._sheet.tilesets.values()),
+            tuple(palette.version for palette in self._palettes),
+        )
 
     def z(self, order: int) -> SpritePlane:
         """Address one integer painter plane inside this sprite layer.
@@ -225,15 +427,23 @@ class SpriteLayer(Layer):
 
     def _ensure_built(self) -> None:
         """Fetch the shared program on first use (needs a current GL
-        context). The picture pair is exactly this engine's shape: real
-        position/UV streams, colors/translate as generics, the palette as
-        the per-draw uniform."""
+        context). The blit pair is exactly this engine's shape: real
+        position/UV/palette-row streams, colors/translate as generics, the
+        palette bank on unit 1. Pools draw through the pool pair: the same
+        fragment stage over an instanced, table-driven vertex stage."""
         if self._shader is not None:
             return
-        self._shader = Shader.get("picture", "indexed")
+        self._shader = Shader.get("blit", "indexed")
         attrs = self._shader.program.attributes
         self._loc_colors = attrs["colors"]["location"]
         self._loc_translate = attrs["translate"]["location"]
+        self._pool_shader = Shader.get("pool", "indexed")
+        attrs = self._pool_shader.program.attributes
+        self._pool_locs = (
+            attrs["colors"]["location"],
+            attrs["translate"]["location"],
+            attrs["palette_row"]["location"],
+        )
 
     def _ensure_capacity(self, n: int) -> None:
         """Grow staging + GL buffers to hold >= n quads (doubling), and
@@ -247,6 +457,9 @@ class SpriteLayer(Layer):
         uvs = np.zeros((cap, 4, 3), dtype=np.float32)
         uvs[: self._capacity] = self._uvs
         self._uvs = uvs
+        rows = np.zeros((cap, 4), dtype=np.float32)
+        rows[: self._capacity] = self._rows
+        self._rows = rows
         self._capacity = cap
         # Static index pattern: two triangles per quad, for the whole
         # capacity -- runs draw contiguous slices of it by byte offset.
@@ -256,8 +469,9 @@ class SpriteLayer(Layer):
             np.tile(np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32), cap)
             + np.repeat(np.arange(cap, dtype=np.uint32) * 4, 6)
         )
-        self._positions = BufferObject(self._verts.nbytes)
-        self._texcoords = BufferObject(self._uvs.nbytes)
+        self._positions = VertexStream(self._verts.nbytes)
+        self._texcoords = VertexStream(self._uvs.nbytes)
+        self._palette_rows = VertexStream(self._rows.nbytes)
         self._indices = BufferObject(idx.nbytes)
         # ctypes address; the GL binding accepts it as a raw pointer even
         # though the stub only names Sequence[int] | CTypesPointer.
@@ -271,12 +485,13 @@ class SpriteLayer(Layer):
         attrs = self._shader.program.attributes
         self._vao = VertexArray()
         self._vao.bind()
-        self._positions.bind()
-        glEnableVertexAttribArray(attrs["position"]["location"])
-        glVertexAttribPointer(attrs["position"]["location"], 3, GL_FLOAT, False, 0, 0)
-        self._texcoords.bind()
-        glEnableVertexAttribArray(attrs["tex_coords"]["location"])
-        glVertexAttribPointer(attrs["tex_coords"]["location"], 3, GL_FLOAT, False, 0, 0)
+        for stream, name, components in (
+            (self._positions, "position", 3),
+            (self._texcoords, "tex_coords", 3),
+            (self._palette_rows, "palette_row", 1),
+        ):
+            glEnableVertexAttribArray(attrs[name]["location"])
+            stream.attach(self._vao, attrs[name]["location"], components)
         self._indices.bind_to_index_buffer()
         self._vao.unbind()
 
@@ -312,115 +527,170 @@ class SpriteLayer(Layer):
 
     # -- the frame plan ----------------------------------------------------
 
+    def _project(self, s: Sprite, n: int) -> List[Tuple[PixelBuffer, Palette]]:
+        """Write one sprite's quads into staging from quad `n` on: corners,
+        UVs and palette rows. Returns each part's (buffer, palette)."""
+        # Floored once per sprite, exactly as every engine floors --
+        # whole-pixel crispness (collision stamping floors identically,
+        # so draw and planes stay in lockstep).
+        assert s._assembly is not None
+        px, py = int(s._xy[0]), int(s._xy[1])
+        flip = s._flip_x
+        rot = s._rotation
+        parts = []
+        for part in s._assembly.parts:
+            ts = self._sheet.tilesets[part.tileset]
+            r = ts.tiles[part.tile]
+            # The offset moves via the shared orientation formula; the
+            # pixels follow via the flipped/rotated UV variant.
+            dx, dy, dw, dh = _local_rect(
+                px, py, flip, rot,
+                part.offset.x, part.offset.y, r.width, r.height,
+            )
+            v = self._verts[n]
+            v[0, 0] = dx
+            v[0, 1] = dy
+            v[1, 0] = dx + dw
+            v[1, 1] = dy
+            v[2, 0] = dx + dw
+            v[2, 1] = dy + dh
+            v[3, 0] = dx
+            v[3, 1] = dy + dh
+            self._uvs[n] = self._uv(part.tileset, part.tile, flip, rot)
+            # The palette table rides the quad's bank row. A part
+            # override outranks the instance register (effects pinned
+            # while the character recolours).
+            index = (
+                part.palette
+                if part.palette is not None
+                else s._palettes[part.tileset]
+            )
+            palette = ts.palettes[index]
+            self._rows[n] = PaletteBank.row(palette)
+            parts.append((ts.buffer, palette))
+            n += 1
+        return parts
+
     def _rebuild(self) -> None:
         """Project instance state into staging + the run list: the ordered
-        part walk with strictly order-preserving material coalescing."""
+        part walk with strictly order-preserving material coalescing, over
+        what the culling window keeps."""
+        x0, y0, x1, y1 = self._screen()
+        self._window = (
+            x0 - _CULL_MARGIN,
+            y0 - _CULL_MARGIN,
+            x1 + _CULL_MARGIN,
+            y1 + _CULL_MARGIN,
+        )
+        culled = 0
         total = 0
         for entry in self._entries():
             if isinstance(entry, SpritePool):
-                total += entry.count_visible
-            elif entry._visible and entry._assembly is not None:
+                continue  # instanced: no quad staging
+            if entry._visible and entry._assembly is not None:
                 total += len(entry._assembly.parts)
         self._ensure_capacity(total)
         runs: List[_Run] = []
+        palettes: Dict[Palette, None] = {}
+        slots: Dict[Sprite, int] = {}
+        pools: Dict[SpritePool, None] = {}
         key = None
         n = 0
         for s in self._entries():
             if isinstance(s, SpritePool):
-                indices = np.flatnonzero(s._visible)
-                count = len(indices)
-                if not count:
+                if not s._visible.any():
                     continue
-                s._ensure_templates()
-                assert s._uvs is not None
-                flip = s._flip_x[indices].astype(np.intp)
-                rotation = (s._rotation[indices] & 3).astype(np.intp)
-                variant = flip * 4 + rotation
-                assembly_ids = s._assembly_ids[indices]
-                rects = s._rects[assembly_ids, variant]
-                xy = np.floor(s._positions[indices]).astype(np.int32)
-                x0 = xy[:, 0] + rects[:, 0]
-                y0 = xy[:, 1] + rects[:, 1]
-                x1 = x0 + rects[:, 2]
-                y1 = y0 + rects[:, 3]
-                v = self._verts[n : n + count]
-                v[:, 0, 0], v[:, 0, 1] = x0, y0
-                v[:, 1, 0], v[:, 1, 1] = x1, y0
-                v[:, 2, 0], v[:, 2, 1] = x1, y1
-                v[:, 3, 0], v[:, 3, 1] = x0, y1
-                self._uvs[n : n + count] = s._uvs[
-                    assembly_ids, flip, rotation
-                ]
-                material = (s._buffer, s._palette, s._color)
-                if material == key:
-                    buffer, palette, col, first, old_count = runs[-1]
-                    runs[-1] = (
-                        buffer, palette, col, first, old_count + count
-                    )
-                else:
-                    runs.append((*material, n, count))
-                    key = material
-                n += count
+                # A pool is its own run: one quad, instanced, whatever its
+                # neighbours' material.
+                instances = self._instanced.get(s)
+                if instances is None:
+                    assert self._pool_shader is not None
+                    instances = PoolInstances(s, self._pool_shader.program)
+                    self._instanced[s] = instances
+                instances.upload(s, self._window)
+                palettes[s._palette] = None
+                pools[s] = None
+                runs.append((s._buffer, s._color, 0, 1, instances))
+                key = None
                 continue
-            if not s._visible or s._assembly is None:
+            if not s._visible or s._assembly is None or not s._assembly.parts:
+                continue
+            if not self._in_window(s):
+                culled += 1
                 continue
-            # Floored once per sprite, exactly as every engine floors --
-            # whole-pixel crispness (collision stamping floors identically,
-            # so draw and planes stay in lockstep).
-            px, py = int(s._xy[0]), int(s._xy[1])
-            flip = s._flip_x
-            rot = s._rotation
             colors = (s._color[0], s._color[1], s._color[2], s._color[3])
-            for part in s._assembly.parts:
-                ts = self._sheet.tilesets[part.tileset]
-                r = ts.tiles[part.tile]
-                # The offset moves via the shared orientation formula; the
-                # pixels follow via the flipped/rotated UV variant.
-                dx, dy, dw, dh = _local_rect(
-                    px, py, flip, rot,
-                    part.offset.x, part.offset.y, r.width, r.height,
-                )
-                v = self._verts[n]
-                v[0, 0] = dx
-                v[0, 1] = dy
-                v[1, 0] = dx + dw
-                v[1, 1] = dy
-                v[2, 0] = dx + dw
-                v[2, 1] = dy + dh
-                v[3, 0] = dx
-                v[3, 1] = dy + dh
-                self._uvs[n] = self._uv(part.tileset, part.tile, flip, rot)
-                # The material: which texture, which palette table, which
-                # colour registers. A part override outranks the instance
-                # register (effects pinned while the character recolours).
-                index = (
-                    part.palette
-                    if part.palette is not None
-                    else s._palettes[part.tileset]
-                )
-                material = (ts.buffer, ts.palettes[index], colors)
+            slots[s] = n
+            for buffer, palette in self._project(s, n):
+                palettes[palette] = None
+                # The material: which texture, which colour registers.
+                material = (buffer, colors)
                 if material == key:
-                    buffer, palette, col, first, count = runs[-1]
-                    runs[-1] = (buffer, palette, col, first, count + 1)
+                    buffer, col, first, count, _ = runs[-1]
+                    runs[-1] = (buffer, col, first, count + 1, None)
                 else:
-                    runs.append((*material, n, 1))
+                    runs.append((*material, n, 1, None))
                     key = material
                 n += 1
         self._nquads = n
         self._runs = runs
-        self._dirty = False
+        self._palettes = tuple(palettes)
+        self._slots = slots
+        self._planned_pools = pools
+        self._culled = culled
+        self._moved.clear()
+        self._dirty = self._replan = False
         if n and self._positions is not None and self._texcoords is not None:
-            nbytes = n * 12 * 4  # quads x 4 corners x 3 floats x float32
-            self._positions.set_data_region(
-                self._verts.ctypes.data,  # pyright: ignore[reportArgumentType]
-                0,
-                nbytes,
-            )
-            self._texcoords.set_data_region(
-                self._uvs.ctypes.data,  # pyright: ignore[reportArgumentType]
-                0,
-                nbytes,
-            )
+            assert self._palette_rows is not None
+            # Straight into mapped memory no in-flight draw reads.
+            self._positions.write(self._verts[:n])
+            self._texcoords.write(self._uvs[:n])
+            self._palette_rows.write(self._rows[:n])
+
+    def _update(self) -> None:
+        """The plan stands: project the moved sprites into their own slots
+        and upload only those quads' bytes (palette rows are untouched by a
+        move); re-upload (and re-cull) the moved pools' instances. A pool
+        that emptied or came back, or a culled sprite moving into the
+        window, changes the plan, so that re-plans after all."""
+        spans: List[Tuple[int, int]] = []
+        for entry in self._moved:
+            if isinstance(entry, SpritePool):
+                if entry._visible.any() != (entry in self._planned_pools):
+                    self._rebuild()
+                    return
+                if entry in self._planned_pools:
+                    assert self._window is not None
+                    self._instanced[entry].upload(entry, self._window)
+                continue
+            first = self._slots.get(entry)
+            if first is not None:
+                count = len(self._project(entry, first))
+                spans.append((first, first + count))
+            elif (
+                entry._visible
+                and entry._assembly is not None
+                and entry._assembly.parts
+                and self._in_window(entry)
+            ):
+                self._rebuild()
+                return
+        self._moved.clear()
+        self._dirty = False
+        if not spans or self._positions is None or self._texcoords is None:
+            return
+        # Sorted, with touching ranges merged: one copy per stretch.
+        spans.sort()
+        merged = [spans[0]]
+        for first, stop in spans[1:]:
+            if first <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+            else:
+                merged.append((first, stop))
+        quad = self._verts[0].nbytes
+        byte_spans = [(first * quad, stop * quad) for first, stop in merged]
+        n = self._nquads
+        self._positions.write_ranges(self._verts[:n], byte_spans)
+        self._texcoords.write_ranges(self._uvs[:n], byte_spans)
 
     def prepare(self) -> None:
         """Prepare both retained projections after presentation changes:
@@ -432,55 +702,66 @@ class SpriteLayer(Layer):
             _ = ts.buffer.texture
         if self._collision_dirty:
             self._collision.rebuild()
-        if self._dirty:
+        if self._replan:
             self._rebuild()
-
-    def _composite(self) -> None:
-        """The frame plan, executed: program + blend once, then per run --
-        texture bind and palette upload only when they actually change --
-        the colour registers and one glDrawElements over the run's slice."""
+        elif self._dirty:
+            self._update()
+
+    def _record(self, draws: DrawList) -> None:
+        """The frame plan, recorded: one command per run -- texture, the
+        colour register and the run's slice of the index buffer, with the
+        palette bank on unit 1 for every run alike; a pool's run is its
+        instanced quad, its table on unit 2. The DrawList binds a texture
+        only when it differs from the previous draw's."""
         self.prepare()
-        if not self._nquads:
+        if not self._runs:
             return
-        assert self._shader is not None and self._vao is not None
+        assert self._shader is not None and self._pool_shader is not None
+        assert self._vao is not None  # built with the shaders
         program = self._shader.program
-        program.use()
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        # Positions are baked per frame, so the translate generic stays
-        # zero; set per draw because generic attributes are context state
-        # other engines' draws overwrite (as are the colour registers).
-        glVertexAttrib3f(self._loc_translate, 0.0, 0.0, 0.0)
-        self._vao.bind()
-        bound_texture: Optional[Texture] = None
-        bound_palette: Optional[Palette] = None
-        for buffer, palette, colors, first, count in self._runs:
-            # Touch (possibly upload) BEFORE binding: .texture and
-            # PaletteTexture.get blit_into on whatever unit is active, so
-            # they must not run between the unit assignments below.
-            texture = buffer.texture
-            if palette is not bound_palette:
-                # The palette rides texture unit 1 (palette RAM as a 256x1
-                # texture, see PaletteTexture): a run's palette switch is a
-                # texture bind, not a 256-vec4 uniform send -- material
-                # transitions got cheaper. A palette upload may have
-                # disturbed unit 0's binding, so force the atlas re-bind.
-                ptex = PaletteTexture.get(palette)
-                program["palette_texture"] = 1
-                glActiveTexture(GL_TEXTURE1)
-                glBindTexture(ptex.target, ptex.id)
-                glActiveTexture(GL_TEXTURE0)
-                bound_palette = palette
-                bound_texture = None
-            if texture is not bound_texture:
-                glActiveTexture(GL_TEXTURE0)
-                glBindTexture(texture.target, texture.id)
-                bound_texture = texture
-            glVertexAttrib4f(self._loc_colors, *colors)
-            glDrawElements(GL_TRIANGLES, count * 6, GL_UNSIGNED_INT, first * 24)
-        self._vao.unbind()
-        glDisable(GL_BLEND)
-        program.stop()
+        # Fetched (and any stale rows uploaded) while recording, so nothing
+        # uploads mid-flush.
+        bank = PaletteBank.texture()
+        # The translate generic is the camera, negated; recorded per draw
+        # because generic attributes are context state other engines' draws
+        # overwrite (as are the colour registers).
+        cx, cy = self._camera_px()
+        camera = (float(-cx), float(-cy), 0.0)
+        translate = (self._loc_translate, camera)
+        pool_colors, pool_translate, pool_row = self._pool_locs
+        for buffer, colors, first, count, instances in self._runs:
+            if instances is not None:
+                if not instances.count:
+                    continue  # every visible instance culled
+                draws.add(
+                    DrawCommand(
+                        self._pool_shader.program,
+                        instances.vao,
+                        buffer.texture,
+                        bank,
+                        (
+                            (pool_translate, camera),
+                            (pool_colors, tuple(colors)),
+                            (pool_row, (instances.palette_row,)),
+                        ),
+                        0,
+                        1,
+                        instances.table,
+                        instances.count,
+                    )
+                )
+                continue
+            draws.add(
+                DrawCommand(
+                    program,
+                    self._vao,
+                    buffer.texture,
+                    bank,
+                    (translate, (self._loc_colors, tuple(colors))),
+                    first,
+                    count,
+                )
+            )
 
     # -- collision (retained packed screen-space planes) --------------------
 
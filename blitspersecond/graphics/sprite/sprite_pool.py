@@ -1,8 +1,12 @@
 from contextlib import contextmanager
-from typing import Iterable, Iterator, Optional, Tuple
+from typing import Iterable, Iterator, Optional, Tuple, Union
 
 import numpy as np
 
+from blitspersecond.graphics.common import Collidable, PlaneCollidable
+
+from .pool_grid import PoolGrid
+
 
 class SpritePool:
     """A dense, ordered set of compatible one-part sprite instances.
@@ -16,6 +20,8 @@ class SpritePool:
     """
 
     def __init__(self, engine, z: int, assemblies: Iterable[str]) -> None:
+        from .sprite_layer import _local_rect
+
         self._engine = engine
         self.z = int(z)
         names = tuple(assemblies)
@@ -82,6 +88,23 @@ class SpritePool:
                     self._rects[index, variant] = engine._local_rect_origin(
                         bool(flip), rotation, part, rect
                     )
+        # The same per orientation as (x0, y0, x1, y1), joined with every
+        # named collision rect: the broadphase box (see PoolGrid).
+        self._bounds = np.empty_like(self._rects)
+        for index, name in enumerate(unique_names):
+            named = engine.sheet.assemblies[name].collision.values()
+            for variant in range(8):
+                x, y, width, height = self._rects[index, variant]
+                x0, y0, x1, y1 = x, y, x + width, y + height
+                for rect in (rect for boxes in named for rect in boxes):
+                    x, y, width, height = _local_rect(
+                        0, 0, bool(variant >> 2), variant & 3,
+                        rect.x, rect.y, rect.width, rect.height,
+                    )
+                    x0, y0 = min(x0, x), min(y0, y)
+                    x1, y1 = max(x1, x + width), max(y1, y + height)
+                self._bounds[index, variant] = (x0, y0, x1, y1)
+        self._grid: Optional[PoolGrid] = None
 
     def _ensure_templates(self) -> None:
         if self._uvs is not None:
@@ -100,11 +123,14 @@ class SpritePool:
 
     @contextmanager
     def edit(self) -> Iterator["SpritePool"]:
-        """Mutate array state and mark the renderer dirty once on exit."""
+        """Mutate array state and mark the renderer dirty once on exit --
+        this pool only: the rest of the layer's plan stands."""
         try:
             yield self
         finally:
-            self._engine._touch()
+            if self._grid is not None:
+                self._grid.mark()
+            self._engine._move(self)
 
     @property
     def positions(self) -> np.ndarray:
@@ -147,6 +173,55 @@ class SpritePool:
     def count_visible(self) -> int:
         return int(np.count_nonzero(self._visible))
 
+    @property
+    def grid(self) -> PoolGrid:
+        """The pool's broadphase index, built on first use and refiled on
+        the first query after each edit()."""
+        if self._grid is None:
+            self._grid = PoolGrid(self)
+        return self._grid
+
+    def pairs(self, other: "SpritePool") -> Tuple[np.ndarray, np.ndarray]:
+        """Broadphase candidates between two pools: index arrays (i, j),
+        sorted, for every visible, colliding instance i of this pool whose
+        box meets that of instance j of `other` -- on screen or not. Each
+        pool's camera is applied, so pools on different layers pair where
+        they appear. Against itself, each pair comes once, with i < j. The
+        boxes are conservative (see PoolGrid): narrowphase is the caller's,
+        or hits()."""
+        mine = self.grid
+        cx, cy = self._engine._camera_px()
+        ox, oy = other._engine._camera_px()
+        queries = np.flatnonzero(other._visible & other._collide)
+        boxes = other.grid.boxes[queries]
+        boxes[:, 0::2] += cx - ox
+        boxes[:, 1::2] += cy - oy
+        rows, i = mine.query(boxes, self._visible & self._collide)
+        j = queries[rows]
+        if other is self:
+            keep = i < j
+            i, j = i[keep], j[keep]
+        order = np.lexsort((j, i))
+        return i[order], j[order]
+
+    def hits(
+        self,
+        other: Union[Collidable, PlaneCollidable],
+        mine: Union[str, Tuple[str, ...], None] = None,
+        theirs: Union[str, Tuple[str, ...], None] = None,
+    ) -> np.ndarray:
+        """Which instances collide: the sorted indices of visible, colliding
+        instances whose own stamp meets `other` -- the question
+        ``layer.collides_with(other, mine, theirs).at()`` asks of the whole
+        shared plane, attributed per instance. Selectors validate exactly
+        as there. Opt-in and on demand: nothing extra is kept per stamp,
+        and a negative whole-plane answer returns at once, empty."""
+        query = self._engine.collides_with(other, mine=mine, theirs=theirs)
+        if not query.at():
+            return np.empty(0, dtype=np.intp)
+        planes, against = query.sides()
+        return self._engine._collision.pool_hits(self, planes, against)
+
 
 class SpritePlane:
     """One integer painter plane inside a SpriteEngine."""
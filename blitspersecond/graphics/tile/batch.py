@@ -12,55 +12,44 @@ already live in a numpy SoA.
 
 So the whole render state collapses to:
 
-  * position VBO  -- (cap, 4, 3) float32, rewritten in ONE glBufferSubData
-                     when the bounded local tilemap changes. Fine scrolling
-                     remains a generic translate attribute and writes no VBO.
-  * tex_coords VBO -- written at blit() time into a CPU mirror, uploaded
+  * position VBO  -- (cap, 4, 3) float32, rewritten in ONE VertexStream
+                     write when the bounded local tilemap changes. Fine
+                     scrolling remains a generic translate attribute and
+                     writes no VBO.
+  * tex_coords VBO -- written at blit() time into a CPU mirror, streamed
                      lazily in one shot; static thereafter.
   * index buffer  -- the fixed quad pattern [0,1,2, 0,2,3]+4i, rebuilt only on
                      capacity growth.
-  * constant attrs -- colors/translate/scale/rotation from bps's shared
-                     default.vert are fed as *generic* vertex attributes
-                     (glVertexAttrib*f, set per draw, no buffers): disabled
-                     attribute arrays read the current generic value, so the
-                     shared shader stays untouched. (A leaner tile.vert that
-                     drops the per-vertex matrix build is a possible later
-                     step -- GPU-side, not our bottleneck.)
+  * constant attrs -- colors/translate/palette_row are fed as *generic*
+                     vertex attributes (glVertexAttrib*f, set per draw, no
+                     buffers): disabled attribute arrays read the current
+                     generic value. The engines draw with blit.vert, which
+                     only adds translate and projects; under the general
+                     default.vert, scale/rotation are fed as constants too.
 
 Vertex corner order matches Sprite's (x1,y1)(x2,y1)(x2,y2)(x1,y2) so a
 TextureRegion's 12 tex_coords floats pair up verbatim. The WindowBlock
 projection UBO plumbing comes with the ShaderProgram itself, so drawing outside
-a pyglet Batch needs no extra wiring.
+a pyglet Batch needs no extra wiring. A batch does not draw itself in the
+frame: it records one command into the compositor's DrawList, which issues the
+state only where it differs from the previous layer's draw.
 """
 
+import weakref
 from enum import IntFlag
-from typing import Callable, Tuple
+from typing import TYPE_CHECKING, Tuple
 
 import numpy as np
-from pyglet.gl import (
-    GL_BLEND,
-    GL_FLOAT,
-    GL_ONE_MINUS_SRC_ALPHA,
-    GL_SRC_ALPHA,
-    GL_TEXTURE0,
-    GL_TRIANGLES,
-    GL_UNSIGNED_INT,
-    glActiveTexture,
-    glBindTexture,
-    glBlendFunc,
-    glDisable,
-    glDrawElements,
-    glEnable,
-    glEnableVertexAttribArray,
-    glVertexAttrib1f,
-    glVertexAttrib2f,
-    glVertexAttrib3f,
-    glVertexAttrib4f,
-    glVertexAttribPointer,
-)
+from pyglet.gl import glEnableVertexAttribArray
 from pyglet.graphics.vertexarray import VertexArray
 from pyglet.graphics.vertexbuffer import BufferObject
 
+from blitspersecond.graphics.internal import DrawCommand, DrawList, VertexStream
+
+if TYPE_CHECKING:
+    from .tile_atlas import TileAtlas
+
+
 class TileFlags(IntFlag):
     """Orientation of one placement: the TMX flip bits, engine-side.
 
@@ -112,13 +101,62 @@ def _uv_perms() -> Tuple[Tuple[int, ...], ...]:
 
 
 _UV_PERMS = _uv_perms()
-
-# The constant per-quad state Sprite kept as full vertex streams. Fed as generic
-# attributes instead: (attribute name, glVertexAttrib fn, values). `translate`
-# is generic too but not constant -- it's the scroll register (see draw()).
+# The same LUT as an (8, 4) gather index, so a whole plane's orientations
+# apply in one fancy-indexed take (see set_quads).
+_UV_PERM_TABLE = np.array(_UV_PERMS, dtype=np.intp)
+
+# Per-atlas quad tables, keyed weakly on the TileAtlas like collision's
+# pattern cache. Each entry is (texture, tile_size, sources, tex_coords); a
+# different texture object or a regridded atlas rebuilds it.
+_ATLAS_QUADS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _atlas_quads(atlas: "TileAtlas") -> Tuple[np.ndarray, np.ndarray]:
+    """Every tile of `atlas` as source origins and unoriented tex_coords.
+
+    Returns ((n, 2) int32 pixel origins, (n, 4, 3) float32 UV corners),
+    indexed by the atlas's flat row-major tile index -- the lookup a map
+    plane's `tile` column gathers through. The UVs are TextureRegion's own
+    arithmetic, vectorised over the grid, so they match atlas.region(i)
+    .tex_coords float for float. Needs a current GL context (the texture
+    supplies the owner coordinates), exactly like region()."""
+    texture = atlas.buffer.texture
+    tile_size = (int(atlas.tile_size[0]), int(atlas.tile_size[1]))
+    entry = _ATLAS_QUADS.get(atlas)
+    if entry is not None and entry[0] is texture and entry[1] == tile_size:
+        return entry[2], entry[3]
+    tw, th = tile_size
+    columns = atlas.columns
+    index = np.arange(len(atlas))
+    sources = np.empty((len(index), 2), dtype=np.int32)
+    sources[:, 0] = index % columns * tw
+    sources[:, 1] = index // columns * th
+    # pyglet.image.TextureRegion.__init__, one column at a time, in the same
+    # float64 operation order before the float32 narrowing set_quad applies.
+    owner = texture.tex_coords
+    scale_u = owner[3] - owner[0]
+    scale_v = owner[7] - owner[1]
+    x, y = sources[:, 0], sources[:, 1]
+    u1 = x / texture.width * scale_u + owner[0]
+    v1 = y / texture.height * scale_v + owner[1]
+    u2 = (x + tw) / texture.width * scale_u + owner[0]
+    v2 = (y + th) / texture.height * scale_v + owner[1]
+    uvs = np.empty((len(index), 4, 3), dtype=np.float32)
+    uvs[:, :, 2] = owner[2]
+    uvs[:, 0, 0], uvs[:, 0, 1] = u1, v1
+    uvs[:, 1, 0], uvs[:, 1, 1] = u2, v1
+    uvs[:, 2, 0], uvs[:, 2, 1] = u2, v2
+    uvs[:, 3, 0], uvs[:, 3, 1] = u1, v2
+    _ATLAS_QUADS[atlas] = (texture, tile_size, sources, uvs)
+    return sources, uvs
+
+# The constant per-quad state Sprite kept as full vertex streams, for programs
+# that still declare it (default.vert; blit.vert has neither). Fed as generic
+# attributes instead: (attribute name, values). `translate` is generic too but
+# not constant -- it's the scroll register (see record()).
 _CONST_ATTRS = (
-    ("scale", glVertexAttrib2f, (1.0, 1.0)),
-    ("rotation", glVertexAttrib1f, (0.0,)),
+    ("scale", (1.0, 1.0)),
+    ("rotation", (0.0,)),
 )
 
 
@@ -136,28 +174,34 @@ class TileBatch:
         self._loc_position: int = attrs["position"]["location"]
         self._loc_tex_coords: int = attrs["tex_coords"]["location"]
         # Generic-attribute constants, resolved to locations once. Missing names
-        # are skipped so a future leaner tile shader Just Works.
-        self._const_attrs: list[Tuple[Callable[..., None], int, Tuple[float, ...]]] = [
-            (fn, attrs[name]["location"], vals)
-            for name, fn, vals in _CONST_ATTRS
+        # are skipped, so the lean blit program gets none.
+        self._const_attrs: list[Tuple[int, Tuple[float, ...]]] = [
+            (attrs[name]["location"], vals)
+            for name, vals in _CONST_ATTRS
             if name in attrs
         ]
 
         self._loc_translate: int = attrs["translate"]["location"]
         # The whole-batch colour register: rgba multipliers fed as one
-        # constant attribute per draw (see draw(colors=...)). -1 = the
+        # constant attribute per draw (see record(colors=...)). -1 = the
         # shader has no colors attribute and tinting is silently absent.
         self._loc_colors: int = attrs.get("colors", {}).get("location", -1)
+        # Which palette-bank row an indexed draw looks up: one constant per
+        # draw, like the colour register. -1 under the direct program.
+        self._loc_palette_row: int = attrs.get("palette_row", {}).get("location", -1)
         self._capacity = 0
         self._vao = VertexArray()
-        self._positions: BufferObject | None = None
-        self._texcoords: BufferObject | None = None
+        self._positions: VertexStream | None = None
+        self._texcoords: VertexStream | None = None
         self._indices: BufferObject | None = None
         # CPU mirror of the tex_coords stream plus permanent compaction scratch.
         # Rows are written by set_quad() and flushed in one glBufferSubData.
         self._uv = np.zeros((0, 4, 3), dtype=np.float32)
         self._uv_scratch = np.zeros((0, 4, 3), dtype=np.float32)
         self._uv_dirty = False
+        # Quads the last tex_coords write covered: a stream write replaces
+        # everything, so a draw of more quads than that must write again.
+        self._uv_count = 0
         self.resize(max(8, capacity))
 
     @property
@@ -176,8 +220,8 @@ class TileBatch:
             if buf is not None:
                 buf.delete()
 
-        self._positions = BufferObject(capacity * 4 * 3 * 4)
-        self._texcoords = BufferObject(capacity * 4 * 3 * 4)
+        self._positions = VertexStream(capacity * 4 * 3 * 4)
+        self._texcoords = VertexStream(capacity * 4 * 3 * 4)
         self._indices = BufferObject(capacity * 6 * 4)
 
         # Static index pattern: quad i -> [0,1,2, 0,2,3] + 4i.
@@ -203,12 +247,10 @@ class TileBatch:
         # constant attributes stay *disabled* here -- that's what makes their
         # generic values apply.
         self._vao.bind()
-        self._positions.bind()
         glEnableVertexAttribArray(self._loc_position)
-        glVertexAttribPointer(self._loc_position, 3, GL_FLOAT, False, 0, 0)
-        self._texcoords.bind()
+        self._positions.attach(self._vao, self._loc_position, 3)
         glEnableVertexAttribArray(self._loc_tex_coords)
-        glVertexAttribPointer(self._loc_tex_coords, 3, GL_FLOAT, False, 0, 0)
+        self._texcoords.attach(self._vao, self._loc_tex_coords, 3)
         self._indices.bind_to_index_buffer()
         self._vao.unbind()
 
@@ -227,6 +269,22 @@ class TileBatch:
         self._uv[index] = uv
         self._uv_dirty = True
 
+    def set_quads(
+        self, start: int, tex_coords: np.ndarray, flags: np.ndarray
+    ) -> None:
+        """Bulk set_quad: write quads [start, start + m) from (m, 4, 3)
+        unoriented tex_coords and m per-quad flags. The same _UV_PERMS pairing,
+        applied as one fancy-indexed gather, so stamping a whole map plane
+        costs one take rather than m reshapes."""
+        m = len(tex_coords)
+        if m == 0:
+            return
+        perm = _UV_PERM_TABLE[np.asarray(flags, dtype=np.intp) & 7]
+        self._uv[start : start + m] = tex_coords[
+            np.arange(m)[:, None], perm
+        ]
+        self._uv_dirty = True
+
     def compact(self, indices: np.ndarray) -> None:
         """Keep UV rows `indices` densely from row zero, preserving order.
 
@@ -240,25 +298,28 @@ class TileBatch:
         self._uv_dirty = True
 
     def upload_positions(self, verts: np.ndarray) -> None:
-        """One glBufferSubData of the compact live range.
-        `verts` is C-contiguous (n, 4, 3) float32 -- corner order as set_quad --
-        and already expanded from each placement's origin + extent."""
+        """One stream write of the compact live range (which replaces the
+        whole stream). `verts` is C-contiguous (n, 4, 3) float32 -- corner
+        order as set_quad -- and already expanded from each placement's
+        origin + extent."""
         assert self._positions is not None
-        self._positions.set_data_region(
-            verts.ctypes.data,  # pyright: ignore[reportArgumentType]
-            0,
-            verts.nbytes,
-        )
+        self._positions.write(verts)
 
-    def draw(
+    def record(
         self,
+        draws: DrawList,
         texture,
         count: int,
         translate: Tuple[float, float] = (0.0, 0.0),
         colors: Tuple[float, float, float, float] = (1.0, 1.0, 1.0, 1.0),
+        palette=None,
+        palette_row: int = 0,
     ) -> None:
-        """Draw quads [0, count): program + texture + blend state (same recipe
-        as SpriteGroup.set_state), constant attrs, one glDrawElements.
+        """Record quads [0, count) into the frame's DrawList: program, texture,
+        `palette` (the PaletteBank texture, indexed programs only), the row
+        of it this batch reads (`palette_row`) and the constant attributes.
+        Any pending tex_coords flush happens now, while recording, so
+        executing the list never uploads.
 
         `translate` is the scroll register, Amiga-style: one generic vertex
         attribute shifts every quad on the GPU, so scrolling a whole layer
@@ -271,30 +332,39 @@ class TileBatch:
         layer writes no buffers."""
         if count == 0:
             return
-        self._program.use()
-        glActiveTexture(GL_TEXTURE0)
-        glBindTexture(texture.target, texture.id)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        for fn, loc, vals in self._const_attrs:
-            fn(loc, *vals)
-        if self._loc_colors >= 0:
-            glVertexAttrib4f(self._loc_colors, *colors)
-        glVertexAttrib3f(self._loc_translate, translate[0], translate[1], 0.0)
-        self._vao.bind()
-        if self._uv_dirty:
+        if self._uv_dirty or count > self._uv_count:
             assert self._texcoords is not None
-            live = self._uv[:count]
-            self._texcoords.set_data_region(
-                live.ctypes.data,  # pyright: ignore[reportArgumentType]
-                0,
-                live.nbytes,
-            )
+            self._texcoords.write(self._uv[:count])
             self._uv_dirty = False
-        glDrawElements(GL_TRIANGLES, count * 6, GL_UNSIGNED_INT, 0)
-        self._vao.unbind()
-        glDisable(GL_BLEND)
-        self._program.stop()
+            self._uv_count = count
+        attrs = list(self._const_attrs)
+        if self._loc_colors >= 0:
+            attrs.append((self._loc_colors, tuple(colors)))
+        if self._loc_palette_row >= 0:
+            attrs.append((self._loc_palette_row, (float(palette_row),)))
+        attrs.append(
+            (self._loc_translate, (float(translate[0]), float(translate[1]), 0.0))
+        )
+        draws.add(
+            DrawCommand(
+                self._program, self._vao, texture, palette, tuple(attrs), 0, count
+            )
+        )
+
+    def draw(
+        self,
+        texture,
+        count: int,
+        translate: Tuple[float, float] = (0.0, 0.0),
+        colors: Tuple[float, float, float, float] = (1.0, 1.0, 1.0, 1.0),
+        palette=None,
+        palette_row: int = 0,
+    ) -> None:
+        """record() and execute at once -- a one-command DrawList, for a draw
+        outside the compositor's frame list."""
+        draws = DrawList()
+        self.record(draws, texture, count, translate, colors, palette, palette_row)
+        draws.flush()
 
     def delete(self) -> None:
         """Release the GL objects now rather than at GC time."""
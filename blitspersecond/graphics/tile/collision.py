@@ -25,6 +25,8 @@ from blitspersecond.graphics.common import (
     CWORD_BITS,
     CWORD_SHIFT,
     CollisionQuery,
+    stamp_pattern,
+    warm_stamp_kernel,
 )
 
 from .batch import TileFlags
@@ -106,9 +108,7 @@ class CollisionMask:
         self._cmask_stage: Optional[np.ndarray] = None
         self._capron: Tuple[int, int] = (0, 0)  # (rows, words) each side
         self._cdims: Tuple[int, int, int] = (0, 0, 0)  # (h, w px, w words)
-        # restamp()'s reusable work vectors (uint64 shift staging, uint32
-        # lo/hi words, intp flat indices), grown with the placement count.
-        self._cwork: Optional[Tuple[np.ndarray, ...]] = None
+        warm_stamp_kernel()
 
     def ensure(self, tw: int = 0, th: int = 0) -> np.ndarray:
         """The padded packed store, (re)built to fit tiles up to (tw, th)
@@ -247,28 +247,33 @@ class CollisionMask:
 
     def restamp(self, tiles: np.ndarray, scroll: Tuple[float, float]) -> None:
         """Rebuild the packed mask wholesale from the live SoA slice: clear,
-        then re-stamp every local placement intersecting the bordered store.
+        then re-stamp every local placement intersecting the bordered store
+        (see stamp_many)."""
+        self.ensure().fill(0)
+        self.stamp_many(tiles, scroll)
+
+    def stamp_many(self, tiles: np.ndarray, scroll: Tuple[float, float]) -> None:
+        """OR a slice of placement rows into the packed mask without clearing
+        it -- the batched twin of stamp(), used when a whole map plane lands
+        in one blit.
 
         Vectorised per (tile row x word): for each distinct (source, flags)
         the oriented row bit patterns come from the atlas's lazy pattern
-        cache, and each pattern word becomes two np.bitwise_or.at scatters
-        (low/high split of pattern << (x & 31)) across every placement wearing
-        that tile orientation. ufunc.at, not fancy `|=`: stamps sharing a word
-        are duplicate indices, which `|=` silently drops and .at accumulates
-        correctly. Work vectors are persistent and grown with the placement
-        count -- the per-frame path allocates nothing beyond per-kind
-        selections."""
-        cm = self.ensure()
-        cm.fill(0)
+        cache, and one compiled stamp_pattern pass ORs them (low/high split
+        of pattern << (x & 31)) at every placement wearing that tile
+        orientation. A scatter, not fancy `|=`: stamps sharing a word are
+        duplicate indices, which `|=` silently drops and the kernel's
+        in-order ORs accumulate correctly. The per-frame path allocates
+        nothing beyond per-kind selections."""
         n = len(tiles)
         if n == 0:
             return
-        h, w, _ = self._cdims
         sx, sy = int(scroll[0]), int(scroll[1])
         tx = tiles["target"][:, 0] - sx
         ty = tiles["target"][:, 1] - sy
         tw, th = tiles["size"][:, 0], tiles["size"][:, 1]
         cm = self.ensure(int(tw.max()), int(th.max()))
+        h, w, _ = self._cdims
         ah, aw = self._capron
         vis = (
             (tx + tw > -(aw * CWORD_BITS))
@@ -287,44 +292,17 @@ class CollisionMask:
         src = tiles["source"].astype(np.uint64)
         flags = tiles["flags"].astype(np.uint64)
         key = (src[:, 0] << np.uint64(19)) | (src[:, 1] << np.uint64(3)) | flags
-        if self._cwork is None or len(self._cwork[0]) < n:
-            cap = max(8, n)
-            if self._cwork is not None:
-                cap = max(cap, 2 * len(self._cwork[0]))
-            self._cwork = (
-                np.empty(cap, dtype=np.uint64),  # shift staging
-                np.empty(cap, dtype=np.uint64),  # lo/hi extraction
-                np.empty(cap, dtype=CWORD),  # scatter values
-                np.empty(cap, dtype=np.intp),  # flat indices
-            )
-        vbuf, ebuf, wbuf, ibuf = self._cwork
         ktw, kth = self._atlas.tile_size
         for k in np.unique(key[vis]):
             sel = np.nonzero(vis & (key == k))[0]
-            m = len(sel)
             ksx = int(k >> np.uint64(19))
             ksy = int((k >> np.uint64(3)) & np.uint64(0xFFFF))
             kflags = int(k & np.uint64(7))
             pats = _patterns(self._atlas, ksx, ksy, ktw, kth, kflags)
-            nw = pats.shape[1]
             xs, ys = tx[sel], ty[sel]
             off = (xs & (CWORD_BITS - 1)).astype(np.uint64)
             base = ((ys + ah).astype(np.intp) * stride) + (xs >> CWORD_SHIFT) + aw
-            v, e, vals, idx = vbuf[:m], ebuf[:m], wbuf[:m], ibuf[:m]
-            for dy in range(pats.shape[0]):
-                for wc in range(nw):
-                    pat = pats[dy, wc]
-                    if pat == 0:
-                        continue  # transparent stretch of the tile row
-                    np.left_shift(pat, off, out=v)
-                    np.bitwise_and(v, CLOW, out=e)
-                    vals[:] = e
-                    np.add(base, dy * stride + wc, out=idx)
-                    np.bitwise_or.at(flat, idx, vals)
-                    np.right_shift(v, np.uint64(CWORD_BITS), out=e)
-                    vals[:] = e
-                    np.add(idx, 1, out=idx)
-                    np.bitwise_or.at(flat, idx, vals)
+            stamp_pattern(flat, base, off, pats, stride)
 
     def clear(self) -> None:
         """Zero the persistent packed mask (apron included)."""
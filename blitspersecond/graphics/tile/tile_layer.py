@@ -1,17 +1,17 @@
 from math import ceil, floor
-from typing import Optional, Tuple, Union
+from typing import Hashable, Optional, Tuple, Union
 
 import numpy as np
-from pyglet.gl import GL_TEXTURE0, GL_TEXTURE1, glActiveTexture, glBindTexture
 from pyglet.image import Texture
 
 from blitspersecond.common import Size
 from blitspersecond.display.layer import Layer
 from blitspersecond.graphics.common import Collidable, CollisionQuery, PixelBuffer
-from blitspersecond.graphics.internal import PaletteTexture, Shader
+from blitspersecond.graphics.internal import DrawList, PaletteBank, Shader
 from blitspersecond.colors import TRANSPARENT, system_palette
 from blitspersecond.resources import (
     TILE_MAP_DTYPE,
+    ChunkedPlane,
     ImageSpec,
     Palette,
     ResourceManager,
@@ -19,18 +19,21 @@ from blitspersecond.resources import (
 
 from .tile_atlas import TileAtlas, TileIndex
 from .tile import Tile
-from .batch import TileBatch, TileFlags
+from .batch import TileBatch, TileFlags, _atlas_quads
 from .collision import CollisionMask
 
 # The bounded local tilemap: one structured row per live stamp. A coarse
 # camera step translates these origins in one NumPy stroke, culls rows outside
 # the one-tile-bordered plane, and compacts survivors through permanent scratch.
+# `streamed` marks rows the map streamer placed, so a new follow() can take
+# its predecessor's cells back without touching blit() stamps.
 _TILE_DTYPE = np.dtype(
     [
         ("target", np.int32, 2),
         ("source", np.uint16, 2),
         ("size", np.uint16, 2),
         ("flags", np.uint8),
+        ("streamed", np.bool_),
     ]
 )
 
@@ -76,7 +79,8 @@ class TileLayer(Layer):
     plus a one-tile border. Fine camera movement is one GPU translate; crossing
     an atlas-cell boundary broadcasts the coarse translation into local
     origins, destructively culls outgoing stamps, compacts the VBO, and leaves
-    the exposed border empty for a map streamer to refill.
+    the exposed border empty for a map streamer to refill -- follow() is that
+    streamer for a TileMap plane of any size.
 
     One atlas per TileEngine, exactly: every placement samples the atlas's
     single texture, which is what buys the draw ZERO mid-batch texture binds
@@ -149,8 +153,14 @@ class TileLayer(Layer):
         self._fine_scroll: Tuple[float, float] = (0.0, 0.0)
         # Upload only when stamps change or a coarse boundary compacts them.
         self._dirty_sync: bool = True
+        # The followed map plane (see follow()): (plane, world x, world y),
+        # plus the (col0, col1, row0, row1) cell window currently stamped.
+        self._follow: Optional[
+            Tuple[Union[np.ndarray, ChunkedPlane], int, int]
+        ] = None
+        self._window: Tuple[int, int, int, int] = (0, 0, 0, 0)
         # IS-A Layer: this object is its own content; the compositor's
-        # _composite() lands on the override below. Enabled from birth.
+        # _record() lands on the override below. Enabled from birth.
         super().__init__()
         self.bind(atlas)
         self.collidable = collidable
@@ -268,13 +278,16 @@ class TileLayer(Layer):
         self._coarse = (0, 0)
         self._fine_scroll = (0.0, 0.0)
         self._dirty_sync = True
+        self._changed()
+        self._follow = None
+        self._window = (0, 0, 0, 0)
 
     def _ensure_built(self) -> None:
         """Fetch this engine's shared program on first use (compiles on the
         very first fetch engine-wide -- needs a current GL context)."""
         if self._shader is None:
             frag = "indexed" if self.buffer.indexed else "direct"
-            self._shader = Shader.get("default", frag)
+            self._shader = Shader.get("blit", frag)
 
     @property
     def tile_size(self) -> Size:
@@ -337,6 +350,20 @@ class TileLayer(Layer):
             return tile.size.y, tile.size.x
         return tile.size.x, tile.size.y
 
+    def _outside(
+        self, flags: np.ndarray, xs: np.ndarray, ys: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Oriented (width, height) of stamps at local origins `xs`, `ys`,
+        and which of them would miss the bordered plane -- the test
+        _translate_and_cull applies to live rows."""
+        tw, th = self.tile_size
+        transposed = (flags & int(TileFlags.TRANSPOSE)) != 0
+        dw = np.where(transposed, th, tw)
+        dh = np.where(transposed, tw, th)
+        left, top, right, bottom = self._drawable_bounds()
+        outside = (xs + dw <= left) | (ys + dh <= top) | (xs >= right) | (ys >= bottom)
+        return dw, dh, outside
+
     def _drawable_bounds(self) -> Tuple[int, int, int, int]:
         """The tile-aligned viewport plus one atlas-cell border."""
         from blitspersecond.system.config import Config
@@ -354,7 +381,7 @@ class TileLayer(Layer):
 
     def blit(
         self,
-        tile: Union[Tile, TileIndex, np.ndarray],
+        tile: Union[Tile, TileIndex, np.ndarray, ChunkedPlane],
         x: int,
         y: int,
         flags: TileFlags = TileFlags.NONE,
@@ -365,14 +392,18 @@ class TileLayer(Layer):
         local tile indices and per-cell orientation but no rendering state;
         this already-bound destination layer owns the work of stamping it.
         Passing `flags` with a plane is an error because every cell already
-        carries its own flags.
+        carries its own flags. A ChunkedPlane is read whole here; one bigger
+        than the bordered plane wants follow(), which reads only the chunks
+        under the camera.
 
         A single tile appends one row to the DOD SoA and writes its texture
         rect into the TileBatch. No per-placement Python object exists.
         """
-        if isinstance(tile, np.ndarray):
+        if isinstance(tile, (np.ndarray, ChunkedPlane)):
             if flags != TileFlags.NONE:
                 raise TypeError("a map plane carries its own per-cell TileFlags")
+            if isinstance(tile, ChunkedPlane):
+                tile = tile[:, :]
             self._blit_plane(tile, int(x), int(y))
             return
         self._blit_tile(tile, int(x), int(y), flags)
@@ -384,14 +415,83 @@ class TileLayer(Layer):
                 f"shape {plane.shape} dtype {plane.dtype}"
             )
         tw, th = self.tile_size  # also rejects an unbound layer, loudly
-        for row, col in np.argwhere(plane["tile"] >= 0):
-            cell = plane[row, col]
-            self._blit_tile(
-                int(cell["tile"]),
-                x + int(col) * tw,
-                y + int(row) * th,
-                TileFlags(int(cell["flags"])),
+        rows, cols = np.nonzero(plane["tile"] >= 0)
+        self._blit_cells(
+            plane["tile"][rows, cols],
+            plane["flags"][rows, cols],
+            x + cols * tw,
+            y + rows * th,
+        )
+
+    def _blit_cells(
+        self,
+        tiles: np.ndarray,
+        flags: np.ndarray,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        streamed: bool = False,
+    ) -> None:
+        """The bulk placement path: many atlas-index stamps in NumPy strokes.
+
+        Row-for-row what _blit_tile would append for each cell in turn, but
+        the source rects and UVs come from the atlas's precomputed quad table
+        (one gather), the structured rows and the TileBatch UV mirror are
+        written as slices, and collision lands in one batched scatter. The
+        whole batch is validated before anything is written, so a bad cell
+        leaves the layer untouched. `streamed` is the map streamer's call:
+        cells outside the bordered plane are dropped instead of raising --
+        its window is cut on the cell grid, and an oriented rectangular tile
+        may not fit it -- and the rows are tagged as its own."""
+        if len(tiles) == 0:
+            return
+        self._ensure_built()  # shader must exist (needs a GL context)
+        assert self._shader is not None  # built above
+        if self._tilebatch is None:
+            self._tilebatch = TileBatch(self._shader.program, len(self._tiles))
+        count = len(self.atlas)
+        tiles = np.asarray(tiles, dtype=np.intp)
+        bad = (tiles < 0) | (tiles >= count)
+        if bad.any():
+            raise IndexError(
+                f"tile index {int(tiles[bad][0])} out of range (0..{count - 1})"
+            )
+        flags = np.asarray(flags, dtype=np.uint8) & 7
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        dw, dh, outside = self._outside(flags, xs, ys)
+        if streamed and outside.any():
+            keep = ~outside
+            tiles, flags, xs, ys = tiles[keep], flags[keep], xs[keep], ys[keep]
+            dw, dh = dw[keep], dh[keep]
+        elif outside.any():
+            i = int(np.flatnonzero(outside)[0])
+            left, top, right, bottom = self._drawable_bounds()
+            raise ValueError(
+                f"tile stamp at {(int(xs[i]), int(ys[i]))} with size "
+                f"{(int(dw[i]), int(dh[i]))} lies outside the bounded drawable "
+                f"area {(left, top, right, bottom)}"
             )
+        m = len(tiles)
+        if m == 0:
+            return
+        sources, uvs = _atlas_quads(self.atlas)
+        start = self._ntiles
+        self._ensure_tile_capacity(start + m)
+        rows = self._tiles[start : start + m]
+        rows["target"][:, 0] = xs
+        rows["target"][:, 1] = ys
+        rows["source"] = sources[tiles]
+        rows["size"][:, 0] = dw
+        rows["size"][:, 1] = dh
+        rows["flags"] = flags
+        rows["streamed"] = streamed
+        self._ntiles = start + m
+        self._dirty_sync = True
+        self._changed()
+        self._tilebatch.set_quads(start, uvs[tiles], flags)
+        if self._collidable:
+            assert self._collision is not None
+            self._collision.stamp_many(rows, self._fine_scroll)
 
     def _blit_tile(
         self,
@@ -421,8 +521,10 @@ class TileLayer(Layer):
         row["source"] = (t.source.x, t.source.y)
         row["size"] = display_size
         row["flags"] = int(flags)
+        row["streamed"] = False
         self._ntiles = idx + 1
         self._dirty_sync = True
+        self._changed()
         region = self.buffer.texture.get_region(
             t.source.x, t.source.y, t.size.x, t.size.y
         )
@@ -471,23 +573,28 @@ class TileLayer(Layer):
         indices = np.flatnonzero(keep)
         kept = len(indices)
         if kept != n:
-            if kept:
-                np.take(
-                    self._tiles,
-                    indices,
-                    axis=0,
-                    out=self._tiles_scratch[:kept],
-                )
-            self._tiles, self._tiles_scratch = (
-                self._tiles_scratch,
-                self._tiles,
-            )
-            assert self._tilebatch is not None
-            self._tilebatch.compact(indices)
-            self._ntiles = kept
+            self._compact(indices)
         self._dirty_sync = True
         return n - kept
 
+    def _compact(self, indices: np.ndarray) -> None:
+        """Keep placement rows `indices` densely from row zero, in order."""
+        kept = len(indices)
+        if kept:
+            np.take(
+                self._tiles,
+                indices,
+                axis=0,
+                out=self._tiles_scratch[:kept],
+            )
+        self._tiles, self._tiles_scratch = (
+            self._tiles_scratch,
+            self._tiles,
+        )
+        assert self._tilebatch is not None
+        self._tilebatch.compact(indices)
+        self._ntiles = kept
+
     # -- bounded camera ----------------------------------------------------
 
     @property
@@ -507,6 +614,7 @@ class TileLayer(Layer):
             ncx, ncy = floor(sx / tw), floor(sy / th)
             ocx, ocy = self._coarse
             dx, dy = (ncx - ocx) * tw, (ncy - ocy) * th
+            self._changed()
             self._scroll = (sx, sy)
             self._coarse = (ncx, ncy)
             self._fine_scroll = (sx - ncx * tw, sy - ncy * th)
@@ -515,6 +623,149 @@ class TileLayer(Layer):
                 self._collision.translate(int(ox), int(oy), int(sx), int(sy))
             if dx or dy:
                 self._translate_and_cull(dx, dy)
+                if self._follow is not None:
+                    self._stream((ocx, ocy))
+
+    # -- map streaming -------------------------------------------------------
+
+    def follow(
+        self,
+        plane: Optional[Union[np.ndarray, ChunkedPlane]],
+        x: int = 0,
+        y: int = 0,
+    ) -> None:
+        """Stream a map plane of any size through the bounded local tilemap.
+
+            ground.follow(tile_map.layers["ground"])
+            ground.scroll = (camera_x, camera_y)   # refills itself
+
+        `plane` is a TileMap tile/flags array whose cell (0, 0) sits at world
+        pixel `(x, y)` -- world meaning the same space `scroll` is measured
+        in. A ChunkedPlane from a `.bpsmap` works the same way, and then only
+        the chunks under the camera are ever read.
+
+        Following stamps the cells the current camera can see (plus the
+        one-tile border) at once; from then on every coarse camera step stamps
+        only the row/column strips it exposed, through the bulk plane path, so
+        scrolling costs the strip and never the screen. Cells leaving the
+        bordered plane are culled by the coarse step as always.
+
+        blit() stamps stay put and keep working beside the stream. Following
+        the plane already followed, at the same origin, changes nothing;
+        any other follow() first takes back every cell the previous stream
+        stamped, then starts afresh from the current camera. follow(None)
+        stops streaming and leaves its cells to be culled as the camera
+        moves. unbind() forgets the plane with everything else."""
+        if plane is None:
+            self._follow = None
+            self._window = (0, 0, 0, 0)
+            return
+        if plane.ndim != 2 or plane.dtype != TILE_MAP_DTYPE:
+            raise TypeError(
+                "expected a two-dimensional TileMap tile/flags array, got "
+                f"shape {plane.shape} dtype {plane.dtype}"
+            )
+        _ = self.tile_size  # rejects an unbound layer, loudly
+        follow = (plane, int(x), int(y))
+        if self._follow is not None and (
+            self._follow[0] is plane and self._follow[1:] == follow[1:]
+        ):
+            return
+        self._drop_streamed()
+        self._follow = follow
+        self._window = (0, 0, 0, 0)
+        self._stream()
+
+    def _drop_streamed(self) -> None:
+        """Take back every stamp the map streamer placed."""
+        streamed = self._tiles["streamed"][: self._ntiles]
+        if not streamed.any():
+            return
+        self._compact(np.flatnonzero(~streamed))
+        self._dirty_sync = True
+        self._changed()
+        if self._collidable:
+            self.restamp()
+
+    def _stream_window(
+        self, coarse: Tuple[int, int], reach: int
+    ) -> Tuple[int, int, int, int]:
+        """The followed plane's cells whose stamp, `reach` pixels long on
+        each axis from its cell origin, overlaps the bordered local plane
+        at coarse camera `coarse`, as (col0, col1, row0, row1), clipped to
+        the plane."""
+        assert self._follow is not None
+        plane, ox, oy = self._follow
+        rows, cols = plane.shape
+        tw, th = self.tile_size
+        ccx, ccy = coarse
+        left, top, right, bottom = self._drawable_bounds()
+        # Cell c's local origin is ox + c*tw - ccx*tw; it is wanted while its
+        # extent overlaps [left, right). Same test, per axis, for rows.
+        bx, by = ccx * tw - ox, ccy * th - oy
+        c0, c1 = (left - reach + bx) // tw + 1, -(-(right + bx) // tw)
+        r0, r1 = (top - reach + by) // th + 1, -(-(bottom + by) // th)
+        return max(c0, 0), min(c1, cols), max(r0, 0), min(r1, rows)
+
+    def _stream(self, previous: Optional[Tuple[int, int]] = None) -> None:
+        """Stamp the followed cells the window gained since the coarse step
+        from camera cell `previous`.
+
+        The window is reached with the longer side of an oriented tile, so
+        it holds every cell whose stamp can meet the plane; the ones that
+        do not are dropped at stamping, by the same test the cull applies.
+        New minus old is at most four rectangles -- whole columns on either
+        side, then the rows above/below within the shared columns -- so no
+        cell is stamped twice and a one-cell step stamps one strip. With
+        rectangular tiles the old window's leading columns and rows may
+        also hold a cell whose short, transposed stamp missed the plane
+        last step and meets it now; those bands are rechecked too."""
+        tw, th = self.tile_size
+        a0, a1, b0, b1 = new = self._stream_window(self._coarse, max(tw, th))
+        p0, p1, q0, q1 = self._window
+        self._window = new
+        if min(a1, p1) <= max(a0, p0) or min(b1, q1) <= max(b0, q0):
+            self._stream_cells(a0, a1, b0, b1)  # nothing kept: whole window
+            return
+        self._stream_cells(a0, min(a1, p0), b0, b1)
+        self._stream_cells(max(a0, p1), a1, b0, b1)
+        m0, m1 = max(a0, p0), min(a1, p1)
+        self._stream_cells(m0, m1, b0, min(b1, q0))
+        self._stream_cells(m0, m1, max(b0, q1), b1)
+        if tw != th and previous is not None:
+            # Past the short-reach window every orientation met the plane.
+            s0, _, t0, _ = self._stream_window(previous, min(tw, th))
+            n0, n1 = max(b0, q0), min(b1, q1)
+            self._stream_cells(m0, min(m1, s0), n0, n1, previous)
+            self._stream_cells(max(m0, s0), m1, n0, min(n1, t0), previous)
+
+    def _stream_cells(
+        self,
+        c0: int,
+        c1: int,
+        r0: int,
+        r1: int,
+        stamped: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """Stamp one rectangle of the followed plane at its local origins,
+        less any cell whose stamp already met the bordered plane at coarse
+        camera `stamped` (and so is still live)."""
+        if c0 >= c1 or r0 >= r1:
+            return
+        assert self._follow is not None
+        plane, ox, oy = self._follow
+        tw, th = self.tile_size
+        ccx, ccy = self._coarse
+        strip = np.asarray(plane[r0:r1, c0:c1])
+        rows, cols = np.nonzero(strip["tile"] >= 0)
+        tiles, flags = strip["tile"][rows, cols], strip["flags"][rows, cols]
+        xs, ys = ox + (cols + c0) * tw, oy + (rows + r0) * th
+        if stamped is not None:
+            _, _, missed = self._outside(
+                flags, xs - stamped[0] * tw, ys - stamped[1] * th
+            )
+            tiles, flags, xs, ys = tiles[missed], flags[missed], xs[missed], ys[missed]
+        self._blit_cells(tiles, flags, xs - ccx * tw, ys - ccy * th, streamed=True)
 
     # -- collision (delegated to the composed mask) ------------------------
 
@@ -611,9 +862,10 @@ class TileLayer(Layer):
         v[:, 3, 1] = y2
         self._tilebatch.upload_positions(v)
 
-    def _composite(self) -> None:
-        """Background fill first, then palette bind (indexed only), then
-        the tiles at the fine camera offset."""
+    def _record(self, draws: DrawList) -> None:
+        """Background fill first, then the tiles at the fine camera offset,
+        with the palette (indexed only) riding along for the DrawList to
+        bind."""
         if self._atlas is None:
             return
         self.prepare()
@@ -629,28 +881,46 @@ class TileLayer(Layer):
             assert self._bg_batch is not None
             r, g, b, a = background
             tr, tg, tb, ta = self._tint
-            self._bg_batch.draw(
-                _white().texture, 1, colors=(r * tr, g * tg, b * tb, a * ta)
+            self._bg_batch.record(
+                draws,
+                _white().texture,
+                1,
+                colors=(r * tr, g * tg, b * tb, a * ta),
             )
-        if self.buffer.indexed:
-            # The palette rides texture unit 1 (palette RAM as a 256x1
-            # texture, see PaletteTexture) -- bound per draw, uploaded only on
-            # mutation, so palette swaps stay free. Unit 0 is re-activated
-            # for the TileBatch, which binds the atlas there.
-            self._shader.program["palette_texture"] = 1
-            ptex = PaletteTexture.get(self.palette)
-            glActiveTexture(GL_TEXTURE1)
-            glBindTexture(ptex.target, ptex.id)
-            glActiveTexture(GL_TEXTURE0)
         if self._tilebatch is not None and self._ntiles:
+            # The palette is a row of the palette bank on texture unit 1
+            # (see PaletteBank), picked by one constant attribute -- the bank
+            # is bound once a frame and a row uploads only on mutation, so
+            # palette swaps stay free.
+            palette, row = None, 0
+            if self.buffer.indexed:
+                row = PaletteBank.row(self.palette)
+                palette = PaletteBank.texture()
             sx, sy = self._fine_scroll
-            self._tilebatch.draw(
+            self._tilebatch.record(
+                draws,
                 self.buffer.texture,
                 self._ntiles,
                 translate=(-float(int(sx)), -float(int(sy))),
                 colors=(self._tint[0], self._tint[1], self._tint[2], self._tint[3]),
+                palette=palette,
+                palette_row=row,
             )
 
+    @property
+    def version(self) -> Hashable:
+        """Stamps, scroll, tint and background bump the layer's own count;
+        pixel edits and palette swaps are the buffer's, in-place palette
+        edits the palette's."""
+        if self._buffer is None:
+            return self._version
+        palette = self._buffer.palette
+        return (
+            self._version,
+            self._buffer.version,
+            None if palette is None else palette.version,
+        )
+
     # -- layer-surface metadata, delegated to the buffer ---------------------
 
     @property
@@ -718,6 +988,7 @@ class TileLayer(Layer):
             a = channels[3] if len(channels) == 4 else 255
             self._background = tuple(channels)
             self._bg_rgba = (r / 255.0, g / 255.0, b / 255.0, a / 255.0)
+            self._changed()
             return
         index = int(value)
         if not 0 <= index <= 255:
@@ -726,6 +997,7 @@ class TileLayer(Layer):
                 f"tuple, got {value!r}"
             )
         self._background = index
+        self._changed()
 
     def _resolved_background(self) -> Tuple[float, float, float, float]:
         if not isinstance(self._background, int):
@@ -746,7 +1018,7 @@ class TileLayer(Layer):
         composite that actually has a colour."""
         from blitspersecond.system.config import Config
 
-        shader = Shader.get("default", "direct")
+        shader = Shader.get("blit", "direct")
         batch = TileBatch(shader.program, 1)
         disp = Config().display
         w, h = float(disp.width), float(disp.height)
@@ -773,6 +1045,7 @@ class TileLayer(Layer):
     @red.setter
     def red(self, value: float) -> None:
         self._tint[0] = min(max(float(value), 0.0), 1.0)
+        self._changed()
 
     @property
     def green(self) -> float:
@@ -781,6 +1054,7 @@ class TileLayer(Layer):
     @green.setter
     def green(self, value: float) -> None:
         self._tint[1] = min(max(float(value), 0.0), 1.0)
+        self._changed()
 
     @property
     def blue(self) -> float:
@@ -789,6 +1063,7 @@ class TileLayer(Layer):
     @blue.setter
     def blue(self, value: float) -> None:
         self._tint[2] = min(max(float(value), 0.0), 1.0)
+        self._changed()
 
     @property
     def alpha(self) -> float:
@@ -797,3 +1072,4 @@ class TileLayer(Layer):
     @alpha.setter
     def alpha(self, value: float) -> None:
         self._tint[3] = min(max(float(value), 0.0), 1.0)
+        self._changed()
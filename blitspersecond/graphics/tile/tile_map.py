@@ -3,17 +3,19 @@
 TileMap is deliberately not a Layer and creates no Layers. Its map planes are
 plain structured NumPy arrays containing local tile indices and orientation.
 A game can use those arrays for pathfinding, editing, collision preparation or
-rendering without depending on TileEngine storage or TMX global IDs.
+rendering without depending on TileEngine storage or TMX global IDs. A map
+loaded from a chunked `.bpsmap` keeps its planes as read-only ChunkedPlane
+windows instead, for TileLayer.follow() to stream.
 """
 
 from __future__ import annotations
 
-from typing import Dict, Iterator, Tuple
+from typing import Dict, Iterator, Tuple, Union
 
 import numpy as np
 
 from blitspersecond.graphics.common import PixelBuffer
-from blitspersecond.resources import ResourceManager, TileMapSpec
+from blitspersecond.resources import ChunkedPlane, ResourceManager, TileMapSpec
 
 from .tile_atlas import TileAtlas
 
@@ -37,13 +39,17 @@ class TileMap:
         # dict preserves the authored back-to-front order validated by the
         # spec loader. Like PixelBuffer copying a cached ImageSpec, each map
         # owns mutable planes while the ResourceManager's spec stays pristine.
-        self._layers: Dict[str, np.ndarray] = {
-            name: np.array(gids) for name, gids in spec.layers
+        # Chunked planes are shared as they are: copying one would decode the
+        # whole world the format exists to avoid.
+        self._layers: Dict[str, Union[np.ndarray, ChunkedPlane]] = {
+            name: gids if isinstance(gids, ChunkedPlane) else np.array(gids)
+            for name, gids in spec.layers
         }
 
     @classmethod
     def load(cls, filename: str) -> "TileMap":
-        """Load a compatible TMX file through the shared resource cache."""
+        """Load a compatible TMX (or chunked .bpsmap) file through the shared
+        resource cache."""
         return cls(ResourceManager().tile_map(filename))
 
     @property
@@ -76,14 +82,14 @@ class TileMap:
         return self._tilesets
 
     @property
-    def layers(self) -> Dict[str, np.ndarray]:
+    def layers(self) -> Dict[str, Union[np.ndarray, ChunkedPlane]]:
         """Named tile/flags arrays in authored back-to-front order."""
         return self._layers
 
-    def __getitem__(self, name: str) -> np.ndarray:
+    def __getitem__(self, name: str) -> Union[np.ndarray, ChunkedPlane]:
         return self._layers[name]
 
-    def __iter__(self) -> Iterator[np.ndarray]:
+    def __iter__(self) -> Iterator[Union[np.ndarray, ChunkedPlane]]:
         return iter(self._layers.values())
 
     def __len__(self) -> int:
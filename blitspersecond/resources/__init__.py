@@ -7,9 +7,16 @@
 `.tile_map(path)` -> `TileMapSpec`,
 each loaded and validated exactly once and shared read-only from then on
 (PixelBuffer copies image data out; the audio `PCM` operator reads sound data in
-place). This is the bottom of the dependency stack -- display -> graphics ->
-resources -- so everything above consumes these types and nothing here knows
-they exist.
+place). `.preload([paths])` decodes a batch on worker threads ahead of need and
+hands back a `Preload` progress handle for a loading screen. Set
+`.cache_dir` (BPS_ASSET_CACHE, or `Config().resources.cache_dir` as the engine
+starts) and decoded images, sounds and maps also persist between launches as
+memory-mapped `.npy` files (see disk_cache.py). `.budget` (likewise from
+`Config().resources.budget`) caps the in-memory cache in bytes with LRU
+eviction; `.pin(path)` exempts what is in use and `.stats` reports hits,
+misses, bytes and evictions. This is the
+bottom of the dependency stack -- display -> graphics -> resources -- so
+everything above consumes these types and nothing here knows they exist.
 
 The specs are pure value objects, no GL, no device state: `ImageSpec` (size,
 mode P/RGB/RGBA, pixels; indexed transparency must sit at palette index 0),
@@ -18,6 +25,9 @@ sprite package -- tilesets, assemblies, animations -- loaded from the
 interchange JSON with every format invariant checked; see sprite_sheet.py).
 `TileMapSpec` is the corresponding GL-free BPS-compatible TMX reading: sheet
 descriptions plus structured NumPy planes of local tile indices and orientation.
+For worlds too big to decode, `convert_tile_map(tmx, "world.bpsmap")` writes a
+chunked, memory-mapped copy whose planes load as `ChunkedPlane` windows (see
+tile_chunks.py); `.tile_map()` recognises the suffix.
 `Palette` now lives in `blitspersecond.colors` (colour vocabulary, not loading)
 and is re-exported here for the specs that carry it. `load_image_spec(path)`
 / `load_sprite_sheet_spec(path)` are the direct loaders when you want a spec
@@ -28,11 +38,12 @@ behind `ResourceManager.fetch()`, which exists so the graphics Shader can pull
 .vert/.frag source; user code never meets it.
 """
 
-from .resource_manager import ResourceManager
+from .resource_manager import CacheStats, ResourceManager
 # Palette moved down into blitspersecond.colors (colour vocabulary, not loading);
 # re-exported here so `from blitspersecond.resources import Palette` still works.
 from blitspersecond.colors import ConsolePalette, Palette
 from .image import ImageSpec, load_image_spec
+from .preload import Preload
 from .sound import SoundSpec
 from .sprite_sheet import SpriteSheetSpec, load_sprite_sheet_spec
 from .tile_map import (
@@ -41,13 +52,20 @@ from .tile_map import (
     TileSetSpec,
     load_tile_map_spec,
 )
+from .tile_chunks import (
+    ChunkedPlane,
+    convert_tile_map,
+    load_chunked_tile_map_spec,
+)
 
 __all__ = [
     "ResourceManager",
+    "CacheStats",
     "Palette",
     "ConsolePalette",
     "ImageSpec",
     "load_image_spec",
+    "Preload",
     "SoundSpec",
     "SpriteSheetSpec",
     "load_sprite_sheet_spec",
@@ -55,4 +73,7 @@ __all__ = [
     "TILE_MAP_DTYPE",
     "TileMapSpec",
     "load_tile_map_spec",
+    "ChunkedPlane",
+    "convert_tile_map",
+    "load_chunked_tile_map_spec",
 ]
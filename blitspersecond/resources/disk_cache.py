@@ -0,0 +1,202 @@
+"""Decoded specs persisted between launches, read back by memory map.
+
+Assets do not change between runs, but PIL, `wave` and ElementTree do not
+know that. With `ResourceManager().cache_dir` set (BPS_ASSET_CACHE in the
+environment, or `Config().resources.cache_dir` once the engine starts), the
+first decode of an image, sound or TMX map also writes its
+arrays as `.npy` files plus a small JSON description; every later launch
+rebuilds the spec straight from `np.load(mmap_mode="r")`, so a cold start
+costs about what mapping the files costs.
+
+An entry is keyed by the source's absolute path, mtime and size, so editing
+an asset simply misses and writes a fresh entry. A TMX entry also records its
+tileset images and misses if any of them changed; an edited external TSX is
+not tracked -- touch the map, or clear the directory. Entries are written to
+a temporary directory and renamed into place, so a crash or a second process
+never leaves a half-written entry behind, and a cache that cannot be written
+(read-only disk, full disk) only costs the speed-up.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict
+from hashlib import sha256
+from os.path import abspath, isdir, join
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from blitspersecond.colors import Palette
+
+from .image import ImageSpec
+from .sound import SoundSpec
+from .tile_map import TileMapSpec, TileSetSpec
+
+# Bump when an encoding below changes; old entries then simply miss.
+_FORMAT = 1
+
+_Arrays = Dict[str, np.ndarray]
+
+
+def _stamp(filename: str) -> Tuple[int, int]:
+    stat = os.stat(filename)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _pack_image(spec: ImageSpec) -> Tuple[Dict[str, Any], _Arrays]:
+    meta = {
+        "size": list(spec.size),
+        "mode": spec.mode,
+        "transparency_index": spec.transparency_index,
+    }
+    arrays = {"data": spec.data}
+    if spec.palette is not None:
+        arrays["palette"] = np.array(
+            [spec.palette[i] for i in range(256)], dtype=np.uint8
+        )
+    return meta, arrays
+
+
+def _unpack_image(meta: Dict[str, Any], arrays: _Arrays) -> ImageSpec:
+    palette = None
+    if "palette" in arrays:
+        rgba = arrays["palette"]
+        # Palette(raw) gives every supplied entry alpha 255 and leaves the
+        # rest blank, so the supplied length is up to the last opaque row.
+        opaque = np.flatnonzero(rgba[1:, 3])
+        count = int(opaque[-1]) + 2 if opaque.size else 1
+        palette = Palette(rgba[:count, :3].ravel().tolist())
+    return ImageSpec(
+        size=tuple(meta["size"]),
+        mode=meta["mode"],
+        data=arrays["data"],
+        palette=palette,
+        transparency_index=meta["transparency_index"],
+    )
+
+
+def _pack_sound(spec: SoundSpec) -> Tuple[Dict[str, Any], _Arrays]:
+    return {"filename": spec.filename, "sr": spec.sr}, {"data": spec.data}
+
+
+def _unpack_sound(meta: Dict[str, Any], arrays: _Arrays) -> SoundSpec:
+    return SoundSpec(meta["filename"], arrays["data"], meta["sr"])
+
+
+def _pack_tile_map(spec: TileMapSpec) -> Tuple[Dict[str, Any], _Arrays]:
+    meta = {
+        "width": spec.width,
+        "height": spec.height,
+        "tilewidth": spec.tilewidth,
+        "tileheight": spec.tileheight,
+        "tilesets": [asdict(ts) for ts in spec.tilesets],
+        "layers": [name for name, _ in spec.layers],
+    }
+    arrays: _Arrays = {}
+    for i, (_, plane) in enumerate(spec.layers):
+        # Only TMX specs come through here: a chunked map is its own cache.
+        assert isinstance(plane, np.ndarray)
+        arrays[f"layer{i}"] = plane
+    return meta, arrays
+
+
+def _unpack_tile_map(meta: Dict[str, Any], arrays: _Arrays) -> TileMapSpec:
+    return TileMapSpec(
+        width=meta["width"],
+        height=meta["height"],
+        tilewidth=meta["tilewidth"],
+        tileheight=meta["tileheight"],
+        tilesets=tuple(TileSetSpec(**ts) for ts in meta["tilesets"]),
+        layers=tuple(
+            (name, arrays[f"layer{i}"]) for i, name in enumerate(meta["layers"])
+        ),
+    )
+
+
+def _tile_map_deps(spec: TileMapSpec) -> List[str]:
+    return [ts.image for ts in spec.tilesets]
+
+
+_CODECS: Dict[str, Tuple[Callable, Callable, Callable]] = {
+    "image": (_pack_image, _unpack_image, lambda spec: []),
+    "sound": (_pack_sound, _unpack_sound, lambda spec: []),
+    "tile_map": (_pack_tile_map, _unpack_tile_map, _tile_map_deps),
+}
+
+
+def _entry(directory: str, kind: str, filename: str) -> str:
+    mtime, size = _stamp(filename)
+    key = f"{_FORMAT}\0{kind}\0{filename}\0{mtime}\0{size}"
+    return join(directory, f"{kind}-{sha256(key.encode('utf-8')).hexdigest()[:32]}")
+
+
+def _read(entry: str, unpack: Callable) -> Optional[Any]:
+    try:
+        with open(join(entry, "meta.json"), encoding="utf-8") as f:
+            record = json.load(f)
+        for dep, mtime, size in record["deps"]:
+            if _stamp(dep) != (mtime, size):
+                return None
+        arrays = {
+            name: np.load(join(entry, f"{name}.npy"), mmap_mode="r")
+            for name in record["arrays"]
+        }
+        return unpack(record["meta"], arrays)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write(directory: str, entry: str, spec: Any, pack: Callable, deps) -> None:
+    meta, arrays = pack(spec)
+    record = {
+        "meta": meta,
+        "arrays": sorted(arrays),
+        "deps": [[dep, *_stamp(dep)] for dep in deps(spec)],
+    }
+    os.makedirs(directory, exist_ok=True)
+    scratch = tempfile.mkdtemp(prefix=".partial-", dir=directory)
+    try:
+        for name, array in arrays.items():
+            np.save(join(scratch, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(join(scratch, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(scratch, entry)
+    finally:
+        # Only left behind if the rename lost a race (or never happened).
+        if isdir(scratch):
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def disk_cached(
+    kind: str, load: Callable[[str], Any], directory: Optional[str]
+) -> Callable[[str], Any]:
+    """Wrap a spec loader so it reads through the persistent cache in
+    `directory`.
+
+    With no cache directory this is `load` itself, untouched."""
+    if not directory:
+        return load
+    pack, unpack, deps = _CODECS[kind]
+
+    def cached(filename: str) -> Any:
+        source = abspath(filename)
+        try:
+            entry = _entry(directory, kind, source)
+        except OSError:
+            return load(filename)  # let the loader name the missing file
+        spec = _read(entry, unpack) if isdir(entry) else None
+        if spec is None:
+            # A stale entry (a tileset image changed) is replaced, not kept.
+            shutil.rmtree(entry, ignore_errors=True)
+            spec = load(filename)
+            try:
+                _write(directory, entry, spec, pack, deps)
+            except OSError:
+                pass
+        return spec
+
+    return cached
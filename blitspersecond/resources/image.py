@@ -26,6 +26,7 @@ class ImageSpec:
         data: Optional[np.ndarray] = None,
         palette: Optional[Palette] = None,
         transparency_index: Optional[int] = None,
+        streaming: bool = False,
     ) -> None:
         if mode not in _VALID_MODES:
             raise ValueError(f"Image mode '{mode}' not supported. Must be one of {_VALID_MODES}.")
@@ -36,6 +37,7 @@ class ImageSpec:
         self._mode = mode
         self._palette = palette
         self._transparency_index = transparency_index
+        self._streaming = bool(streaming)
 
         shape = (height, width) if self.channels == 1 else (height, width, self.channels)
         if data is None:
@@ -84,6 +86,13 @@ class ImageSpec:
     def indexed(self) -> bool:
         return self._mode == "P"
 
+    @property
+    def streaming(self) -> bool:
+        """A hint for the PixelBuffer built from this spec: the picture will
+        be redrawn nearly every tick, so upload it through the streaming
+        (pixel-unpack buffer) path. See PixelBuffer.streaming."""
+        return self._streaming
+
 
 def load_image_spec(filename: str) -> ImageSpec:
     """Load an image file into an ImageSpec (the loader step; PIL lives here).
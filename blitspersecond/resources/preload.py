@@ -0,0 +1,69 @@
+"""The handle ResourceManager.preload() gives back while specs decode.
+
+A loading scene polls it once a tick -- `progress` for the bar, `done` for
+the cut -- and the game then asks ResourceManager for each spec as usual,
+now a cache hit. Nothing here blocks unless you call result().
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import CancelledError, Future, wait
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+class Preload:
+    """Progress of one preload() batch, in request order."""
+
+    def __init__(self, filenames: Sequence[str], futures: Sequence[Future]) -> None:
+        self._filenames: Tuple[str, ...] = tuple(filenames)
+        self._futures: Tuple[Future, ...] = tuple(futures)
+
+    @property
+    def filenames(self) -> Tuple[str, ...]:
+        return self._filenames
+
+    @property
+    def total(self) -> int:
+        return len(self._futures)
+
+    @property
+    def loaded(self) -> int:
+        """Requests finished so far, successfully or not."""
+        return sum(future.done() for future in self._futures)
+
+    @property
+    def progress(self) -> float:
+        """`loaded / total` in 0..1; an empty batch is already complete."""
+        return self.loaded / self.total if self._futures else 1.0
+
+    @property
+    def done(self) -> bool:
+        return all(future.done() for future in self._futures)
+
+    @property
+    def errors(self) -> List[Tuple[str, BaseException]]:
+        """`(filename, exception)` for every finished request that failed;
+        a request cancelled before it ran reports a CancelledError."""
+        failed = []
+        for filename, future in zip(self._filenames, self._futures):
+            if not future.done():
+                continue
+            error = CancelledError() if future.cancelled() else future.exception()
+            if error is not None:
+                failed.append((filename, error))
+        return failed
+
+    def result(self, timeout: Optional[float] = None) -> List[Any]:
+        """Wait for the batch and return its specs in request order.
+
+        Re-raises the first failure, in request order. TimeoutError if the
+        batch is still running after `timeout` seconds."""
+        _, pending = wait(self._futures, timeout=timeout)
+        if pending:
+            raise TimeoutError(
+                f"preload still has {len(pending)} of {self.total} requests running"
+            )
+        return [future.result() for future in self._futures]
+
+    def __repr__(self) -> str:
+        return f"Preload({self.loaded}/{self.total})"
@@ -1,17 +1,105 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from hashlib import sha256
 from os.path import abspath
+from threading import Lock
+from typing import Iterable, Optional
 
+import numpy as np
 
 from blitspersecond.common import SingletonMeta
 
 from .internal import Resource
+from .preload import Preload
+
+# preload() picks the loader from the filename; anything not listed is an
+# image, which PIL either decodes or rejects on the worker.
+_PRELOAD_SUFFIXES = (
+    (".sprite.json", "sprite_sheet"),
+    (".tmx", "tile_map"),
+    (".bpsmap", "tile_map"),
+    (".wav", "sound"),
+)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """A snapshot of ResourceManager's cache, for tuning memory budgets."""
+
+    hits: int
+    misses: int
+    evictions: int
+    # Sum of the ndarray payloads of every cached spec -- memory-mapped ones
+    # included, since those become resident as soon as they are read.
+    bytes: int
+    entries: int
+    pinned: int
+    budget: Optional[int]
+
+
+def _spec_nbytes(spec) -> int:
+    """Bytes a cached spec holds in arrays. Sprite sheets and text resources
+    count as free: their images are cache entries of their own."""
+    data = getattr(spec, "data", None)
+    if isinstance(data, np.ndarray):
+        return data.nbytes
+    layers = getattr(spec, "layers", None)
+    if isinstance(layers, tuple):
+        return sum(
+            plane.nbytes for _, plane in layers if isinstance(plane, np.ndarray)
+        )
+    return 0
 
 
 class ResourceManager(metaclass=SingletonMeta):
     """creates a usable game object according to the spec the user passed in, delegates to resourceloader. Caches constructed object and returns Resource"""
 
     def __init__(self):
-        self._cache = {}
+        # Least recently used first. Each hit moves its entry to the end, and
+        # the budget evicts from the front.
+        self._cache = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._pinned = set()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        # In-flight decodes by cache id. Whoever registers the Future does the
+        # work; everyone else asking for the same file waits on it instead.
+        self._pending = {}
+        self._lock = Lock()
+        self._pool = None
+        # Where decoded specs persist between launches (see disk_cache.py).
+        # The engine hands over Config().resources.cache_dir at startup;
+        # until then, or without an engine, the environment decides.
+        self._cache_dir: Optional[str] = os.environ.get("BPS_ASSET_CACHE") or None
+        # Likewise Config().resources.budget; unbounded until then.
+        self._budget: Optional[int] = None
+
+    @property
+    def cache_dir(self) -> Optional[str]:
+        """Directory of the persistent decoded-asset cache; None decodes
+        every launch. Applies to the next miss; created on first write."""
+        return self._cache_dir
+
+    @cache_dir.setter
+    def cache_dir(self, value: Optional[str]) -> None:
+        self._cache_dir = value or None
+
+    @property
+    def budget(self) -> Optional[int]:
+        """Byte ceiling for the cached specs' ndarray payloads; least
+        recently used unpinned specs go first. None is unbounded. Lowering
+        it evicts at once."""
+        return self._budget
+
+    @budget.setter
+    def budget(self, value: Optional[int]) -> None:
+        with self._lock:
+            self._budget = None if value is None else int(value)
+            self._enforce_budget(keep=-1)
 
     def _filename_to_id(self, filename: str) -> int:
         abs_path = abspath(filename)
@@ -22,71 +110,188 @@ class ResourceManager(metaclass=SingletonMeta):
         """Memo-cached ImageSpec for a file. Disk hit + PIL load + validation
         happen once (on miss); the cached spec is shared read-only -- PixelBuffer
         copies its data out, so the spec stays pristine."""
-        f_id = self._filename_to_id(filename)
-        if f_id not in self._cache:
-            from .image import load_image_spec
+        from .disk_cache import disk_cached
+        from .image import load_image_spec
 
-            self._cache[f_id] = load_image_spec(filename)
-        return self._cache[f_id]
+        return self._resolve(
+            filename, disk_cached("image", load_image_spec, self._cache_dir)
+        )
 
     def sound(self, filename: str):
         """Memo-cached SoundSpec for a WAV file. Disk hit + decode happen once
         (on miss); the cached spec is shared read-only -- PCM reads it in
         place and never writes, so one decode serves every player of the
         sample."""
-        f_id = self._filename_to_id(filename)
-        if f_id not in self._cache:
-            from .sound import load_sound_spec
+        from .disk_cache import disk_cached
+        from .sound import load_sound_spec
 
-            self._cache[f_id] = load_sound_spec(filename)
-        return self._cache[f_id]
+        return self._resolve(
+            filename, disk_cached("sound", load_sound_spec, self._cache_dir)
+        )
 
     def sprite_sheet(self, filename: str):
         """Memo-cached SpriteSheetSpec for a `.sprite.json` package. Parse +
         validation happen once (on miss); the tileset images ride the same
         cache via .image(), so the loader's bounds check and the eventual
         PixelBuffer construction share one disk hit."""
-        f_id = self._filename_to_id(filename)
-        if f_id not in self._cache:
-            from .sprite_sheet import load_sprite_sheet_spec
+        from .sprite_sheet import load_sprite_sheet_spec
 
-            self._cache[f_id] = load_sprite_sheet_spec(filename)
-        return self._cache[f_id]
+        return self._resolve(filename, load_sprite_sheet_spec)
 
     def tile_map(self, filename: str):
         """Memo-cached TileMapSpec for a BPS-compatible TMX file.
 
         Parsing, TSX validation and referenced image decoding happen once.
         TileMap turns the cached paths into its own PixelBuffers/TileAtlases;
-        loading a map never creates display layers.
+        loading a map never creates display layers. A `.bpsmap` file made by
+        convert_tile_map() loads as the same spec with ChunkedPlane planes,
+        memory-mapped rather than decoded.
+        """
+        from .disk_cache import disk_cached
+        from .tile_chunks import CHUNKED_MAP_SUFFIX, load_chunked_tile_map_spec
+        from .tile_map import load_tile_map_spec
+
+        if filename.lower().endswith(CHUNKED_MAP_SUFFIX):
+            return self._resolve(filename, load_chunked_tile_map_spec)
+        return self._resolve(
+            filename, disk_cached("tile_map", load_tile_map_spec, self._cache_dir)
+        )
+
+    def preload(self, filenames: Iterable[str]) -> Preload:
+        """Decode specs on a worker pool, ahead of the frame that needs them.
+
+            loading = ResourceManager().preload(["hero.sprite.json", "town.tmx"])
+            ...                                   # each tick:
+            bar.fill(loading.progress)
+            if loading.done: start_scene()        # .sprite_sheet() etc. now hit
+
+        The loader comes from the suffix (`.sprite.json`, `.tmx`/`.bpsmap`,
+        `.wav`, anything else an image). Returns at once with a Preload
+        handle; failures surface on the handle rather than here. A file
+        already cached, or already being decoded -- by another preload or a
+        plain .image() call -- is never decoded twice: both wait on the one
+        decode. Specs are GL-free, so nothing on the workers touches the GL
+        context; PixelBuffer uploads stay lazy on the main thread.
         """
+        filenames = list(filenames)
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(thread_name_prefix="resource-preload")
+        futures = []
+        for filename in filenames:
+            name = filename.lower()
+            kind = next(
+                (k for suffix, k in _PRELOAD_SUFFIXES if name.endswith(suffix)),
+                "image",
+            )
+            futures.append(self._pool.submit(getattr(self, kind), filename))
+        return Preload(filenames, futures)
+
+    def _resolve(self, filename: str, load):
+        """The one cache-miss path: decode once, however many threads ask."""
         f_id = self._filename_to_id(filename)
-        if f_id not in self._cache:
-            from .tile_map import load_tile_map_spec
+        with self._lock:
+            if f_id in self._cache:
+                self._hits += 1
+                self._cache.move_to_end(f_id)
+                return self._cache[f_id]
+            self._misses += 1
+            future = self._pending.get(f_id)
+            owner = future is None
+            if owner:
+                future = self._pending[f_id] = Future()
+        if not owner:
+            return future.result()
+        try:
+            spec = load(filename)
+        except BaseException as exc:
+            with self._lock:
+                if self._pending.get(f_id) is future:
+                    del self._pending[f_id]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            # A reset() during the decode dropped this claim: the waiters
+            # still get the spec, but the emptied cache does not.
+            if self._pending.get(f_id) is future:
+                del self._pending[f_id]
+                self._cache[f_id] = spec
+                self._sizes[f_id] = size = _spec_nbytes(spec)
+                self._bytes += size
+                self._enforce_budget(keep=f_id)
+        future.set_result(spec)
+        return spec
+
+    def _enforce_budget(self, keep: int) -> None:
+        """Evict least recently used entries until the budget holds. Pinned
+        entries, free ones and the entry just loaded are never evicted, so
+        a budget smaller than those is exceeded rather than thrashed."""
+        budget = self._budget
+        if budget is None or self._bytes <= budget:
+            return
+        for f_id in list(self._cache):
+            if self._bytes <= budget:
+                break
+            if f_id == keep or f_id in self._pinned or not self._sizes[f_id]:
+                continue
+            self._discard(f_id)
+            self._evictions += 1
 
-            self._cache[f_id] = load_tile_map_spec(filename)
-        return self._cache[f_id]
+    def _discard(self, f_id: int):
+        self._bytes -= self._sizes.pop(f_id)
+        return self._cache.pop(f_id)
 
     def fetch(self, filename: str) -> Resource:
         """Memo-cached text file (shader source is the one real client).
         Content lazy-reads on first .content access."""
-        f_id = self._filename_to_id(filename)
-        if f_id not in self._cache:
-            self._cache[f_id] = Resource(filename, f_id)
-        return self._cache[f_id]
+        return self._resolve(
+            filename, lambda name: Resource(name, self._filename_to_id(name))
+        )
+
+    def pin(self, filename: str) -> None:
+        """Exempt a file's entry from budget eviction until unpin(). The file
+        need not be loaded yet; pin a level's assets before preloading them."""
+        with self._lock:
+            self._pinned.add(self._filename_to_id(filename))
+
+    def unpin(self, filename: str) -> None:
+        """Make a pinned entry evictable again; over budget, that may be now."""
+        with self._lock:
+            self._pinned.discard(self._filename_to_id(filename))
+            self._enforce_budget(keep=-1)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                bytes=self._bytes,
+                entries=len(self._cache),
+                pinned=len(self._pinned),
+                budget=self._budget,
+            )
 
     def remove(self, filename: str):
         """Evict a cached entry by filename (specs carry no cache id)."""
         f_id = self._filename_to_id(filename)
-        if f_id in self._cache:
-            entry = self._cache[f_id]
-            del self._cache[f_id]
-            return entry
+        with self._lock:
+            if f_id in self._cache:
+                return self._discard(f_id)
         raise KeyError("Resource not found in cache.")
 
     def reset(self, are_you_sure: bool = False):
+        """Forget every entry, pin and counter, and every in-flight decode:
+        one finishing later serves its waiters without caching its spec."""
         if are_you_sure:
-            self._cache = {}
+            with self._lock:
+                self._pending = {}
+                self._cache = OrderedDict()
+                self._sizes = {}
+                self._bytes = 0
+                self._pinned = set()
+                self._hits = self._misses = self._evictions = 0
 
     def __len__(self):
         return len(self._cache)
@@ -0,0 +1,307 @@
+"""Chunked, memory-mapped storage for TileMap planes too big to hold decoded.
+
+TMX stores every layer as one base64/CSV run, so reading a map means decoding
+all of it -- fine for a level, hopeless for a world. This is the opt-in
+alternative: convert the TMX once,
+
+    convert_tile_map("world.tmx", "world.bpsmap")
+
+and `ResourceManager().tile_map("world.bpsmap")` (or `TileMap.load`) returns
+the same TileMapSpec shape whose planes are ChunkedPlanes instead of arrays.
+Loading reads only the header and the chunk index; cell data stays in the
+file until a window asks for it, and even then only the chunks under that
+window are paged in. Chunks which are entirely empty are not stored at all.
+
+The file is little-endian throughout:
+
+    8 bytes   magic, b"BPSCHNK1"
+    4 bytes   uint32 header length, then that many bytes of UTF-8 JSON
+              (map size, tile size, chunk size, tilesets, layer names)
+    padding   to a 16-byte boundary
+    index     int32 (layers, chunk rows, chunk columns): slot or -1 (empty)
+    padding   to a 16-byte boundary
+    slots     (slots, chunk, chunk) records of ("tile" <i4, "flags" u1)
+
+Like the TMX loader this module is GL-free, and tileset image paths are
+stored relative to the chunked file so the pair can move together.
+"""
+
+from __future__ import annotations
+
+import json
+import operator
+from dataclasses import fields
+from os.path import abspath, dirname, join, relpath
+from typing import Any, Dict, Iterator, Tuple, Union
+
+import numpy as np
+
+from .tile_map import TILE_MAP_DTYPE, TileMapSpec, TileSetSpec, load_tile_map_spec
+
+
+CHUNKED_MAP_SUFFIX = ".bpsmap"
+
+_MAGIC = b"BPSCHNK1"
+_VERSION = 1
+_ALIGN = 16
+# TILE_MAP_DTYPE is native-endian; the file is pinned to little-endian so a
+# converted map reads the same everywhere.
+_DISK_DTYPE = np.dtype([("tile", "<i4"), ("flags", "u1")])
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _require(header: Dict[str, Any], key: str, filename: str) -> Any:
+    """One header entry, or the ValueError every unreadable map raises."""
+    try:
+        return header[key]
+    except KeyError:
+        raise ValueError(
+            f"chunked map {filename!r}: header has no {key!r}"
+        ) from None
+
+
+def _empty(shape: Tuple[int, int]) -> np.ndarray:
+    plane = np.zeros(shape, dtype=TILE_MAP_DTYPE)
+    plane["tile"] = -1
+    return plane
+
+
+class ChunkedPlane:
+    """A read-only map plane served in windows from a memory-mapped file.
+
+    It answers the handful of questions a plane gets asked -- `shape`, `ndim`,
+    `dtype` -- and 2D indexing: `plane[y0:y1, x0:x1]` assembles a fresh
+    structured array of exactly that window from the chunks it touches, and
+    `plane[y, x]` reads one cell. That is all TileLayer.follow() needs, so a
+    chunked plane streams through a camera exactly like an ordinary one.
+    Slices must have unit step; the whole plane is `plane[:, :]` if you
+    really want it.
+    """
+
+    def __init__(
+        self,
+        shape: Tuple[int, int],
+        chunk: int,
+        index: np.ndarray,
+        slots: np.ndarray,
+    ) -> None:
+        self._shape = shape
+        self._chunk = chunk
+        self._index = index
+        self._slots = slots
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Plane size in cells, `(rows, columns)` -- NumPy order."""
+        return self._shape
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The dtype of every window: TILE_MAP_DTYPE."""
+        return TILE_MAP_DTYPE
+
+    @property
+    def chunk_size(self) -> int:
+        """Side of one square storage chunk, in cells."""
+        return self._chunk
+
+    def __len__(self) -> int:
+        return self._shape[0]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Row by row, as an array walks: each row is `plane[y, :]`."""
+        for y in range(self._shape[0]):
+            yield self[y, :]
+
+    def __getitem__(
+        self, key: Tuple[Union[int, slice], Union[int, slice]]
+    ) -> np.ndarray:
+        if not isinstance(key, tuple) or len(key) != 2:
+            raise IndexError(
+                "a chunked plane takes a 2D window, plane[y0:y1, x0:x1]"
+            )
+        spans = [self._span(k, n) for k, n in zip(key, self._shape)]
+        (y0, y1), (x0, x1) = spans
+        window = self._window(y0, y1, x0, x1)
+        return window[
+            tuple(slice(None) if isinstance(k, slice) else 0 for k in key)
+        ]
+
+    @staticmethod
+    def _span(key: Union[int, slice], n: int) -> Tuple[int, int]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(n)
+            if step != 1:
+                raise IndexError("chunked plane windows need a unit step")
+            return start, max(start, stop)
+        i = operator.index(key)
+        if not -n <= i < n:
+            raise IndexError(f"index {i} out of range for axis of size {n}")
+        i %= n
+        return i, i + 1
+
+    def _window(self, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        out = _empty((y1 - y0, x1 - x0))
+        c = self._chunk
+        for cy in range(y0 // c, -(-y1 // c)):
+            ry0, ry1 = max(y0, cy * c), min(y1, (cy + 1) * c)
+            for cx in range(x0 // c, -(-x1 // c)):
+                slot = self._index[cy, cx]
+                if slot < 0:
+                    continue
+                rx0, rx1 = max(x0, cx * c), min(x1, (cx + 1) * c)
+                cells = self._slots[slot][
+                    ry0 - cy * c : ry1 - cy * c, rx0 - cx * c : rx1 - cx * c
+                ]
+                dest = out[ry0 - y0 : ry1 - y0, rx0 - x0 : rx1 - x0]
+                dest["tile"] = cells["tile"]
+                dest["flags"] = cells["flags"]
+        return out
+
+
+def convert_tile_map(
+    source: Union[str, TileMapSpec],
+    destination: str,
+    chunk: int = 64,
+) -> str:
+    """Write a TMX file (or an already-loaded TileMapSpec) as a chunked map.
+
+    This is the one time the whole map is decoded; the chunked file then
+    loads in constant time. `chunk` is the side of one square chunk in cells:
+    pick it near the camera's span so a window touches few chunks. Returns
+    the absolute destination path.
+    """
+    spec = load_tile_map_spec(source) if isinstance(source, str) else source
+    if not isinstance(spec, TileMapSpec):
+        raise TypeError(f"expected a TMX filename or TileMapSpec, got {type(spec)}")
+    if chunk <= 0:
+        raise ValueError(f"chunk size must be positive, got {chunk}")
+    destination = abspath(destination)
+    base = dirname(destination)
+    rows, cols = -(-spec.height // chunk), -(-spec.width // chunk)
+    header = json.dumps(
+        {
+            "version": _VERSION,
+            "width": spec.width,
+            "height": spec.height,
+            "tilewidth": spec.tilewidth,
+            "tileheight": spec.tileheight,
+            "chunk": chunk,
+            "tilesets": [
+                {
+                    "name": ts.name,
+                    "firstgid": ts.firstgid,
+                    "image": relpath(ts.image, base),
+                    "tilewidth": ts.tilewidth,
+                    "tileheight": ts.tileheight,
+                    "columns": ts.columns,
+                    "tilecount": ts.tilecount,
+                }
+                for ts in spec.tilesets
+            ],
+            "layers": [name for name, _ in spec.layers],
+        }
+    ).encode("utf-8")
+    index_at = _aligned(len(_MAGIC) + 4 + len(header))
+    index = np.full((len(spec.layers), rows, cols), -1, dtype="<i4")
+    slots_at = _aligned(index_at + index.nbytes)
+
+    scratch = _empty((chunk, chunk))
+    slot = 0
+    with open(destination, "wb") as f:
+        f.write(_MAGIC)
+        f.write(np.uint32(len(header)).astype("<u4").tobytes())
+        f.write(header)
+        f.seek(slots_at)
+        for layer, (_, plane) in enumerate(spec.layers):
+            for cy in range(rows):
+                for cx in range(cols):
+                    cells = plane[
+                        cy * chunk : (cy + 1) * chunk, cx * chunk : (cx + 1) * chunk
+                    ]
+                    if not np.any(cells["tile"] >= 0) and not np.any(cells["flags"]):
+                        continue
+                    # Edge chunks pad out to full size with empty cells so
+                    # every slot is the same shape.
+                    scratch[...] = _empty((chunk, chunk))
+                    scratch[: cells.shape[0], : cells.shape[1]] = cells
+                    f.write(scratch.astype(_DISK_DTYPE).tobytes())
+                    index[layer, cy, cx] = slot
+                    slot += 1
+        f.seek(index_at)
+        f.write(index.tobytes())
+    return destination
+
+
+def load_chunked_tile_map_spec(filename: str) -> TileMapSpec:
+    """Open a chunked map: header and index now, cell data on demand."""
+
+    filename = abspath(filename)
+    try:
+        with open(filename, "rb") as f:
+            magic = f.read(len(_MAGIC))
+            length = np.frombuffer(f.read(4), dtype="<u4")
+            header = json.loads(f.read(int(length[0])).decode("utf-8"))
+    except (OSError, IndexError, ValueError) as exc:
+        raise ValueError(f"chunked map {filename!r}: cannot read: {exc}") from exc
+    if magic != _MAGIC:
+        raise ValueError(f"chunked map {filename!r}: not a BPS chunked map")
+    if header.get("version") != _VERSION:
+        raise ValueError(
+            f"chunked map {filename!r}: unsupported version "
+            f"{header.get('version')!r}"
+        )
+    width, height, chunk, names = (
+        _require(header, key, filename)
+        for key in ("width", "height", "chunk", "layers")
+    )
+    rows, cols = -(-height // chunk), -(-width // chunk)
+    index_at = _aligned(len(_MAGIC) + 4 + int(length[0]))
+    try:
+        index = np.memmap(
+            filename, dtype="<i4", mode="r", offset=index_at,
+            shape=(len(names), rows, cols),
+        )
+        slots_at = _aligned(index_at + index.nbytes)
+        count = int(index.max(initial=-1)) + 1
+        if count:
+            slots = np.memmap(
+                filename, dtype=_DISK_DTYPE, mode="r", offset=slots_at,
+                shape=(count, chunk, chunk),
+            )
+        else:
+            slots = np.empty((0, chunk, chunk), dtype=_DISK_DTYPE)
+    except (OSError, ValueError) as exc:
+        # A truncated file: numpy's "mmap length is greater than file size".
+        raise ValueError(f"chunked map {filename!r}: cannot read: {exc}") from exc
+
+    base = dirname(filename)
+    entries = [
+        {
+            field.name: _require(ts, field.name, filename)
+            for field in fields(TileSetSpec)
+        }
+        for ts in _require(header, "tilesets", filename)
+    ]
+    tilesets = tuple(
+        TileSetSpec(**{**ts, "image": abspath(join(base, ts["image"]))})
+        for ts in entries
+    )
+    return TileMapSpec(
+        width=width,
+        height=height,
+        tilewidth=_require(header, "tilewidth", filename),
+        tileheight=_require(header, "tileheight", filename),
+        tilesets=tilesets,
+        layers=tuple(
+            (name, ChunkedPlane((height, width), chunk, index[layer], slots))
+            for layer, name in enumerate(names)
+        ),
+    )
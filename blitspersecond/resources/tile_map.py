@@ -16,11 +16,14 @@ import gzip
 import zlib
 from dataclasses import dataclass
 from os.path import abspath, dirname, join
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple, Union
 from xml.etree import ElementTree
 
 import numpy as np
 
+if TYPE_CHECKING:
+    from .tile_chunks import ChunkedPlane
+
 
 _TMX_FLIP_H = 0x80000000
 _TMX_FLIP_V = 0x40000000
@@ -57,8 +60,9 @@ class TileMapSpec:
     tileheight: int
     tilesets: Tuple[TileSetSpec, ...]
     # Authored back-to-front order. Each plane is a plain structured NumPy
-    # array of local tile indices plus orientation; tile -1 is empty.
-    layers: Tuple[Tuple[str, np.ndarray], ...]
+    # array of local tile indices plus orientation; tile -1 is empty. Specs
+    # loaded from a chunked .bpsmap carry ChunkedPlane windows instead.
+    layers: Tuple[Tuple[str, Union[np.ndarray, "ChunkedPlane"]], ...]
 
 
 def _positive_int(element, attribute: str, where: str) -> int:
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 import os
+from typing import Optional
 
 from blitspersecond.common import SingletonMeta, Size
 
@@ -46,11 +47,26 @@ class Tiles:
     default: Size = Size(32, 32)
 
 
+@dataclass
+class Resources:
+    # Directory for ResourceManager's persistent decoded-asset cache; None
+    # decodes every launch. Created on first write. Handed to
+    # ResourceManager().cache_dir when the engine starts.
+    cache_dir: Optional[str] = field(
+        default_factory=lambda: os.environ.get("BPS_ASSET_CACHE") or None
+    )
+    # Byte ceiling for ResourceManager's in-memory spec cache, measured in
+    # ndarray payloads; least recently used unpinned specs go first. None is
+    # unbounded. Handed to ResourceManager().budget when the engine starts.
+    budget: Optional[int] = None
+
+
 class Config(metaclass=SingletonMeta):
     def __init__(self):
         self._display = Display()
         self._input = Input()
         self._tiles = Tiles()
+        self._resources = Resources()
 
     @property
     def display(self):
@@ -63,3 +79,7 @@ class Config(metaclass=SingletonMeta):
     @property
     def tiles(self):
         return self._tiles
+
+    @property
+    def resources(self):
+        return self._resources
@@ -10,9 +10,9 @@ Pace log line, and the engine asks for the session pace report at loop exit)
 and `.render` (compose-step duration -- draw cost only, never vsync wait, so
 composition can't masquerade as a presentation stall).
 
-The gauge machinery (PaceMetric, DurationMetric, the Metric ABC in abc.py)
-lives in this package's other modules; user code meets only the singletons
-and the Metric read surface (average/max/push).
+The gauge machinery (PaceMetric, DurationMetric, CountMetric, the Metric ABC
+in abc.py) lives in this package's other modules; user code meets only the
+singletons and the Metric read surface (average/max/push).
 """
 
 from .abc import Metric
@@ -0,0 +1,33 @@
+from collections import deque
+
+from blitspersecond.system.config import Config
+
+from .abc import Metric
+
+
+class CountMetric(Metric):
+    """A rolling window of per-frame counts (e.g. draw calls).
+
+    DurationMetric's twin for things that are counted rather than timed:
+    the same fixed window and average/max, plus `last` -- a count is
+    usually read as "this frame", where a duration is read as a trend.
+    """
+
+    def __init__(self, window: int = 0):
+        # Default window ~= one second of frames.
+        self._queue: deque = deque(maxlen=window or Config().display.fps)
+
+    def push(self, sample: float) -> None:
+        self._queue.append(int(sample))
+
+    @property
+    def last(self) -> int:
+        return self._queue[-1] if self._queue else 0
+
+    @property
+    def average(self) -> float:
+        return sum(self._queue) / len(self._queue) if self._queue else 0.0
+
+    @property
+    def max(self) -> int:
+        return max(self._queue) if self._queue else 0
@@ -1,5 +1,6 @@
 from blitspersecond.common import SingletonMeta
 
+from .count import CountMetric
 from .duration import DurationMetric
 from .pace import PaceMetric
 
@@ -8,6 +9,9 @@ class Metrics(metaclass=SingletonMeta):
     def __init__(self):
         self._pace = PaceMetric()
         self._render = DurationMetric()
+        self._upload = DurationMetric()
+        self._draw_calls = CountMetric()
+        self._state_changes = CountMetric()
 
     @property
     def pace(self) -> PaceMetric:
@@ -20,3 +24,23 @@ class Metrics(metaclass=SingletonMeta):
         """Compose-step duration (seconds) -- how long the render path takes to
         draw all layers into the framebuffer, excluding vsync/present wait."""
         return self._render
+
+    @property
+    def upload(self) -> DurationMetric:
+        """PixelBuffer upload time (seconds), one sample per composed frame
+        summing every texture update since the last -- the CPU side of
+        getting pixels to the GPU, plain or streaming. Uploads triggered
+        while composing also count in render."""
+        return self._upload
+
+    @property
+    def draw_calls(self) -> CountMetric:
+        """Draw calls per composed frame, cached-run quads included."""
+        return self._draw_calls
+
+    @property
+    def state_changes(self) -> CountMetric:
+        """GL state changes per composed frame -- program, VAO, texture and
+        palette binds, generic-attribute writes, blend set-ups -- after the
+        compositor's DrawList dropped the redundant ones."""
+        return self._state_changes
@@ -0,0 +1,31 @@
+"""Shared fixtures: a real GL context for the few tests that need one."""
+
+import pyglet
+import pytest
+
+
+@pytest.fixture(scope="module")
+def _headless_display():
+    """A real Display on pyglet's offscreen EGL backend, one per module --
+    or a skip where the run is not headless (BPS_HEADLESS=1 /
+    PYGLET_HEADLESS=1) or no GL context can be made."""
+    if not pyglet.options["headless"]:
+        pytest.skip("needs the headless GL backend (BPS_HEADLESS=1)")
+    from blitspersecond.display import Display
+
+    try:
+        display = Display()
+    except Exception as exc:  # no EGL device, no driver
+        pytest.skip(f"no headless GL context: {exc}")
+    yield display
+    display.close()
+
+
+@pytest.fixture()
+def gl_display(_headless_display):
+    """The headless Display, its context current, its framebuffer
+    composable and capturable; every layer a test adds is removed after."""
+    yield _headless_display
+    layers = _headless_display.layers
+    for layer in list(layers):
+        layers.remove(layer)
@@ -125,6 +125,69 @@ def test_write_can_position_before_output():
     assert (console.cursor.x, console.cursor.y) == (8, 2)
 
 
+def _write_per_cell(console: Console, text: str) -> None:
+    """The teletype loop write() used to be: one cell setter per byte."""
+    for ch in text:
+        if ch == "\n":
+            console._newline()
+            continue
+        console.glyphs.cell[console.cursor.x, console.cursor.y] = ord(ch)
+        x = console.cursor.x + 1
+        if x >= console.cols:
+            console._newline()
+        else:
+            console.cursor = (x, console.cursor.y)
+
+
+@pytest.mark.parametrize(
+    ("start", "text"),
+    [
+        ((3, 0), "short"),
+        ((70, 27), "wraps past the edge and over the bottom\nof the screen\n"),
+        ((0, 29), "x" * 80 + "\n\n" + "y" * 200),
+        ((5, 10), "".join(f"line {i}: {'#' * (i * 7 % 95)}\n" for i in range(60))),
+    ],
+)
+def test_block_write_matches_the_per_cell_teletype(start, text):
+    block, cells = _console(), _console()
+    for console in (block, cells):
+        console.write("background " * 300, at=(0, 0))
+        console.cursor = start
+
+    block.write(text)
+    _write_per_cell(cells, text)
+
+    assert (block.cursor.x, block.cursor.y) == (cells.cursor.x, cells.cursor.y)
+    assert (block.glyphs._chars == cells.glyphs._chars).all()
+    assert (block.glyphs._image.pixels == cells.glyphs._image.pixels).all()
+
+
+def test_print_many_prints_each_value_on_its_own_line():
+    console = _console()
+
+    console.print_many([1, "two", 3.0], at=(4, 2))
+
+    assert _bytes(console, 2, 4, 1) == b"1"
+    assert _bytes(console, 3, 0, 3) == b"two"
+    assert _bytes(console, 4, 0, 3) == b"3.0"
+    assert (console.cursor.x, console.cursor.y) == (0, 5)
+
+
+def test_queued_output_drains_a_bounded_number_of_cells():
+    console = Console(GlyphEngine(CharSet.ASCII8X12), queue_limit=16)
+
+    console.queue("0123456789")
+    console.queue_print("abcdefghij")
+
+    assert (console.queued, console.dropped) == (16, 5)
+    assert console.drain(4) == 4
+    assert _bytes(console, 0, 0, 4) == b"5678"
+    assert console.drain(100) == 12
+    assert _bytes(console, 0, 0, 16) == b"5678" b"9abcdefghij" b"\0"
+    assert (console.cursor.x, console.cursor.y) == (0, 1)
+    assert console.drain(100) == 0
+
+
 def test_print_can_position_before_output():
     console = _console()
 
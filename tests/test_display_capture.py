@@ -0,0 +1,137 @@
+"""Frame capture: the composed framebuffer read back as NumPy, and dumped."""
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+from PIL import Image
+
+from blitspersecond.display import Display
+from blitspersecond.graphics import PixelBuffer, TileAtlas, TileEngine
+from blitspersecond.resources import ImageSpec, Palette
+
+
+def test_dump_writes_the_captured_frame_losslessly(tmp_path):
+    frame = np.random.default_rng(0).integers(0, 256, (360, 640, 4), dtype=np.uint8)
+    display = Display.__new__(Display)  # no surface: capture is the seam
+    display._framebuffer = SimpleNamespace(read=lambda: frame)
+
+    assert display.capture() is frame
+    display.dump(str(tmp_path / "frame.png"))
+
+    with Image.open(tmp_path / "frame.png") as image:
+        assert image.mode == "RGBA"
+        assert np.array_equal(np.asarray(image), frame)
+
+
+def _square(display, rgb, x, y, cached=True):
+    """An 8x8 square of one colour on its own layer, added on top."""
+    spec = ImageSpec(
+        size=(8, 8),
+        mode="P",
+        data=np.ones((8, 8), dtype=np.uint8),
+        palette=Palette([0, 0, 0, *rgb]),
+        transparency_index=0,
+    )
+    layer = TileEngine(TileAtlas(PixelBuffer(spec), tile_size=(8, 8)))
+    layer.blit(0, x, y)
+    layer.cached = cached
+    return display.layers.add(layer)
+
+
+def _frame(display):
+    display.prepare()
+    return display.capture()
+
+
+def test_cached_runs_lay_down_what_live_drawing_would(gl_display):
+    red = _square(gl_display, (255, 0, 0), 0, 0)
+    blue = _square(gl_display, (0, 0, 255), 4, 2)
+    blue.alpha = 0.5
+    green = _square(gl_display, (0, 255, 0), 6, 6, cached=False)
+    cache = gl_display._layer_cache
+
+    live = _frame(gl_display)  # nothing composed yet: all live
+    assert gl_display.cached_layers == 0
+    flattened = _frame(gl_display)
+    assert gl_display.cached_layers == 2 and len(cache._targets) == 1
+    target = cache._targets[0]
+    assert np.array_equal(flattened, live)
+    assert np.array_equal(_frame(gl_display), live)
+    assert cache._targets == [target]  # same run, same target
+
+    # A change drops that layer out of its run for a frame; the rest of
+    # the run keeps a (recycled) target.
+    blue.alpha = 0.25
+    changed = _frame(gl_display)
+    assert gl_display.cached_layers == 1
+    for layer in (red, blue, green):
+        layer.cached = False
+    assert np.array_equal(changed, _frame(gl_display))
+    assert gl_display.cached_layers == 0 and cache._targets == []
+
+
+def test_capture_reads_a_composed_layer_top_row_first(gl_display):
+    assert gl_display.headless
+    _square(gl_display, (255, 0, 0), 3, 5, cached=False)
+    frame = _frame(gl_display)
+
+    assert frame.shape == (360, 640, 4) and frame.dtype == np.uint8
+    # Layer y=5 is capture row 5 from the top; everything else is clear.
+    painted = np.zeros(frame.shape[:2], dtype=bool)
+    painted[5:13, 3:11] = True
+    assert (frame[painted] == (255, 0, 0, 255)).all()
+    assert len(np.unique(frame[~painted], axis=0)) == 1
+    assert not (frame[~painted] == (255, 0, 0, 255)).all(axis=1).any()
+
+
+def test_bps_headless_composes_and_dumps_offscreen(gl_display, tmp_path):
+    # BPS_HEADLESS alone (no PYGLET_HEADLESS) must switch the backend
+    # before anything opens a window -- so a fresh interpreter, gl_display
+    # only vouching that this machine has an EGL context to give.
+    script = textwrap.dedent(
+        """
+        import sys
+
+        import numpy as np
+
+        import blitspersecond
+        from blitspersecond.display import Display
+        from blitspersecond.graphics import PixelBuffer, TileAtlas, TileEngine
+        from blitspersecond.resources import ImageSpec, Palette
+
+        display = Display()
+        assert display.headless
+        spec = ImageSpec(
+            size=(8, 8),
+            mode="P",
+            data=np.ones((8, 8), dtype=np.uint8),
+            palette=Palette([0, 0, 0, 0, 0, 255]),
+            transparency_index=0,
+        )
+        layer = TileEngine(TileAtlas(PixelBuffer(spec), tile_size=(8, 8)))
+        layer.blit(0, 600, 340)
+        display.layers.add(layer)
+        display.prepare()
+        display.dump(sys.argv[1])
+        display.close()
+        """
+    )
+    env = {k: v for k, v in os.environ.items() if k != "PYGLET_HEADLESS"}
+    env["BPS_HEADLESS"] = "1"
+    root = Path(__file__).resolve().parent.parent
+    paths = (str(root), env.get("PYTHONPATH"))
+    env["PYTHONPATH"] = os.pathsep.join(entry for entry in paths if entry)
+    path = tmp_path / "frame.png"
+    subprocess.run(
+        [sys.executable, "-c", script, str(path)], env=env, cwd=root, check=True
+    )
+
+    with Image.open(path) as image:
+        frame = np.asarray(image)
+    assert (frame[340:348, 600:608] == (0, 0, 255, 255)).all()
+    assert not (frame[12:20, 600:608] == (0, 0, 255, 255)).all(axis=-1).any()
@@ -1,3 +1,4 @@
+import ctypes
 from unittest.mock import Mock
 
 import numpy as np
@@ -283,6 +284,136 @@ def test_cell_write_renders_glyph_planes_through_cell_colours():
     assert glyphs._image.dirty
 
 
+class _RecordingUpload:
+    """Stands in for the GL texture update: keeps what each upload_region()
+    carried -- the rect, and the rows read back through the pointer and
+    pitch it was handed, as the driver would read them."""
+
+    def __init__(self):
+        self.blits = []
+
+    def __call__(self, texture, pixels, x, y, fmt):
+        h, w = pixels.shape[:2]
+        pitch = pixels.strides[0]
+        data = ctypes.string_at(pixels.ctypes.data, (h - 1) * pitch + w)
+        rows = np.frombuffer(data + bytes(pitch - w), dtype=np.uint8)
+        uploaded = rows.reshape(h, pitch)[:, :w]
+        self.blits.append(((x, y, w, h), uploaded, pixels.ctypes.data))
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    from blitspersecond.graphics.common import pixelbuffer
+
+    recorder = _RecordingUpload()
+    monkeypatch.setattr(pixelbuffer, "upload_region", recorder)
+    return recorder
+
+
+def test_cell_writes_upload_only_their_glyph_rects(uploads):
+    glyphs = GlyphEngine(CharSet.ASCII8X8)
+    image = glyphs._image
+    image._texture = object()
+    image.dirty = False
+
+    glyphs.cell[2, 3] = ord("a")
+    glyphs.cell[79, 44] = ord("b")
+    assert image.dirty
+    image._upload()
+
+    assert [rect for rect, _, _ in uploads.blits] == [
+        (16, 24, 8, 8),
+        (632, 352, 8, 8),
+    ]
+    base, pitch = image.pixels.ctypes.data, image.pixels.strides[0]
+    for (x, y, w, h), uploaded, address in uploads.blits:
+        assert np.array_equal(uploaded, image.pixels[y : y + h, x : x + w])
+        assert address == base + y * pitch + x  # read in place, not packed
+    assert not image.dirty
+
+
+def test_dirty_rects_fall_back_to_one_full_upload(uploads):
+    glyphs = GlyphEngine(CharSet.ASCII8X8)
+    image = glyphs._image
+    image._texture = object()
+    image.dirty = False
+
+    with image.edit((-10, 50, 400, 400)) as px:
+        assert px.shape == (310, 390)
+        px[:] = 1
+    image.mark_dirty(0, 0, 10, 10)
+    image._upload()
+
+    assert [rect for rect, _, _ in uploads.blits] == [(0, 0, 640, 360)]
+
+    uploads.blits.clear()
+    image.mark_dirty(640, 0, 8, 8)  # wholly outside: nothing to do
+    assert not image.dirty
+    image.mark_dirty(10, 20, 30, 40)
+    image.dirty = True  # a whole-buffer mark absorbs the rect
+    image._upload()
+    assert [rect for rect, _, _ in uploads.blits] == [(0, 0, 640, 360)]
+
+
+@pytest.mark.parametrize("mode", ["P", "RGBA"])
+def test_unpack_ring_uploads_through_gl(gl_display, mode):
+    from pyglet.gl import (
+        GL_PACK_ALIGNMENT,
+        GL_RED,
+        GL_RGBA,
+        GL_UNSIGNED_BYTE,
+        glBindTexture,
+        glGetTexImage,
+        glPixelStorei,
+    )
+
+    from blitspersecond.graphics import PixelBuffer
+    from blitspersecond.resources import ImageSpec
+
+    # An odd width: the unpack alignment has to come down to the pitch.
+    image = PixelBuffer(ImageSpec(size=(37, 19), mode=mode), streaming=True)
+    rng = np.random.default_rng(3)
+    for _ in range(4):  # round the ring and then some
+        image.pixels[...] = rng.integers(0, 256, image.pixels.shape, dtype=np.uint8)
+        image.dirty = True
+        texture = image.texture
+        channels, fmt = (1, GL_RED) if mode == "P" else (4, GL_RGBA)
+        out = np.empty((19, 37, channels), dtype=np.uint8)
+        glBindTexture(texture.target, texture.id)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glGetTexImage(texture.target, 0, fmt, GL_UNSIGNED_BYTE, out.ctypes.data)
+        glPixelStorei(GL_PACK_ALIGNMENT, 4)
+        assert np.array_equal(out.reshape(image.pixels.shape), image.pixels)
+    assert image._ring is not None and image._ring.depth == 3
+
+
+def test_streaming_buffer_uploads_whole_through_its_ring(uploads):
+    from blitspersecond.graphics import PixelBuffer
+    from blitspersecond.resources import ImageSpec
+
+    class Ring:
+        uploads = []
+
+        def upload(self, texture, pixels, fmt):
+            self.uploads.append((texture, pixels.shape, fmt))
+
+    spec = ImageSpec(size=(640, 360), mode="RGBA", streaming=True)
+    image = PixelBuffer(spec)
+    assert image.streaming and not PixelBuffer(spec, streaming=False).streaming
+    image._texture = texture = object()
+    image._ring = Ring()
+    PixelBuffer.take_upload_time()
+
+    image.mark_dirty(0, 0, 8, 8)
+    image._upload()
+
+    assert Ring.uploads == [(texture, (360, 640, 4), "RGBA")]
+    assert uploads.blits == [] and not image.dirty
+    assert PixelBuffer.take_upload_time() > 0
+    image.streaming = False
+    assert image._ring is None
+
+
 def test_clear_refreshes_layerable_pixel_buffer():
     glyphs = GlyphEngine(CharSet.ASCII8X8)
     glyphs.cell[0, 0] = ord("a")
@@ -298,14 +429,15 @@ def test_prepare_and_draw_delegate_to_picture_engine():
     glyphs = GlyphEngine(CharSet.ASCII8X8)
     glyphs._renderer.prepare = Mock()
     glyphs._renderer.blit = Mock()
-    glyphs._renderer._composite = Mock()
+    glyphs._renderer._record = Mock()
+    draws = Mock()
 
     glyphs.prepare()
-    glyphs._composite()
+    glyphs._record(draws)
 
     glyphs._renderer.prepare.assert_called_once_with()
     glyphs._renderer.blit.assert_called_once_with(0, 0, 0)
-    glyphs._renderer._composite.assert_called_once_with()
+    glyphs._renderer._record.assert_called_once_with(draws)
 
 
 def test_cell_write_stamps_rendered_glyph_into_collision_mask():
@@ -415,6 +547,71 @@ def test_scroll_beyond_grid_clears_in_current_pen():
     assert not glyphs.collision_mask.any()
 
 
+@pytest.mark.parametrize("amount", [(0, -1), (3, 2), (-5, 7), (-79, -44)])
+def test_scroll_in_place_matches_a_full_rerender(amount):
+    glyphs = GlyphEngine(CharSet.ASCII8X8)
+    rng = np.random.default_rng(7)
+    glyphs._chars[:] = rng.integers(0, 128, glyphs._chars.shape)
+    glyphs._colours[:] = rng.integers(0, 16, glyphs._colours.shape)
+    glyphs._glyphs[0, 2, 2] = 1  # a visible glyph 0 shows the exposed strips
+    glyphs._refresh()
+    glyphs.pen[1] = 5
+
+    glyphs.scroll(amount)
+    scrolled = glyphs._image.pixels.copy()
+    glyphs._refresh()
+
+    assert np.array_equal(scrolled, glyphs._image.pixels)
+
+
+def test_write_renders_a_run_like_cell_writes():
+    bulk = GlyphEngine(CharSet.ASCII8X8)
+    cells = GlyphEngine(CharSet.ASCII8X8)
+    for glyphs in (bulk, cells):
+        glyphs.pen[1] = 3
+    pen = Pen(0, 11, 0, 0)
+
+    bulk.write(5, 7, b"hello", pen)
+    bulk.write(75, 44, "world")
+    cells.pen = pen
+    for i, ch in enumerate(b"hello"):
+        cells.cell[5 + i, 7] = ch
+    cells.pen = Pen(0, 3, 0, 0)
+    for i, ch in enumerate(b"world"):
+        cells.cell[75 + i, 44] = ch
+
+    assert bulk.pen[1] == 3
+    assert np.array_equal(bulk._chars, cells._chars)
+    assert np.array_equal(bulk._colours, cells._colours)
+    assert np.array_equal(bulk._image.pixels, cells._image.pixels)
+
+
+def test_write_reports_one_dirty_rect_per_run():
+    glyphs = GlyphEngine(CharSet.ASCII8X8)
+    glyphs._image.dirty = False
+
+    glyphs.write(2, 3, [104, 105])
+
+    assert glyphs._image._dirty_rects == [(16, 24, 16, 8)]
+
+
+@pytest.mark.parametrize(
+    ("x", "y", "data", "error"),
+    [
+        (78, 0, b"abc", ValueError),
+        (0, 45, b"a", ValueError),
+        (0, 0, [256], ValueError),
+        (0, 0, "\u2603", ValueError),
+        (0, 0, [1.5], TypeError),
+    ],
+)
+def test_write_rejects_runs_that_do_not_fit(x, y, data, error):
+    glyphs = GlyphEngine(CharSet.ASCII8X8)
+
+    with pytest.raises(error):
+        glyphs.write(x, y, data)
+
+
 @pytest.mark.parametrize("amount", [(1,), [1, 2], (1.0, 2), (True, 2)])
 def test_scroll_rejects_invalid_amount(amount):
     glyphs = GlyphEngine(CharSet.ASCII8X8)
@@ -552,3 +749,16 @@ def test_magic_pen_pixels_are_live_but_written_cells_are_snapshots():
     assert not np.any(cell_colours(glyphs, 0, 0)[:, :, 1] == 99)
     glyphs.cell[1, 0] = ord("a")
     assert np.all(cell_colours(glyphs, 1, 0)[:, :, 1] == 99)
+
+
+def test_cell_writes_and_palette_edits_move_the_layer_version():
+    engine = GlyphEngine((8, 8))
+    before = engine.version
+    assert engine.version == before
+
+    engine.write(0, 0, b"hi")
+    after_write = engine.version
+    assert after_write != before
+
+    engine.palette[3] = (1, 2, 3, 255)
+    assert engine.version != after_write
@@ -76,6 +76,29 @@ def test_window_box(pair):
     assert q.at(6, 6, 3, 3) is True  # window covers it
 
 
+def test_at_many_answers_every_box_like_at(pair):
+    a, b = pair
+    a.sprite("solid").position = (30, 20)
+    b.sprite("solid").position = (35, 24)  # overlap (35..37, 24..27)
+    b.sprite("dot").position = (100, 50)
+    a.sprite("dot").position = (100, 50)
+    q = a.collides_with(b)
+    rng = np.random.default_rng(7)
+    boxes = np.column_stack(
+        (
+            rng.integers(-40, 680, 400),  # x, y: some wholly off-screen
+            rng.integers(-40, 400, 400),
+            rng.integers(-5, 90, 400),  # w, h: some empty or negative
+            rng.integers(-5, 60, 400),
+        )
+    )
+    boxes[:2] = ((34, 23, 2, 2), (101, 50, 1, 1))  # one hit, one near miss
+    hits = q.at_many(boxes)
+    assert hits.dtype == np.bool_ and hits[0] and not hits[1]
+    assert hits.tolist() == [q.at(*box) for box in boxes.tolist()]
+    assert q.at_many(np.empty((0, 4), dtype=np.int32)).shape == (0,)
+
+
 def test_queries_reuse_retained_composition(pair):
     a, b = pair
     a.sprite("solid").position = (0, 0)
@@ -123,6 +146,157 @@ def test_pool_named_rects_stamp_named_planes(pair):
     ).at() is True
 
 
+def test_pool_hits_name_the_instances_that_overlap(pair):
+    bullets, player = pair
+    pool = bullets.z(0).pool(("dot",) * 40)
+    player.sprite("solid").position = (200, 100)
+    with pool.edit():
+        pool.positions[:] = np.arange(40)[:, None] * (9, 3)  # a diagonal
+        pool.positions[[5, 31]] = ((207.9, 107), (200, 100))  # corners
+        pool.positions[12] = (208, 100)  # one pixel right of the block
+        pool.flip_x[5] = True  # the dot mirrors to (200, 107): still in
+        pool.visible[31] = False
+    assert pool.hits(player).tolist() == [5]
+
+    with pool.edit():
+        pool.visible[31] = True
+        pool.positions[5] = (300, 300)
+    assert pool.hits(player).tolist() == [31]
+    with pool.edit():
+        pool.collide[31] = False
+    assert len(pool.hits(player)) == 0
+
+    rich = bullets.z(1).pool(("solid",) * 3)
+    with rich.edit():
+        rich.positions[:] = ((0, 0), (197, 95), (195, 100))
+    # Each instance's hit box against the player's hurt box [202, 206).
+    assert rich.hits(player, mine="hit", theirs="hurt").tolist() == [1, 2]
+    planes, against = bullets.collides_with(player, "hit", "hurt").sides()
+    assert planes == ("hit",)
+    assert np.array_equal(against, player.collision_mask_for(("hurt",)))
+    with pytest.raises(KeyError):
+        rich.hits(player, mine="nope")
+
+
+def _brute_pairs(mine, theirs, offset=(0, 0)):
+    a, b = mine.grid.boxes, theirs.grid.boxes.copy()
+    b[:, 0::2] += offset[0]
+    b[:, 1::2] += offset[1]
+    meets = (a[:, None, 0] < b[None, :, 2]) & (a[:, None, 2] > b[None, :, 0])
+    meets &= (a[:, None, 1] < b[None, :, 3]) & (a[:, None, 3] > b[None, :, 1])
+    meets &= (mine.visible & mine.collide)[:, None]
+    meets &= (theirs.visible & theirs.collide)[None, :]
+    if mine is theirs:
+        meets &= np.triu(meets, 1)
+    return [pair.tolist() for pair in np.nonzero(meets)]
+
+
+def test_pool_pairs_match_every_box_against_every_box(pair):
+    front, back = pair
+    rng = np.random.default_rng(3)
+    enemy = front.z(0).pool(("dot", "solid") * 300)
+    shots = back.z(0).pool(("solid",) * 400)
+    for pool in (enemy, shots):
+        with pool.edit():
+            pool.positions[:] = rng.uniform(-80, 300, (len(pool), 2))
+            pool.rotation[:] = rng.integers(0, 4, len(pool))
+            pool.flip_x[:] = rng.random(len(pool)) < 0.5
+            pool.visible[:] = rng.random(len(pool)) < 0.9
+            pool.collide[:] = rng.random(len(pool)) < 0.9
+
+    i, j = enemy.pairs(shots)
+    assert len(i) and [i.tolist(), j.tolist()] == _brute_pairs(enemy, shots)
+    i, j = enemy.pairs(enemy)
+    assert len(i) and [i.tolist(), j.tolist()] == _brute_pairs(enemy, enemy)
+    # An edit refiles the grid; a camera shifts the other layer's boxes.
+    with enemy.edit():
+        enemy.positions[:] += 37.5
+    back.camera = (11.2, -6)
+    i, j = enemy.pairs(shots)
+    assert [i.tolist(), j.tolist()] == _brute_pairs(enemy, shots, (-11, 6))
+
+
+def test_grid_query_tests_wide_boxes_directly(pair):
+    layer, _ = pair
+    rng = np.random.default_rng(5)
+    pool = layer.z(0).pool(("dot", "solid") * 20)
+    with pool.edit():
+        pool.positions[:] = rng.uniform(-500, 500, (len(pool), 2))
+    boxes = pool.grid.boxes
+    # A world-sized box covers ~10^18 cells: expanded per cell, it could
+    # never be answered. Between two narrow ones, it still pairs in order.
+    queries = np.array(
+        [(-8, -8, 8, 8), (-(1 << 30), -(1 << 30), 1 << 30, 1 << 30), (0, 0, 300, 2)]
+    )
+    candidates = rng.random(len(pool)) < 0.7
+    rows, found = pool.grid.query(queries, candidates)
+
+    meets = boxes[None, :, 0] < queries[:, None, 2]
+    meets &= boxes[None, :, 2] > queries[:, None, 0]
+    meets &= boxes[None, :, 1] < queries[:, None, 3]
+    meets &= boxes[None, :, 3] > queries[:, None, 1]
+    meets &= candidates[None, :]
+    assert [rows.tolist(), found.tolist()] == [p.tolist() for p in np.nonzero(meets)]
+    assert (rows == 1).sum() == candidates.sum()
+
+
+def test_query_rect_finds_sprites_and_pool_instances(pair):
+    layer, _ = pair
+    block = layer.sprite("solid")
+    block.position = (40, 40)
+    layer.sprite("dot").position = (100, 100)
+    pool = layer.z(1).pool(("dot",) * 5)
+    with pool.edit():
+        pool.positions[:] = ((0, 0), (47, 47), (48, 40), (30, 30), (44.9, 39))
+        pool.visible[3] = False
+    sprites, pools = layer.query_rect(40, 40, 8, 8)
+    assert sprites == (block,)
+    assert pools[pool].tolist() == [1, 4]
+    block.visible = False
+    assert layer.query_rect(40, 40, 8, 8)[0] == ()
+    assert layer.query_rect(500, 500, 8, 8) == ((), {})
+
+
+def test_moves_restamp_incrementally_to_the_full_rebuild_bits(pair, monkeypatch):
+    layer, _ = pair
+    rng = np.random.default_rng(11)
+    sprites = [layer.sprite(("solid", "dot")[i % 2]) for i in range(60)]
+    for s in sprites:
+        s.position = tuple(rng.uniform(-10, 200, 2))
+    pool = layer.z(1).pool(("solid", "dot") * 40)
+    with pool.edit():
+        pool.positions[:] = rng.uniform(-10, 200, (80, 2))
+    planes = (None, ("hit",), ("hurt",), ("hit", "hurt"))
+    layer.collision_mask  # the first stamp is always whole
+
+    full = []
+    original = layer._collision._restamp_all
+    monkeypatch.setattr(
+        layer._collision, "_restamp_all", lambda: full.append(1) or original()
+    )
+    for step in range(40):
+        # Overlapping stamps share words: clearing one must not lose another.
+        s = sprites[step % 7]
+        s.position = sprites[step % 5 + 7].position
+        s.flip_x = not s.flip_x
+        with pool.edit():
+            pool.positions[step] = pool.positions[step + 1] + 0.5
+            pool.rotation[step + 2] += 1
+            pool.visible[step + 3] = not pool.visible[step + 3]
+        incremental = [layer.collision_mask_for(p).copy() for p in planes]
+        layer._collision.invalidate()
+        layer._collision_dirty = True
+        rebuilt = [layer.collision_mask_for(p) for p in planes]
+        for mask, expected in zip(incremental, rebuilt):
+            assert np.array_equal(mask, expected)
+    assert len(full) == 40  # once per step: only the forced rebuilds
+
+    with pool.edit():
+        pool.positions[:] += 3  # most of the layer: rebuilt whole
+    layer.collision_mask
+    assert len(full) == 41
+
+
 def test_source_pixel_edit_invalidates_cached_stamp_pattern(pair):
     engine, _ = pair
     engine.sprite("dot").position = (3, 9)
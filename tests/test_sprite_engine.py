@@ -142,6 +142,24 @@ def test_palette_registers(engine):
         engine.remove(blue)
 
 
+def test_palette_bank_rows_follow_palette_identity():
+    # Which table a quad reads is its bank row, so the row must be stable
+    # for one Palette object, distinct between live ones, and handed on
+    # once its palette is gone -- all without a GL context.
+    import gc
+
+    from blitspersecond.colors import Palette
+    from blitspersecond.graphics.internal import PaletteBank
+
+    a, b = Palette(), Palette()  # equal tables, two objects
+    row_a, row_b = PaletteBank.row(a), PaletteBank.row(b)
+    assert row_a != row_b
+    assert PaletteBank.row(a) == row_a
+    del b
+    gc.collect()
+    assert PaletteBank.row(Palette()) == row_b
+
+
 def test_colour_registers_clamp(engine):
     s = engine.sprite()
     try:
@@ -187,6 +205,112 @@ def test_setters_mark_engine_dirty(engine):
         engine.remove(s)
 
 
+def test_moves_keep_the_plan_and_plan_changes_replan():
+    # A move reprojects one entry into its slots; anything that can change
+    # the run plan (pose, visibility, colour, palette) re-walks everything.
+    engine = SpriteEngine(SpriteSheet.load(str(BULLETS)))
+    s = engine.sprite("blue")
+    pool = engine.z(1).pool(("pink",))
+    for move in (
+        lambda: setattr(s, "x", 6),
+        lambda: setattr(s, "position", (1, 2)),
+        lambda: setattr(s, "flip_x", True),
+        lambda: setattr(s, "rotation", 1),
+    ):
+        engine._dirty = engine._replan = False
+        engine._moved.clear()
+        move()
+        assert engine._dirty is True and engine._replan is False
+        assert list(engine._moved) == [s]
+    engine._moved.clear()
+    with pool.edit():
+        pool.positions[0] = (3, 4)
+    assert list(engine._moved) == [pool] and engine._replan is False
+    for change in (
+        lambda: setattr(s, "assembly", "pink"),
+        lambda: setattr(s, "visible", False),
+        lambda: setattr(s, "alpha", 0.5),
+        lambda: setattr(pool, "color", (1, 1, 1, 0.5)),
+    ):
+        engine._replan = False
+        change()
+        assert engine._replan is True
+
+
+def test_vertex_stream_copies_only_the_bytes_each_region_missed(monkeypatch):
+    import ctypes
+    from types import SimpleNamespace
+
+    import numpy as np
+    import pyglet
+
+    from blitspersecond.graphics.internal import VertexStream, vertex_stream
+
+    memory = ctypes.create_string_buffer(3 * vertex_stream._ALIGN)
+    for name in (
+        "glGenBuffers",
+        "glBindBuffer",
+        "glBufferStorage",
+        "glFenceSync",
+        "glDeleteSync",
+        "glDeleteBuffers",
+    ):
+        monkeypatch.setattr(vertex_stream, name, lambda *args: None)
+    monkeypatch.setattr(
+        vertex_stream,
+        "glMapBufferRange",
+        lambda *args: ctypes.cast(memory, ctypes.c_void_p),
+    )
+    info = SimpleNamespace(have_version=lambda *version: True)
+    monkeypatch.setattr(
+        pyglet.gl, "current_context", SimpleNamespace(get_info=lambda: info)
+    )
+    copied = []
+    memmove = ctypes.memmove
+
+    def counting(dst, src, count):
+        copied.append(count)
+        return memmove(dst, src, count)
+
+    monkeypatch.setattr(ctypes, "memmove", counting)
+
+    stream = VertexStream(200)
+    data = np.zeros(50, dtype=np.float32)
+    per_frame = []
+    for frame in range(8):
+        data[frame] = frame + 1
+        copied.clear()
+        stream.write_ranges(data, [(frame * 4, frame * 4 + 4)])
+        per_frame.append(sum(copied))
+        region = memory.raw[stream.offset : stream.offset + 200]
+        assert region == data.tobytes()
+    # Each region is whole once, then only takes the last three frames'
+    # four-byte spans.
+    assert per_frame == [200, 200, 200, 12, 12, 12, 12, 12]
+
+    copied.clear()
+    stream.write(data)
+    stream.write_ranges(data, [(0, 4)])
+    assert copied == [200, 200]  # after write() the others lag by everything
+
+
+def test_camera_pans_inside_the_culling_margin_without_replanning():
+    engine = SpriteEngine(SpriteSheet.load(str(BULLETS)))
+    s = engine.sprite("blue")
+    engine._window = (-64, -64, 704, 424)  # as planned at camera (0, 0)
+    engine._replan = False
+    engine.camera = (10.5, -20)
+    assert engine._replan is False
+    assert engine._collision_dirty is True  # planes are screen-space
+    s.position = (650, 100)
+    assert engine._in_window(s)
+    s.position = (720, 100)
+    assert not engine._in_window(s)
+    engine.camera = (100, 0)  # the screen would leave the window
+    assert engine._replan is True
+    assert engine.camera == (100.0, 0.0)
+
+
 def test_drawable_metadata_face(engine):
     # The primary (first) tileset is the engine's face for the compositor.
     assert engine.indexed is True
@@ -8,8 +8,11 @@ generated package proves every validation error fires, loudly and named.
 
 import json
 import sys
+import threading
+from concurrent.futures import CancelledError, Future
 from pathlib import Path
 
+import numpy as np
 import pytest
 from PIL import Image
 
@@ -18,6 +21,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from blitspersecond.common import Location, Rect
 from blitspersecond.resources import (
     Palette,
+    Preload,
     ResourceManager,
     SpriteSheetSpec,
     load_sprite_sheet_spec,
@@ -94,6 +98,179 @@ def sheet_dir(tmp_path: Path) -> Path:
     return tmp_path
 
 
+def test_preload_decodes_in_background_and_fills_the_cache(sheet_dir):
+    (sheet_dir / "pack.sprite.json").write_text(json.dumps(_package()))
+    manager = ResourceManager()
+    loading = manager.preload(
+        [str(sheet_dir / "pack.sprite.json"), str(sheet_dir / "sheet.png")]
+    )
+    sheet, image = loading.result(timeout=10)
+
+    assert loading.done and loading.progress == 1.0 and not loading.errors
+    assert manager.sprite_sheet(str(sheet_dir / "pack.sprite.json")) is sheet
+    assert manager.image(str(sheet_dir / "sheet.png")) is image
+
+
+def test_preload_shares_in_flight_decodes(sheet_dir, monkeypatch):
+    import blitspersecond.resources.image as image_module
+
+    calls = []
+    gate = threading.Event()
+    real = image_module.load_image_spec
+
+    def slow(filename):
+        calls.append(filename)
+        gate.wait(10)
+        return real(filename)
+
+    monkeypatch.setattr(image_module, "load_image_spec", slow)
+    path = str(sheet_dir / "sheet.png")
+    missing = str(sheet_dir / "missing.png")
+    loading = ResourceManager().preload([path, path, missing])
+    again = ResourceManager().preload([path])
+    assert not loading.done and loading.progress < 1.0
+    gate.set()
+
+    assert ResourceManager().image(path) is again.result(timeout=10)[0]
+    with pytest.raises(FileNotFoundError):
+        loading.result(timeout=10)
+    assert [name for name, _ in loading.errors] == [missing]
+    assert calls.count(path) == 1
+
+
+def test_preload_errors_report_only_real_failures():
+    ok, failed, cancelled, running = Future(), Future(), Future(), Future()
+    ok.set_result("spec")
+    failed.set_exception(OSError("gone"))
+    cancelled.cancel()
+    loading = Preload("abcd", [ok, failed, cancelled, running])
+
+    errors = loading.errors
+    assert [name for name, _ in errors] == ["b", "c"]
+    assert isinstance(errors[0][1], OSError)
+    assert isinstance(errors[1][1], CancelledError)
+
+
+@pytest.fixture()
+def empty_manager():
+    """The process-wide ResourceManager, emptied for one test and then put
+    back exactly as it was -- other tests' cached specs included."""
+    manager = ResourceManager()
+    saved = dict(vars(manager))
+    saved.pop("_pool")  # a worker pool started meanwhile stays
+    manager.reset(are_you_sure=True)
+    try:
+        yield manager
+    finally:
+        vars(manager).update(saved)
+
+
+def test_memory_budget_evicts_least_recently_used(sheet_dir, empty_manager):
+    manager = empty_manager
+    paths = []
+    for name in "abcd":
+        _write_sheet_png(sheet_dir / f"{name}.png")
+        paths.append(str(sheet_dir / f"{name}.png"))
+    a, b, c, d = paths
+    manager.budget = 2 * 256
+
+    manager.image(a)
+    manager.image(b)
+    manager.image(a)  # a is now the most recently used
+    manager.image(c)
+    stats = manager.stats
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 3, 1)
+    assert (stats.bytes, stats.entries, stats.budget) == (2 * 256, 2, 2 * 256)
+    with pytest.raises(KeyError):
+        manager.remove(b)
+
+    manager.pin(a)
+    manager.image(d)  # c goes, not the pinned a
+    with pytest.raises(KeyError):
+        manager.remove(c)
+    manager.unpin(a)
+    manager.remove(d)
+    assert manager.stats.bytes == 256
+
+
+def test_reset_drops_in_flight_decodes(sheet_dir, monkeypatch, empty_manager):
+    import blitspersecond.resources.image as image_module
+
+    started, gate = threading.Event(), threading.Event()
+    real = image_module.load_image_spec
+
+    def slow(filename):
+        started.set()
+        gate.wait(10)
+        return real(filename)
+
+    monkeypatch.setattr(image_module, "load_image_spec", slow)
+    path = str(sheet_dir / "sheet.png")
+    loading = empty_manager.preload([path])
+    assert started.wait(10)
+
+    empty_manager.reset(are_you_sure=True)
+    assert not empty_manager._pending
+    gate.set()
+
+    assert loading.result(timeout=10)[0].size == (16, 16)
+    assert len(empty_manager) == 0 and empty_manager.stats.bytes == 0
+
+
+def test_disk_cache_maps_decoded_specs_back(sheet_dir):
+    import wave
+
+    from blitspersecond.resources.disk_cache import disk_cached
+    from blitspersecond.resources.image import load_image_spec
+    from blitspersecond.resources.sound import load_sound_spec
+
+    cache = str(sheet_dir / "cache")
+    wav = sheet_dir / "blip.wav"
+    with wave.open(str(wav), "wb") as out:
+        out.setnchannels(2)
+        out.setsampwidth(2)
+        out.setframerate(22050)
+        out.writeframes(np.arange(-64, 64, dtype="<i2").tobytes())
+    decodes = []
+
+    def counting(load):
+        return lambda filename: decodes.append(filename) or load(filename)
+
+    png = str(sheet_dir / "sheet.png")
+    fresh = disk_cached("image", counting(load_image_spec), cache)(png)
+    again = disk_cached("image", counting(load_image_spec), cache)(png)
+    assert decodes == [png]
+    assert isinstance(again.data.base, np.memmap)  # mapped, not copied
+    assert np.array_equal(again.data, fresh.data)
+    assert [again.palette[i] for i in range(256)] == [
+        fresh.palette[i] for i in range(256)
+    ]
+    assert (again.mode, again.size, again.transparency_index) == (
+        fresh.mode, fresh.size, fresh.transparency_index,
+    )
+
+    sound = disk_cached("sound", counting(load_sound_spec), cache)
+    first, second = sound(str(wav)), sound(str(wav))
+    assert decodes.count(str(wav)) == 1
+    assert np.array_equal(second.data, first.data) and second.sr == 22050
+
+    # Any edit changes mtime/size: the entry misses and the file re-decodes.
+    _write_sheet_png(sheet_dir / "sheet.png", mode="RGB")
+    assert disk_cached("image", counting(load_image_spec), cache)(png).mode == "RGB"
+    assert decodes.count(png) == 2
+
+
+def test_resource_manager_reads_through_its_cache_dir(sheet_dir, monkeypatch):
+    manager = ResourceManager()
+    monkeypatch.setattr(manager, "cache_dir", str(sheet_dir / "cache"))
+    png = str(sheet_dir / "sheet.png")
+    manager.image(png)
+    manager.remove(png)
+
+    assert isinstance(manager.image(png).data.base, np.memmap)
+    manager.remove(png)
+
+
 def test_dummy_package_loads(sheet_dir):
     spec = _load(sheet_dir, _package())
     assert spec.tilesets["main"].tiles["b"] == Rect(8, 0, 8, 8)
@@ -1,19 +1,31 @@
 """TileEngine's GL-free construction and atlas invariants."""
 
-from types import SimpleNamespace
+import json
 
 import numpy as np
 import pytest
+from pyglet.image import TextureRegion
 
+from blitspersecond.display.internal.layer_cache import plan_runs
 from blitspersecond.graphics import PixelBuffer, TileAtlas, TileEngine, TileFlags
 from blitspersecond.graphics.tile.collision import (
     CollisionMask,
     _PATTERNS,
     _patterns,
 )
-from blitspersecond.graphics.tile.batch import TileBatch
+from blitspersecond.graphics.tile.batch import TileBatch, _atlas_quads
 from blitspersecond.graphics.tile.tile_layer import _TILE_DTYPE
-from blitspersecond.resources import ImageSpec
+from blitspersecond.resources import (
+    TILE_MAP_DTYPE,
+    ChunkedPlane,
+    ImageSpec,
+    Palette,
+    ResourceManager,
+    TileMapSpec,
+    TileSetSpec,
+    convert_tile_map,
+    load_chunked_tile_map_spec,
+)
 
 
 def _buffer(size=(32, 32)) -> PixelBuffer:
@@ -143,6 +155,25 @@ def test_rectangular_bulk_restamp_matches_every_orientation(flags):
     assert collision.unpacked.sum() == expected.sum()
 
 
+def test_bulk_restamp_accumulates_placements_sharing_words():
+    # Neighbouring placements land in the same mask words: every one of
+    # them must survive the scatter, not just the last write.
+    atlas = _asymmetric_rectangular_atlas()
+    expected = _rendered_orientation(atlas.buffer.mask, TileFlags(0))
+    eh, ew = expected.shape
+    tiles = np.zeros(6, dtype=_TILE_DTYPE)
+    tiles["target"] = [(x, 20 + x % 3) for x in (1, 3, 29, 31, 33, 60)]
+    tiles["size"] = (ew, eh)
+    collision = CollisionMask(atlas)
+
+    collision.restamp(tiles, (0, 0))
+
+    reference = np.zeros_like(collision.unpacked)
+    for x, y in tiles["target"]:
+        reference[y : y + eh, x : x + ew] |= expected
+    assert np.array_equal(collision.unpacked, reference)
+
+
 def test_oriented_patterns_are_lazy_cached_and_buffer_edits_invalidate():
     atlas = _asymmetric_atlas()
 
@@ -293,15 +324,49 @@ def test_tile_batch_compacts_uv_rows_without_allocating_a_new_mirror():
 
 
 class _FakeTexture:
-    def get_region(self, *args):
-        return SimpleNamespace(tex_coords=np.zeros(12, dtype=np.float32))
+    """The slice of pyglet's Texture that UV resolution reads -- GL-free."""
+
+    tex_coords = (0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0, 0.0)
+    target = 0
+    id = 0
+    images = 1
+
+    def __init__(self, width=8, height=8):
+        self.width = width
+        self.height = height
+
+    def get_region(self, x, y, width, height):
+        return TextureRegion(x, y, 0, width, height, self)
+
+
+class _MirrorBatch(_FakeBatch):
+    """A TileBatch with its CPU UV mirror but no GL buffers."""
 
+    set_quad = TileBatch.set_quad
+    set_quads = TileBatch.set_quads
 
-def _headless_engine(monkeypatch, atlas, *, collidable=False):
+    def __init__(self):
+        super().__init__()
+        self._uv = np.zeros((0, 4, 3), dtype=np.float32)
+        self._uv_scratch = np.zeros((0, 4, 3), dtype=np.float32)
+        self._uv_dirty = False
+
+    def resize(self, capacity):
+        grown = np.zeros((capacity, 4, 3), dtype=np.float32)
+        grown[: len(self._uv)] = self._uv
+        self._uv = grown
+        self._uv_scratch = np.zeros_like(grown)
+
+    def compact(self, indices):
+        super().compact(indices)
+        TileBatch.compact(self, indices)
+
+
+def _headless_engine(monkeypatch, atlas, *, collidable=False, batch=None):
     engine = TileEngine(atlas, collidable=collidable)
     engine._shader = object()
-    engine._tilebatch = _FakeBatch()
-    atlas.buffer._texture = _FakeTexture()
+    engine._tilebatch = _FakeBatch() if batch is None else batch
+    atlas.buffer._texture = _FakeTexture(*atlas.buffer.size)
     monkeypatch.setattr(engine, "_ensure_built", lambda: None)
     return engine
 
@@ -420,3 +485,498 @@ def test_collidable_border_stamp_enters_with_camera(monkeypatch):
         engine.collision_mask_unpacked[10:18, 632:640],
         expected,
     )
+
+
+def test_atlas_quad_table_matches_texture_regions():
+    atlas = TileAtlas(_buffer((24, 16)), tile_size=(8, 4))
+    atlas.buffer._texture = _FakeTexture(24, 16)
+
+    sources, uvs = _atlas_quads(atlas)
+
+    for index in range(len(atlas)):
+        tile = atlas.tile(index)
+        assert tuple(sources[index]) == (tile.source.x, tile.source.y)
+        expected = np.asarray(atlas.region(index).tex_coords, dtype=np.float32)
+        assert np.array_equal(uvs[index], expected.reshape(4, 3))
+    assert _atlas_quads(atlas)[1] is uvs
+
+
+def _plane(tiles, flags):
+    plane = np.zeros(np.shape(tiles), dtype=TILE_MAP_DTYPE)
+    plane["tile"] = tiles
+    plane["flags"] = flags
+    return plane
+
+
+@pytest.mark.parametrize("collidable", [False, True])
+def test_plane_blit_matches_per_cell_blits(monkeypatch, collidable):
+    pixels = np.arange(16 * 8, dtype=np.uint8).reshape(8, 16) % 3
+    atlas = TileAtlas(
+        PixelBuffer(ImageSpec(size=(16, 8), mode="P", data=pixels)),
+        tile_size=(8, 4),
+    )
+    plane = _plane(
+        [[0, -1, 3], [2, 1, -1], [-1, 3, 0]],
+        [[0, 0, 5], [7, 3, 0], [0, 2, 6]],
+    )
+    bulk = _headless_engine(
+        monkeypatch, atlas, collidable=collidable, batch=_MirrorBatch()
+    )
+    bulk.scroll = (3, 2)
+    scalar = _headless_engine(
+        monkeypatch, atlas, collidable=collidable, batch=_MirrorBatch()
+    )
+    scalar.scroll = (3, 2)
+
+    bulk.blit(plane, 16, 24)
+    for row, col in np.argwhere(plane["tile"] >= 0):
+        cell = plane[row, col]
+        scalar.blit(
+            int(cell["tile"]),
+            16 + int(col) * 8,
+            24 + int(row) * 4,
+            TileFlags(int(cell["flags"])),
+        )
+
+    n = scalar._ntiles
+    assert bulk._ntiles == n == 6
+    assert np.array_equal(bulk._tiles[:n], scalar._tiles[:n])
+    assert np.array_equal(bulk._tilebatch._uv[:n], scalar._tilebatch._uv[:n])
+    if collidable:
+        assert bulk.collision_mask_unpacked.any()
+        assert np.array_equal(
+            bulk.collision_mask_unpacked, scalar.collision_mask_unpacked
+        )
+
+
+def test_plane_blit_validates_every_cell_before_writing(monkeypatch):
+    engine = _headless_engine(
+        monkeypatch,
+        TileAtlas(_buffer((16, 8)), tile_size=(8, 8)),
+        batch=_MirrorBatch(),
+    )
+
+    with pytest.raises(IndexError, match="out of range"):
+        engine.blit(_plane([[0, 1, 2]], 0), 0, 0)
+    with pytest.raises(ValueError, match="outside the bounded drawable area"):
+        engine.blit(_plane([[0, 1, 1]], 0), 632, 0)
+
+    assert engine._ntiles == 0
+
+
+def _world_cells(engine):
+    """Every live stamp as a world-space (x, y, tile source, flags) tuple."""
+    n = engine._ntiles
+    tiles = engine._tiles[:n]
+    tw, th = engine.tile_size
+    cx, cy = engine._coarse
+    return sorted(
+        (
+            int(row["target"][0]) + cx * tw,
+            int(row["target"][1]) + cy * th,
+            tuple(int(v) for v in row["source"]),
+            int(row["flags"]),
+        )
+        for row in tiles
+    )
+
+
+def _streaming_map(rows=120, cols=200):
+    r, c = np.indices((rows, cols))
+    tiles = (r * 7 + c * 3) % 4
+    tiles[(r + c) % 5 == 0] = -1
+    return _plane(tiles, (r + c) % 8)
+
+
+def test_follow_streams_only_exposed_strips(monkeypatch):
+    atlas = TileAtlas(_buffer((16, 16)), tile_size=(8, 8))
+    plane = _streaming_map()
+    engine = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+
+    engine.follow(plane, -40, 24)
+    path = [(3, 0), (8, 0), (30, 5), (30, 17), (-2, 9), (97.5, 60.25), (96, 61)]
+    for camera in path:
+        engine.scroll = camera
+        fresh = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+        fresh.scroll = camera
+        fresh.follow(plane, -40, 24)
+
+        assert _world_cells(engine) == _world_cells(fresh)
+        assert np.array_equal(
+            engine._tilebatch._uv[: engine._ntiles][
+                np.lexsort(engine._tiles["target"][: engine._ntiles].T)
+            ],
+            fresh._tilebatch._uv[: fresh._ntiles][
+                np.lexsort(fresh._tiles["target"][: fresh._ntiles].T)
+            ],
+        )
+
+
+def test_one_cell_step_stamps_one_column_strip(monkeypatch):
+    atlas = TileAtlas(_buffer((16, 16)), tile_size=(8, 8))
+    plane = _plane(np.zeros((100, 200), dtype=np.int32), 0)
+    engine = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+    engine.scroll = (80, 80)
+    engine.follow(plane)
+    before = engine._ntiles
+    stamped = []
+    blit_cells = engine._blit_cells
+    monkeypatch.setattr(
+        engine,
+        "_blit_cells",
+        lambda tiles, *args, **kwargs: (
+            stamped.append(len(tiles)),
+            blit_cells(tiles, *args, **kwargs),
+        ),
+    )
+
+    engine.scroll = (88, 80)
+
+    # 82 x 47 bordered cells at a cell-aligned camera: one 47-cell column
+    # leaves on the left and exactly one enters on the right.
+    assert before == 82 * 47
+    assert stamped == [47]
+    assert engine._ntiles == before
+    assert len(engine._tilebatch.compactions[0]) == before - 47
+
+
+def test_follow_none_stops_streaming(monkeypatch):
+    atlas = TileAtlas(_buffer((16, 16)), tile_size=(8, 8))
+    engine = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+    engine.follow(_streaming_map())
+    engine.follow(None)
+    stamped = engine._ntiles
+
+    engine.scroll = (80, 0)
+
+    assert 0 < engine._ntiles < stamped
+
+
+@pytest.mark.parametrize("tile_size", [(8, 4), (4, 8), (8, 32)])
+def test_follow_streams_oriented_rectangular_tiles(monkeypatch, tile_size):
+    atlas = TileAtlas(_buffer((32, 64)), tile_size=tile_size)
+    plane = _streaming_map()
+    tw, th = tile_size
+    engine = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+
+    engine.follow(plane, -40, 24)
+    rng = np.random.default_rng(7)
+    camera = np.zeros(2)
+    for _ in range(40):
+        camera += rng.normal(0, 12, 2)
+        engine.scroll = tuple(camera)
+        # Exactly the cells whose oriented stamp meets the bordered plane:
+        # transposed cells reach th across and tw down.
+        cx, cy = engine._coarse
+        rows, cols = np.nonzero(plane["tile"] >= 0)
+        flags = plane["flags"][rows, cols]
+        xs, ys = -40 + cols * tw, 24 + rows * th
+        _, _, outside = engine._outside(flags, xs - cx * tw, ys - cy * th)
+        expected = sorted(
+            zip(xs[~outside].tolist(), ys[~outside].tolist(), flags[~outside].tolist())
+        )
+        assert [(x, y, f) for x, y, _, f in _world_cells(engine)] == expected
+
+
+def test_follow_again_never_duplicates_stamps(monkeypatch):
+    atlas = TileAtlas(_buffer((16, 16)), tile_size=(8, 8))
+    plane = _streaming_map()
+    engine = _headless_engine(monkeypatch, atlas, collidable=True, batch=_MirrorBatch())
+    engine.blit(0, 16, 16)
+    engine.follow(plane, -40, 24)
+    engine.scroll = (30, 5)
+
+    engine.follow(plane, -40, 24)
+    engine.follow(None)
+    engine.scroll = (97.5, 60.25)
+    engine.follow(plane, -40, 24)
+
+    fresh = _headless_engine(monkeypatch, atlas, collidable=True, batch=_MirrorBatch())
+    fresh.scroll = (97.5, 60.25)
+    fresh.follow(plane, -40, 24)
+    cells = _world_cells(engine)
+    assert len(set(cells)) == len(cells) == fresh._ntiles
+    assert cells == _world_cells(fresh)
+    assert np.array_equal(engine.collision_mask, fresh.collision_mask)
+
+    # Another plane takes the stream's cells back, never blit() stamps.
+    engine.scroll = (0, 0)
+    engine.blit(1, 16, 16)
+    engine.follow(_plane(np.full((1, 1), -1), 0))
+    assert _world_cells(engine) == [(16, 16, (8, 0), 0)]
+
+
+def test_follow_rejects_non_plane(monkeypatch):
+    atlas = TileAtlas(_buffer((16, 16)), tile_size=(8, 8))
+    engine = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+
+    with pytest.raises(TypeError, match="tile/flags array"):
+        engine.follow(np.zeros((4, 4), dtype=np.int32))
+
+
+def _chunked(tmp_path, planes, chunk=16):
+    rows, cols = planes[0].shape
+    spec = TileMapSpec(
+        width=cols,
+        height=rows,
+        tilewidth=8,
+        tileheight=8,
+        tilesets=(
+            TileSetSpec(
+                name="ground",
+                firstgid=1,
+                image=str(tmp_path / "art" / "ground.png"),
+                tilewidth=8,
+                tileheight=8,
+                columns=2,
+                tilecount=4,
+            ),
+        ),
+        layers=tuple((f"layer{i}", plane) for i, plane in enumerate(planes)),
+    )
+    path = convert_tile_map(spec, str(tmp_path / "world.bpsmap"), chunk=chunk)
+    return spec, ResourceManager().tile_map(path)
+
+
+def test_chunked_map_serves_the_same_windows(tmp_path):
+    plane = _streaming_map(70, 90)
+    blank = _plane(np.full((70, 90), -1), 0)
+    blank[40:45, 50:52] = plane[40:45, 50:52]
+    spec, chunked = _chunked(tmp_path, [plane, blank])
+
+    assert chunked.tilesets[0].image == spec.tilesets[0].image
+    assert [name for name, _ in chunked.layers] == ["layer0", "layer1"]
+    first, second = (gids for _, gids in chunked.layers)
+    assert isinstance(first, ChunkedPlane)
+    assert first.shape == (70, 90) and first.dtype == TILE_MAP_DTYPE
+    for window in [
+        np.s_[:, :],
+        np.s_[3:40, 17:66],
+        np.s_[60:, 80:200],
+        np.s_[-5:, :7],
+        np.s_[10:10, 4:9],
+    ]:
+        assert np.array_equal(first[window], plane[window])
+        assert np.array_equal(second[window], blank[window])
+    assert first[41, -3] == plane[41, -3]
+    assert np.array_equal(second[42, 40:60], blank[42, 40:60])
+    # 5x6 chunks per layer; the mostly-blank layer stores exactly one.
+    assert second._slots.shape[0] == 5 * 6 + 1
+    with pytest.raises(IndexError, match="unit step"):
+        first[::2, :]
+
+
+def test_follow_streams_a_chunked_plane(monkeypatch, tmp_path):
+    atlas = TileAtlas(_buffer((16, 16)), tile_size=(8, 8))
+    plane = _streaming_map()
+    _, chunked = _chunked(tmp_path, [plane], chunk=32)
+    streamed = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+    dense = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+
+    streamed.follow(chunked.layers[0][1], -40, 24)
+    dense.follow(plane, -40, 24)
+    for camera in [(30, 5), (97.5, 60.25), (-2, 9)]:
+        streamed.scroll = dense.scroll = camera
+        assert _world_cells(streamed) == _world_cells(dense)
+
+
+def test_blit_stamps_a_chunked_plane_whole(monkeypatch, tmp_path):
+    atlas = TileAtlas(_buffer((16, 16)), tile_size=(8, 8))
+    plane = _streaming_map(20, 30)
+    _, chunked = _chunked(tmp_path, [plane], chunk=8)
+    streamed = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+    dense = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+
+    streamed.blit(chunked.layers[0][1], 8, 16)
+    dense.blit(plane, 8, 16)
+
+    assert _world_cells(streamed) == _world_cells(dense)
+    assert np.array_equal(np.stack(list(chunked.layers[0][1])), plane)
+    with pytest.raises(TypeError, match="per-cell TileFlags"):
+        streamed.blit(chunked.layers[0][1], 0, 0, TileFlags.FLIP_H)
+
+
+@pytest.mark.parametrize(
+    "plane",
+    [
+        np.zeros(4, dtype=TILE_MAP_DTYPE),
+        np.zeros((2, 2), dtype=np.int32),
+    ],
+)
+def test_blit_rejects_a_plane_of_the_wrong_shape_or_dtype(monkeypatch, plane):
+    atlas = TileAtlas(_buffer((16, 16)), tile_size=(8, 8))
+    engine = _headless_engine(monkeypatch, atlas, batch=_MirrorBatch())
+    with pytest.raises(TypeError, match="two-dimensional TileMap"):
+        engine.blit(plane, 0, 0)
+
+
+def test_truncated_chunked_map_names_the_file(tmp_path):
+    _chunked(tmp_path, [_streaming_map(20, 30)], chunk=8)
+    path = tmp_path / "world.bpsmap"
+    path.write_bytes(path.read_bytes()[:-64])
+
+    with pytest.raises(ValueError, match="world.bpsmap.*cannot read"):
+        load_chunked_tile_map_spec(str(path))
+
+
+@pytest.mark.parametrize("missing", ["chunk", "columns"])
+def test_chunked_map_header_names_a_missing_key(tmp_path, missing):
+    _chunked(tmp_path, [_streaming_map(4, 4)])
+    path = tmp_path / "world.bpsmap"
+    data = path.read_bytes()
+    length = int(np.frombuffer(data[8:12], dtype="<u4")[0])
+    header = json.loads(data[12 : 12 + length])
+    header.pop(missing, None)
+    for tileset in header["tilesets"]:
+        tileset.pop(missing, None)
+    text = json.dumps(header).encode("utf-8")
+    path.write_bytes(
+        data[:8] + np.uint32(len(text)).tobytes() + text + data[12 + length :]
+    )
+
+    with pytest.raises(ValueError, match=f"world.bpsmap.*no '{missing}'"):
+        load_chunked_tile_map_spec(str(path))
+
+
+def test_layer_version_moves_with_every_picture_change():
+    buffer = PixelBuffer(
+        ImageSpec(size=(32, 32), mode="P", palette=Palette([0, 0, 0, 255, 0, 0]))
+    )
+    engine = TileEngine(TileAtlas(buffer, tile_size=(8, 8)))
+    seen = {engine.version}
+    assert engine.version == engine.version  # reading never bumps it
+
+    changes = [
+        lambda: setattr(engine, "alpha", 0.5),
+        lambda: setattr(engine, "background", 1),
+        lambda: setattr(engine, "scroll", (3, 0)),
+        lambda: buffer.mark_dirty(0, 0, 8, 8),
+        lambda: engine.palette.__setitem__(1, (0, 255, 0, 255)),
+        lambda: setattr(engine, "palette", Palette([0, 0, 0])),
+    ]
+    for change in changes:
+        change()
+        assert engine.version not in seen
+        seen.add(engine.version)
+
+
+def test_only_still_cached_layers_are_flattened_together():
+    def layer(cached):
+        engine = TileEngine(TileAtlas(_buffer(), tile_size=(8, 8)))
+        engine.cached = cached
+        engine._composed = engine.version  # as the last compose left it
+        return engine
+
+    sky, hills, trees, hud = layer(True), layer(True), layer(True), layer(False)
+    assert [len(run) for _, run in plan_runs([sky, hills, trees, hud])] == [3, 1]
+
+    hills.alpha = 0.5  # changed: drawn live, and it splits the run
+    plan = plan_runs([sky, hills, trees, hud])
+    assert [(still, run) for still, run in plan] == [
+        (True, [sky]),
+        (False, [hills]),
+        (True, [trees]),
+        (False, [hud]),
+    ]
+
+    trees.enabled = False
+    assert [run for _, run in plan_runs([sky, hills, trees, hud])] == [
+        [sky],
+        [hills],
+        [hud],
+    ]
+
+
+def test_draw_list_issues_only_the_state_that_changes(monkeypatch):
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+
+    from blitspersecond.graphics.internal import DrawCommand, DrawList
+    from blitspersecond.graphics.internal import draw_list
+
+    calls = []
+    for name in (
+        "glEnable",
+        "glDisable",
+        "glBlendFuncSeparate",
+        "glActiveTexture",
+        "glDrawElements",
+    ):
+        monkeypatch.setattr(draw_list, name, lambda *args: None)
+    monkeypatch.setattr(
+        draw_list, "glBindTexture", lambda target, name: calls.append(("bind", name))
+    )
+    monkeypatch.setitem(
+        draw_list._ATTRIB, 4, lambda loc, *values: calls.append(("attr", loc))
+    )
+    program, vao = MagicMock(), MagicMock()
+    atlas, other = (SimpleNamespace(id=i, target=0) for i in (1, 2))
+    palette = SimpleNamespace(id=9, target=0)
+    white = ((3, (1.0, 1.0, 1.0, 1.0)),)
+    half = ((3, (1.0, 1.0, 1.0, 0.5)),)
+
+    draws = DrawList()
+    steps = ((atlas, white), (atlas, white), (atlas, half), (other, half))
+    for texture, attrs in steps:
+        draws.add(DrawCommand(program, vao, texture, palette, attrs, 0, 4))
+    draws.flush()
+
+    assert draws.draw_calls == 4
+    program.use.assert_called_once_with()
+    program.__setitem__.assert_called_once_with("palette_texture", 1)
+    vao.bind.assert_called_once_with()
+    # One palette bind, one bind per texture change, one write per colour.
+    assert calls == [
+        ("bind", 9),
+        ("bind", 1),
+        ("attr", 3),
+        ("attr", 3),
+        ("bind", 2),
+    ]
+    assert draws.state_changes == 1 + 2 + len(calls)  # blend, program + VAO
+    assert len(draws) == 0
+
+
+def test_draw_list_names_samplers_per_program_and_draws_pools_instanced(monkeypatch):
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock, call
+
+    from blitspersecond.graphics.internal import DrawCommand, DrawList
+    from blitspersecond.graphics.internal import draw_list
+
+    issued = []
+    for name in (
+        "glEnable",
+        "glDisable",
+        "glBlendFuncSeparate",
+        "glActiveTexture",
+        "glBindTexture",
+    ):
+        monkeypatch.setattr(draw_list, name, lambda *args: None)
+    monkeypatch.setattr(
+        draw_list, "glDrawElements", lambda *args: issued.append(("quads", args[1]))
+    )
+    monkeypatch.setattr(
+        draw_list,
+        "glDrawElementsInstanced",
+        lambda *args: issued.append(("instanced", args[1], args[4])),
+    )
+    quads, pool = MagicMock(), MagicMock()
+    texture = SimpleNamespace(id=1, target=0)
+    bank = SimpleNamespace(id=9, target=0)
+    table = SimpleNamespace(id=5, target=0)
+
+    draws = DrawList()
+    draws.add(DrawCommand(quads, MagicMock(), texture, bank, (), 0, 3))
+    draws.add(DrawCommand(pool, MagicMock(), texture, bank, (), 0, 1, table, 500))
+    draws.flush()
+
+    # One bank for both programs: the pool program must still be told its
+    # palette lives on unit 1, though nothing is rebound for it.
+    quads.__setitem__.assert_called_once_with("palette_texture", 1)
+    assert pool.__setitem__.call_args_list == [
+        call("palette_texture", 1),
+        call("pool_table", 2),
+    ]
+    assert issued == [("quads", 18), ("instanced", 6, 500)]
+    assert draws.draw_calls == 2